@@ -8,6 +8,7 @@
 import { PrismaClient } from '@prisma/client';
 import * as fs from 'fs';
 import * as path from 'path';
+import * as readline from 'readline';
 
 const prisma = new PrismaClient();
 
@@ -113,21 +114,42 @@ async function ensureOrganization() {
   return org;
 }
 
-function loadJsonFile(filename: string): any[] {
+/**
+ * Liest die Datensätze einer Import-Datei.
+ * Unterstützt JSON-Arrays (z.B. users.json) und NDJSON (z.B. users.ndjson, ein
+ * Datensatz pro Zeile). NDJSON wird Zeile für Zeile gelesen, ohne die ganze Datei
+ * in den Speicher zu laden. Existieren beide, hat NDJSON Vorrang.
+ */
+async function* loadJsonFile(filename: string): AsyncGenerator<any> {
   const filePath = path.join(IMPORT_DIR, filename);
+  const ndjsonPath = filePath.replace(/\.json$/, '.ndjson');
+
+  if (fs.existsSync(ndjsonPath)) {
+    const lines = readline.createInterface({
+      input: fs.createReadStream(ndjsonPath, { encoding: 'utf-8' }),
+      crlfDelay: Infinity,
+    });
+    for await (const line of lines) {
+      if (line.trim()) {
+        yield JSON.parse(line);
+      }
+    }
+    return;
+  }
+
   if (!fs.existsSync(filePath)) {
     console.log(`⚠️  Datei nicht gefunden: ${filename}`);
-    return [];
+    return;
   }
   const content = fs.readFileSync(filePath, 'utf-8');
-  return JSON.parse(content);
+  yield* JSON.parse(content);
 }
 
 async function importBranches(stats: ImportStats) {
   console.log('\n📂 Importiere Branches...');
   const branches = loadJsonFile('branches.json');
   
-  for (const branch of branches) {
+  for await (const branch of branches) {
     try {
       // Prüfe ob bereits vorhanden
       const existing = await prisma.branch.findUnique({
@@ -161,7 +183,7 @@ async function importRoles(stats: ImportStats) {
   console.log('\n👤 Importiere Roles...');
   const roles = loadJsonFile('roles.json');
   
-  for (const role of roles) {
+  for await (const role of roles) {
     try {
       // Prüfe ob bereits vorhanden (mit organizationId = LA_FAMILIA_ORG_ID)
       const existing = await prisma.role.findUnique({
@@ -201,7 +223,7 @@ async function importUsers(stats: ImportStats) {
   console.log('\n👥 Importiere Users...');
   const users = loadJsonFile('users.json');
   
-  for (const user of users) {
+  for await (const user of users) {
     try {
       // Prüfe ob bereits vorhanden
       const existing = await prisma.user.findUnique({
@@ -244,7 +266,7 @@ async function importUserBranches(stats: ImportStats) {
   console.log('\n🔗 Importiere User-Branches...');
   const userBranches = loadJsonFile('user_branches.json');
   
-  for (const ub of userBranches) {
+  for await (const ub of userBranches) {
     try {
       const userId = idMappings.users.get(ub.old_user_id);
       const branchId = idMappings.branches.get(ub.old_branch_id);
@@ -301,7 +323,7 @@ async function importUserRoles(stats: ImportStats) {
   console.log('\n🔗 Importiere User-Roles...');
   const userRoles = loadJsonFile('user_roles.json');
   
-  for (const ur of userRoles) {
+  for await (const ur of userRoles) {
     try {
       const userId = idMappings.users.get(ur.old_user_id);
       const roleId = idMappings.roles.get(ur.old_role_id);
@@ -355,7 +377,7 @@ async function importRequests(stats: ImportStats) {
   console.log('\n📋 Importiere Requests...');
   const requests = loadJsonFile('requests.json');
   
-  for (const req of requests) {
+  for await (const req of requests) {
     try {
       const requesterId = idMappings.users.get(req.old_requester_id);
       const responsibleId = idMappings.users.get(req.old_responsible_id);
@@ -423,8 +445,10 @@ async function importRequests(stats: ImportStats) {
 async function importCerebro(stats: ImportStats) {
   console.log('\n🧠 Importiere Cerebro-Artikel...');
   const cerebro = loadJsonFile('cerebro.json');
+  // Mehrdeutige Autoren (prepare_import.py): Admin-User statt Namenssuche
+  let ambiguousAuthors = 0;
   
-  for (const article of cerebro) {
+  for await (const article of cerebro) {
     try {
       let authorId = null;
       
@@ -433,8 +457,8 @@ async function importCerebro(stats: ImportStats) {
         authorId = idMappings.users.get(article.old_author_id);
       }
       
-      // Falls nicht gefunden, suche über author_name
-      if (!authorId && article.author_name) {
+      // Falls nicht gefunden, suche über author_name (nicht bei mehrdeutigem Namen)
+      if (!authorId && article.author_name && !article.author_ambiguous) {
         // Suche User mit Namen
         const user = await prisma.user.findFirst({
           where: {
@@ -475,6 +499,9 @@ async function importCerebro(stats: ImportStats) {
         });
         if (adminUser) {
           authorId = adminUser.id;
+          if (article.author_ambiguous) {
+            ambiguousAuthors++;
+          }
           console.log(`  ⚠️  Kein Autor gefunden für "${article.title}", verwende Admin-User`);
         } else {
           console.log(`  ⚠️  Kein Autor gefunden für "${article.title}", überspringe`);
@@ -501,6 +528,9 @@ async function importCerebro(stats: ImportStats) {
       console.error(`  ❌ Fehler bei Cerebro-Artikel ${article.title}:`, error.message);
     }
   }
+  if (ambiguousAuthors > 0) {
+    console.log(`  ⚠️  ${ambiguousAuthors} Artikel mit mehrdeutigem Autor: Admin-User als Fallback`);
+  }
 }
 
 async function importTasks(stats: ImportStats) {
@@ -529,7 +559,7 @@ async function importTasks(stats: ImportStats) {
     return;
   }
   
-  for (const task of tasks) {
+  for await (const task of tasks) {
     try {
       // Mappe IDs
       const responsibleId = task.old_responsible_id ? idMappings.users.get(task.old_responsible_id) : null;
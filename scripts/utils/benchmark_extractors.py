@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Benchmark für die extract_*-Funktionen der Snapshot-Skripte.
+
+Erzeugt mit generate_snapshot_corpus.py Snapshots wachsender Größe (oder misst
+mit --corpus-dir vorhandene snapshot-*.log) und misst jede Extraktionsfunktion
+aus extract_intranet_data.py, extract_all_data.py und extract_users_simple.py:
+Laufzeit (beste aus --repeat), Durchsatz (MB/s) und Speicher-Peak (tracemalloc,
+in einem eigenen Lauf). Datei-Funktionen lesen blockweise per mmap, Text-
+Funktionen bekommen den ganzen Snapshot als String (der Inhalt selbst zählt
+nicht zum Speicher-Peak).
+
+Zu jeder Größe wird zusätzlich ein Snapshot mit --adversarial-rate
+Worst-Case-Knoten gemessen (lange Zeilen ohne Klammern usw.). Wächst die
+Laufzeit beim Vergrößern deutlich mehr als linear, wird die Funktion als
+verdächtig markiert. Mit --report werden die Ergebnisse als JSON gespeichert.
+
+Beispiel:
+    python benchmark_extractors.py --sizes 64K 1M 16M
+    python benchmark_extractors.py --sizes 1M 64M 256M --repeat 1 --no-memory --function extract_all
+"""
+
+import argparse
+import json
+import platform
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+import extract_all_data
+import extract_intranet_data
+from benchmark_prepare_import import measure
+from benchmark_snapshot_patterns import MIN_COMPARE_SECONDS
+from generate_snapshot_corpus import format_size, generate_snapshot, parse_size
+from snapshot_patterns import extract_users_from_chunks
+from snapshot_scanner import iter_snapshot_chunks
+
+# Anteil der Worst-Case-Knoten im adversarial Snapshot
+DEFAULT_ADVERSARIAL_RATE = 0.02
+# Laufzeit-Zuwachs pro MB (Zeit-Verhältnis / Größen-Verhältnis zweier Snapshots),
+# ab dem eine Funktion als nicht linear gilt; 1.0 = genau linear
+SUPERLINEAR_GROWTH_PER_MB = 1.5
+
+def _users_simple(snapshot_file: Path) -> List[Dict[str, Any]]:
+    # extract_users_simple.py ist ein Skript ohne Funktionen: derselbe Aufruf
+    return extract_users_from_chunks(iter_snapshot_chunks(snapshot_file))
+
+# (Name, Art, Funktion): 'file' bekommt den Pfad, 'text' den Inhalt als String
+EXTRACTORS: List[Tuple[str, str, Callable[[Any], Any]]] = [
+    ('extract_intranet_data.extract_all_from_file', 'file', extract_intranet_data.extract_all_from_file),
+    ('extract_intranet_data.extract_users_from_snapshot', 'text', extract_intranet_data.extract_users_from_snapshot),
+    ('extract_intranet_data.extract_requests_from_snapshot', 'text',
+     extract_intranet_data.extract_requests_from_snapshot),
+    ('extract_intranet_data.extract_branches_from_snapshot', 'text',
+     extract_intranet_data.extract_branches_from_snapshot),
+    ('extract_intranet_data.extract_roles_from_snapshot', 'text', extract_intranet_data.extract_roles_from_snapshot),
+    ('extract_intranet_data.extract_cerebro_articles_from_snapshot', 'text',
+     extract_intranet_data.extract_cerebro_articles_from_snapshot),
+    ('extract_all_data.extract_settings_from_file', 'file', extract_all_data.extract_settings_from_file),
+    ('extract_all_data.extract_main_from_file', 'file', extract_all_data.extract_main_from_file),
+    ('extract_all_data.extract_cerebro_from_file', 'file', extract_all_data.extract_cerebro_from_file),
+    ('extract_all_data.extract_branches', 'text', extract_all_data.extract_branches),
+    ('extract_all_data.extract_cerebro_articles', 'text', extract_all_data.extract_cerebro_articles),
+    ('extract_users_simple', 'file', _users_simple),
+]
+
+def select_extractors(prefixes: List[str]) -> List[Tuple[str, str, Callable[[Any], Any]]]:
+    """Funktionen, deren Name (ohne oder mit Modul) mit einem der Präfixe beginnt."""
+    if not prefixes:
+        return EXTRACTORS
+    return [
+        entry for entry in EXTRACTORS
+        if any(entry[0].startswith(prefix) or entry[0].rsplit('.', 1)[-1].startswith(prefix) for prefix in prefixes)
+    ]
+
+def build_corpus(directory: Path, sizes: List[int], adversarial_rate: float, seed: int) -> List[Tuple[str, Path]]:
+    """Erzeugt pro Größe einen normalen und (falls Rate > 0) einen adversarial Snapshot."""
+    snapshots = []
+    for mode, rate in (('normal', 0.0), ('adversarial', adversarial_rate)):
+        if mode == 'adversarial' and not rate:
+            continue
+        for size in sizes:
+            path = directory / f"snapshot-mixed-{format_size(size)}-{mode}.log"
+            generate_snapshot(path, size, 'mixed', rate, seed=seed)
+            snapshots.append((mode, path))
+    return snapshots
+
+def read_corpus(directory: Path) -> List[Tuple[str, Path]]:
+    """Vorhandene snapshot-*.log, nach Größe sortiert."""
+    paths = sorted(directory.glob("snapshot-*.log"), key=lambda path: path.stat().st_size)
+    return [('adversarial' if 'adversarial' in path.name else 'normal', path) for path in paths]
+
+def result_count(result: Any) -> int:
+    """Anzahl gefundener Einträge (Listen bzw. Summe über ein Dict von Listen)."""
+    if result is None:
+        return 0
+    if isinstance(result, dict):
+        return sum(len(values) for values in result.values())
+    return len(result)
+
+def benchmark(snapshots: List[Tuple[str, Path]], extractors: List[Tuple[str, str, Callable[[Any], Any]]],
+              repeat: int, memory: bool, max_seconds: float, max_text_mb: float) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """Misst jede Funktion auf jedem Snapshot; gibt Ergebnisse und verdächtige Funktionen zurück."""
+    results = []
+    suspicious: List[str] = []
+    print(f"{'Funktion':<58} {'Modus':<11} {'Größe':>10} {'Zeit':>10} {'MB/s':>9} {'Peak MB':>9} {'Treffer':>8}  Hinweis")
+    for name, kind, func in extractors:
+        previous: Dict[str, Tuple[float, float]] = {}
+        stopped = set()
+        for mode, path in snapshots:
+            if mode in stopped:
+                continue
+            mb = path.stat().st_size / (1024 * 1024)
+            if kind == 'text' and mb > max_text_mb:
+                continue
+            arg: Any = path
+            if kind == 'text':
+                arg = path.read_text(encoding='utf-8')
+            # Ergebnis des letzten Laufs für die Trefferzahl
+            last: Dict[str, Any] = {}
+            measured = measure(lambda: last.update(result=func(arg)), repeat, memory)
+            seconds = measured["seconds"]
+            note = ""
+            if mode in previous:
+                old_mb, old_seconds = previous[mode]
+                growth = (seconds / old_seconds) / (mb / old_mb) if old_seconds and mb > old_mb else 0.0
+                if old_seconds > MIN_COMPARE_SECONDS and growth > SUPERLINEAR_GROWTH_PER_MB:
+                    note = f"nicht linear (x{growth:.1f} pro MB)"
+                    if name not in suspicious:
+                        suspicious.append(name)
+            previous[mode] = (mb, seconds)
+            row = {
+                "function": name,
+                "mode": mode,
+                "snapshot": path.name,
+                "size_mb": round(mb, 3),
+                "seconds": round(seconds, 6),
+                "mb_per_s": round(mb / seconds, 2) if seconds else None,
+                "peak_mb": round(measured["peak_mb"], 2) if measured["peak_mb"] is not None else None,
+                "matches": result_count(last["result"]),
+            }
+            del arg, last
+            results.append(row)
+            peak = f"{row['peak_mb']:.1f}" if row['peak_mb'] is not None else '-'
+            mb_per_s = f"{row['mb_per_s']:.1f}" if row['mb_per_s'] else '-'
+            print(f"{name[:58]:<58} {mode:<11} {mb:>8.2f}MB {seconds:>9.3f}s {mb_per_s:>9} {peak:>9} "
+                  f"{row['matches']:>8}  {note}")
+            if seconds > max_seconds:
+                print(f"{name[:58]:<58} {mode:<11} abgebrochen (> {max_seconds:.0f}s)")
+                stopped.add(mode)
+                if name not in suspicious:
+                    suspicious.append(name)
+    return results, suspicious
+
+def main():
+    parser = argparse.ArgumentParser(description="Misst MB/s und Speicher-Peak der Snapshot-Extraktoren.")
+    parser.add_argument('--sizes', nargs='+', default=['64K', '1M', '8M'],
+                        help="Größen der erzeugten Snapshots, z.B. 64K 1M 256M (Standard: 64K 1M 8M)")
+    parser.add_argument('--corpus-dir', type=Path,
+                        help="Vorhandene snapshot-*.log messen statt Snapshots zu erzeugen")
+    parser.add_argument('--adversarial-rate', type=float, default=DEFAULT_ADVERSARIAL_RATE,
+                        help=f"Anteil der Worst-Case-Knoten (Standard: {DEFAULT_ADVERSARIAL_RATE}, 0 = keine)")
+    parser.add_argument('--function', nargs='+', default=[], metavar='NAME',
+                        help="Nur Funktionen mit diesen Namens-Präfixen messen")
+    parser.add_argument('--repeat', type=int, default=3, help="Wiederholungen pro Messung (beste Zeit zählt)")
+    parser.add_argument('--no-memory', action='store_true', help="Speicher-Peak nicht messen (schneller)")
+    parser.add_argument('--max-seconds', type=float, default=30.0,
+                        help="Funktion nicht weiter vergrößern, sobald ein Lauf länger dauert")
+    parser.add_argument('--max-text-mb', type=float, default=64.0,
+                        help="Text-Funktionen (ganzer Snapshot als String) nur bis zu dieser Größe messen")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--report', type=Path, help="Ergebnisse als JSON speichern")
+    args = parser.parse_args()
+
+    extractors = select_extractors(args.function)
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.corpus_dir:
+            snapshots = read_corpus(args.corpus_dir)
+        else:
+            sizes = sorted(parse_size(size) for size in args.sizes)
+            snapshots = build_corpus(Path(tmp), sizes, args.adversarial_rate, args.seed)
+        print("Snapshots: " + ", ".join(f"{path.name} ({path.stat().st_size / (1024 * 1024):.2f} MB)"
+                                        for _, path in snapshots) + "\n")
+        results, suspicious = benchmark(snapshots, extractors, max(1, args.repeat), not args.no_memory,
+                                        args.max_seconds, args.max_text_mb)
+
+    if args.report:
+        report = {
+            "created": datetime.now().isoformat(timespec='seconds'),
+            "python": platform.python_version(),
+            "adversarial_rate": args.adversarial_rate,
+            "seed": args.seed,
+            "results": results,
+        }
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\n[OK] Bericht gespeichert: {args.report}")
+
+    if suspicious:
+        print(f"\n[WARN] Verdächtige Funktionen: {', '.join(suspicious)}")
+    else:
+        print("\nAlle Funktionen skalieren linear.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Benchmark für prepare_import.py auf synthetischen Exporten wachsender Größe.
+
+Für jede Größe wird mit generate_legacy_dump.py ein Export erzeugt (oder mit
+--dump ein vorhandener verwendet) und jede Stufe einzeln gemessen:
+parse_json_export, die Encoding-Reparatur (iter_repaired_rows, wie im Lauf
+nur die Text-Spalten jeder Tabelle; zum Vergleich fix_encoding_recursive über
+alle Spalten), jede transform_*-Funktion,
+transform_user_relations und das Schreiben als JSON/NDJSON.
+
+Pro Stufe werden Laufzeit (beste aus --repeat), Durchsatz (Zeilen/s) und der
+Speicher-Peak (tracemalloc, in einem eigenen Lauf) ausgegeben. Mit --report
+werden die Ergebnisse als JSON gespeichert, mit --compare gegen einen
+früheren Bericht verglichen, damit Regressionen zwischen Versionen auffallen.
+
+Beispiel:
+    python benchmark_prepare_import.py --rows 10000 100000 --report bench.json
+    python benchmark_prepare_import.py --rows 10000 100000 --compare bench.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from generate_legacy_dump import generate_dump
+from import_io import OUTPUT_FORMATS, write_records
+from prepare_import import (DateNormalizer, build_transform_inputs, fix_encoding_recursive, iter_export_tables,
+                            iter_repaired_rows, parse_json_export, run_transform)
+from transform_user_relations import UserKeyColumns, transform_user_relations
+
+# Stufe gilt im Vergleich als langsamer, wenn der Durchsatz um mehr als diesen Faktor sinkt
+REGRESSION_FACTOR = 1.2
+# Kürzere Messungen sind für den Vergleich zu ungenau
+MIN_COMPARE_SECONDS = 0.01
+
+def measure(run: Callable[[], Any], repeat: int, memory: bool) -> Dict[str, Any]:
+    """Misst eine Stufe: beste Zeit aus `repeat` Läufen, optional Speicher-Peak in einem Extra-Lauf."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    result = {"seconds": best, "peak_mb": None}
+    if memory:
+        tracemalloc.start()
+        try:
+            run()
+            result["peak_mb"] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        finally:
+            tracemalloc.stop()
+    return result
+
+def _quiet(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Unterdrückt die Konsolenausgabe einer Funktion (z.B. 'Gefunden: ...')."""
+    def run(*args, **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return func(*args, **kwargs)
+    return run
+
+def benchmark_dump(dump: Path, repeat: int, memory: bool) -> List[Dict[str, Any]]:
+    """Misst alle Stufen für einen Export und gibt eine Zeile pro Stufe zurück."""
+    results = []
+    size_mb = dump.stat().st_size / (1024 * 1024)
+
+    def add(stage: str, rows: int, run: Callable[[], Any], mb: Optional[float] = None):
+        measured = measure(run, repeat, memory)
+        seconds = measured["seconds"]
+        results.append({
+            "stage": stage,
+            "rows": rows,
+            "seconds": round(seconds, 6),
+            "rows_per_s": round(rows / seconds, 1) if seconds else None,
+            "mb_per_s": round(mb / seconds, 2) if mb and seconds else None,
+            "peak_mb": round(measured["peak_mb"], 2) if measured["peak_mb"] is not None else None,
+        })
+        print_row(results[-1])
+
+    raw_tables = {name: list(rows) for name, rows in iter_export_tables(dump)}
+    total_rows = sum(len(rows) for rows in raw_tables.values())
+    add('iter_export_tables', total_rows,
+        lambda: {name: list(rows) for name, rows in iter_export_tables(dump)}, size_mb)
+    add('parse_json_export', total_rows, lambda: _quiet(parse_json_export)(dump), size_mb)
+    add('iter_repaired_rows', total_rows,
+        lambda: [list(iter_repaired_rows(name, iter(rows))) for name, rows in raw_tables.items()])
+    add('fix_encoding_recursive', total_rows,
+        lambda: [fix_encoding_recursive(row) for rows in raw_tables.values() for row in rows])
+
+    tables = _quiet(parse_json_export)(dump)
+    context, inputs = build_transform_inputs(tables)
+    outputs = {}
+    for name, rows in inputs.items():
+        add(f'transform_{name}', len(rows), lambda name=name, rows=rows: run_transform(name, rows, context, DateNormalizer()))
+        outputs[name] = run_transform(name, rows, context, DateNormalizer())
+
+    old_user_branches = tables.get('intra_users_branches', [])
+    old_user_roles = tables.get('intra_users_roles', [])
+
+    def relations():
+        user_branches, user_roles = transform_user_relations(
+            UserKeyColumns.from_records(outputs['users']), old_user_branches, old_user_roles)
+        return list(user_branches), list(user_roles)
+
+    add('transform_user_relations', len(old_user_branches) + len(old_user_roles), relations)
+    outputs['user_branches'], outputs['user_roles'] = relations()
+
+    output_rows = sum(len(records) for records in outputs.values())
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in OUTPUT_FORMATS:
+            def write(fmt=fmt):
+                for name, records in outputs.items():
+                    write_records(Path(tmp) / f"{name}.{fmt}", records, fmt)
+            add(f'write_{fmt}', output_rows, write)
+    return results
+
+def print_header():
+    print(f"  {'Stufe':<26} {'Zeilen':>10} {'Zeit':>10} {'Zeilen/s':>12} {'MB/s':>8} {'Peak MB':>9}")
+
+def print_row(row: Dict[str, Any]):
+    mb_per_s = f"{row['mb_per_s']:.1f}" if row['mb_per_s'] else '-'
+    peak = f"{row['peak_mb']:.1f}" if row['peak_mb'] is not None else '-'
+    rows_per_s = f"{row['rows_per_s']:.0f}" if row['rows_per_s'] else '-'
+    print(f"  {row['stage']:<26} {row['rows']:>10} {row['seconds']:>9.3f}s {rows_per_s:>12} {mb_per_s:>8} {peak:>9}")
+
+def compare(runs: List[Dict[str, Any]], baseline: Dict[str, Any]) -> List[str]:
+    """Vergleicht den Durchsatz pro (Größe, Stufe) mit einem früheren Bericht."""
+    previous = {
+        (run["rows"], row["stage"]): row
+        for run in baseline.get("runs", []) for row in run["results"]
+    }
+    regressions = []
+    print(f"\nVergleich mit Bericht vom {baseline.get('created', '?')}:")
+    for run in runs:
+        for row in run["results"]:
+            old = previous.get((run["rows"], row["stage"]))
+            if not old or not old.get("rows_per_s") or not row.get("rows_per_s"):
+                continue
+            if min(row["seconds"], old["seconds"]) < MIN_COMPARE_SECONDS:
+                continue
+            factor = old["rows_per_s"] / row["rows_per_s"]
+            note = ""
+            if factor > REGRESSION_FACTOR:
+                note = "langsamer"
+                regressions.append(f"{run['rows']} Zeilen / {row['stage']}: x{factor:.2f}")
+            print(f"  {run['rows']:>10} {row['stage']:<26} x{factor:.2f} Laufzeit  {note}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Misst die Stufen von prepare_import.py auf synthetischen Exporten.")
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000],
+                        help="Größen der erzeugten Exporte in Zeilen (Standard: 10000 100000)")
+    parser.add_argument('--dump', type=Path, help="Vorhandenen Export messen statt Exporte zu erzeugen")
+    parser.add_argument('--mojibake-rate', type=float, default=0.2)
+    parser.add_argument('--emoji-rate', type=float, default=0.02)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3, help="Wiederholungen pro Messung (beste Zeit zählt)")
+    parser.add_argument('--no-memory', action='store_true', help="Speicher-Peak nicht messen (schneller)")
+    parser.add_argument('--report', type=Path, help="Ergebnisse als JSON speichern")
+    parser.add_argument('--compare', type=Path, help="Mit einem früheren Bericht vergleichen")
+    args = parser.parse_args()
+
+    runs = []
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.dump:
+            dumps = [(None, args.dump)]
+        else:
+            dumps = []
+            for rows in args.rows:
+                dump = Path(tmp) / f"dump_{rows}.json"
+                generate_dump(dump, rows, args.mojibake_rate, args.emoji_rate, seed=args.seed)
+                dumps.append((rows, dump))
+
+        for rows, dump in dumps:
+            size_mb = dump.stat().st_size / (1024 * 1024)
+            print(f"\nExport: {dump.name} ({size_mb:.1f} MB)")
+            print_header()
+            results = benchmark_dump(dump, max(1, args.repeat), not args.no_memory)
+            runs.append({
+                "rows": rows if rows is not None else results[0]["rows"],
+                "dump": str(dump) if args.dump else None,
+                "size_mb": round(size_mb, 2),
+                "results": results,
+            })
+
+    report = {
+        "created": datetime.now().isoformat(timespec='seconds'),
+        "python": platform.python_version(),
+        "mojibake_rate": args.mojibake_rate,
+        "emoji_rate": args.emoji_rate,
+        "seed": args.seed,
+        "runs": runs,
+    }
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\n[OK] Bericht gespeichert: {args.report}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            regressions = compare(runs, json.load(f))
+        if regressions:
+            print("\n[WARN] Langsamer als im Vergleichsbericht:")
+            for line in regressions:
+                print(f"  {line}")
+        else:
+            print("\nKeine Regressionen.")
+
+if __name__ == "__main__":
+    main()
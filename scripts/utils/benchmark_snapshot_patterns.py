@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Benchmark für die Pattern aus snapshot_patterns.py.
+
+Misst für jedes Pattern den Durchsatz (MB/s) auf synthetischen Snapshots
+wachsender Größe (erzeugt mit generate_snapshot_corpus.py). Text-Pattern laufen
+mit finditer über den ganzen Snapshot, Knoten-Pattern wie in
+extract_intranet_data mit match() über jeden 'name:'-Wert.
+Die zeilenweisen User-Parser und die Text-Extraktoren werden genauso gemessen.
+Wächst die Laufzeit beim Verdoppeln der Größe deutlich mehr als linear, wird
+das Pattern als verdächtig markiert (z.B. Backtracking von `([^|]+)\\s*\\(`
+über lange Zeilen ohne Klammern oder Abschnitte ganz ohne '|').
+
+Beispiel:
+    python benchmark_snapshot_patterns.py --size-mb 4
+    python benchmark_snapshot_patterns.py --adversarial --max-seconds 5
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from generate_snapshot_corpus import ADVERSARIAL_LINE_LENGTH, generate_snapshot
+from snapshot_patterns import (NODE_PATTERNS, TEXT_PATTERNS, extract_requests, extract_users_from_settings,
+                               split_user_last_day, split_user_name)
+from snapshot_scanner import NAME_MARKER
+
+# Laufzeit-Faktor beim Verdoppeln der Größe, ab dem ein Pattern als nicht linear gilt
+SUPERLINEAR_FACTOR = 3.0
+# Kürzere Läufe sind für den Vergleich zu ungenau
+MIN_COMPARE_SECONDS = 0.01
+# Anteil der Worst-Case-Knoten (lange name-Zeilen) mit --adversarial
+ADVERSARIAL_RATE = 0.05
+
+def build_snapshot(size_bytes: int, adversarial: bool, seed: int = 0,
+                   line_length: int = ADVERSARIAL_LINE_LENGTH) -> str:
+    """Erzeugt mit generate_snapshot einen synthetischen Snapshot (mixed) mit ungefähr size_bytes Bytes."""
+    rate = ADVERSARIAL_RATE if adversarial else 0.0
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "snapshot.log"
+        generate_snapshot(path, size_bytes, 'mixed', rate, line_length, seed)
+        return path.read_text(encoding='utf-8')
+
+def name_values(content: str) -> List[str]:
+    """Die Werte aller 'name:'-Zeilen (Eingabe der Knoten-Pattern)."""
+    values = []
+    for line in content.split('\n'):
+        stripped = line.lstrip(' \t-')
+        if stripped.startswith(NAME_MARKER):
+            values.append(stripped[len(NAME_MARKER):].strip())
+    return values
+
+def text_runner(pattern) -> Callable[[str], None]:
+    def run(content: str):
+        for _ in pattern.finditer(content):
+            pass
+    return run
+
+def node_runner(parse: Callable[[str], object]) -> Callable[[str], None]:
+    def run(content: str):
+        for name in name_values(content):
+            parse(name)
+    return run
+
+def time_run(run: Callable[[str], None], content: str, repeat: int) -> float:
+    """Beste Zeit aus `repeat` vollständigen Durchläufen über den Snapshot."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run(content)
+        best = min(best, time.perf_counter() - start)
+        if best > 1.0:
+            break
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Misst den Durchsatz der Snapshot-Pattern pro MB.")
+    parser.add_argument('--size-mb', type=float, default=1.0, help="Größter Snapshot in MB (Standard: 1)")
+    parser.add_argument('--adversarial', action='store_true',
+                        help="Worst-Case-Knoten mit langen name-Zeilen einstreuen (Backtracking-Test)")
+    parser.add_argument('--max-seconds', type=float, default=10.0,
+                        help="Pattern nicht weiter vergrößern, sobald ein Lauf länger dauert")
+    parser.add_argument('--repeat', type=int, default=3, help="Wiederholungen pro Messung (beste Zeit zählt)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    max_bytes = int(args.size_mb * 1024 * 1024)
+    sizes = [max_bytes]
+    while sizes[0] > 64 * 1024:
+        sizes.insert(0, sizes[0] // 2)
+
+    snapshots = [build_snapshot(size, args.adversarial, args.seed) for size in sizes]
+    mode = "adversarial" if args.adversarial else "normal"
+    print(f"Snapshots ({mode}): " + ", ".join(f"{len(c) / 1024:.0f} KB" for c in snapshots))
+    print(f"\n{'Pattern':<28} {'Größe':>10} {'Zeit':>10} {'MB/s':>10}  Hinweis")
+
+    suspicious = []
+    runners = [(name, text_runner(pattern)) for name, pattern in TEXT_PATTERNS.items()]
+    runners += [(name, node_runner(pattern.match)) for name, pattern in NODE_PATTERNS.items()]
+    runners += [
+        ('split_user_name', node_runner(split_user_name)),
+        ('split_user_last_day', node_runner(split_user_last_day)),
+        ('extract_users_from_settings', extract_users_from_settings),
+        ('extract_requests', extract_requests),
+    ]
+    for name, run in runners:
+        previous = None
+        for content in snapshots:
+            seconds = time_run(run, content, args.repeat)
+            mb = len(content.encode('utf-8')) / (1024 * 1024)
+            note = ""
+            if previous is not None and previous > MIN_COMPARE_SECONDS and seconds / previous > SUPERLINEAR_FACTOR:
+                note = f"nicht linear (x{seconds / previous:.1f} bei doppelter Größe)"
+                if name not in suspicious:
+                    suspicious.append(name)
+            print(f"{name:<28} {mb:>8.2f}MB {seconds:>9.3f}s {mb / seconds if seconds else float('inf'):>10.1f}  {note}")
+            previous = seconds
+            if seconds > args.max_seconds:
+                print(f"{name:<28} abgebrochen (> {args.max_seconds:.0f}s)")
+                if name not in suspicious:
+                    suspicious.append(name)
+                break
+
+    if suspicious:
+        print(f"\nVerdächtige Pattern: {', '.join(suspicious)}")
+    else:
+        print("\nAlle Pattern skalieren linear.")
+
+if __name__ == "__main__":
+    main()
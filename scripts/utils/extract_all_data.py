@@ -3,146 +3,39 @@
 Vollständiges Skript zum Extrahieren aller Daten aus dem alten Intranet-System.
 """
 
+import argparse
 import json
-import re
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import Callable, List, Dict, Any, Optional
+
+import keyword_matcher
+import snapshot_patterns
+import snapshot_scanner
+from keyword_matcher import BRANCH_MATCHER, CEREBRO_ARTICLE_MATCHER
+from run_metrics import RunMetrics, add_profile_argument
+from snapshot_cache import SnapshotCache, source_fingerprint
+from snapshot_patterns import extract_requests, extract_users_from_chunks, merge_users
+from snapshot_scanner import iter_snapshot_chunks
 
 # Pfade
 BROWSER_LOGS_DIR = Path(r"C:\Users\patri\.cursor\browser-logs")
 OUTPUT_DIR = Path("extracted_data")
 OUTPUT_DIR.mkdir(exist_ok=True)
-
-def extract_users_from_settings(snapshot_content: str) -> List[Dict[str, Any]]:
-    """Extrahiert alle User aus der Settings-Seite."""
-    users = []
-    seen_usernames = set()
-    
-    # Pattern 1: User mit Last Day: "Name (username) | Last day: YYYY-MM-DD"
-    pattern1 = r'name:\s*([^|]+)\s*\(([^)]+)\)\s*\|\s*Last\s+day:\s*(\d{4}-\d{2}-\d{2})'
-    matches1 = re.findall(pattern1, snapshot_content, re.IGNORECASE)
-    for full_name, username, last_day in matches1:
-        full_name = full_name.strip().strip('"').strip()
-        username = username.strip()
-        last_day = last_day.strip()
-        if username and username not in seen_usernames:
-            seen_usernames.add(username)
-            users.append({
-                "username": username,
-                "full_name": full_name,
-                "last_day": last_day
-            })
-    
-    # Pattern 2: User ohne Last Day: "Name (username)" - nur in option-Elementen
-    pattern2 = r'role:\s*option\s*\n\s*name:\s*([^(]+)\s*\(([^)]+)\)'
-    matches2 = re.findall(pattern2, snapshot_content, re.MULTILINE)
-    for full_name, username in matches2:
-        full_name = full_name.strip().strip('"').strip()
-        username = username.strip()
-        if (username and len(username) > 1 and len(username) < 50 and 
-            username not in seen_usernames and 
-            username != "Select User" and
-            not username.startswith('ref-') and 
-            'ref:' not in username and
-            'ref:' not in full_name):
-            seen_usernames.add(username)
-            users.append({
-                "username": username,
-                "full_name": full_name,
-                "last_day": None
-            })
-    
-    return users
+CACHE_FILE = OUTPUT_DIR / ".cache_extract_all_data.json"
+# Laufzeit-Bericht pro Stufe/Snapshot-Datei (neben extracted_data/)
+RUN_REPORT_FILE = Path("extract_all_data_run.json")
 
 def extract_branches(snapshot_content: str) -> List[str]:
     """Extrahiert alle Branches (Standorte)."""
-    branches = []
-    seen = set()
-    
-    # Bekannte Branches
-    branch_names = [
-        'Alianza Paisa',
-        'Alianza Pai a',  # Fehlerhafte Schreibweise
-        'Manila',
-        'Nowhere',
-        'Parque Poblado'
-    ]
-    
-    for branch in branch_names:
-        if branch in snapshot_content and branch not in seen:
-            # Normalisiere "Alianza Pai a" zu "Alianza Paisa"
-            normalized = 'Alianza Paisa' if branch == 'Alianza Pai a' else branch
-            if normalized not in seen:
-                seen.add(normalized)
-                branches.append(normalized)
-    
-    return branches
+    # Bekannte Branches inkl. fehlerhafter Schreibweisen in einem Durchlauf
+    return BRANCH_MATCHER.in_canonical_order(BRANCH_MATCHER.find_all(snapshot_content))
 
 def extract_cerebro_articles(snapshot_content: str) -> List[Dict[str, Any]]:
     """Extrahiert alle Cerebro-Artikel."""
-    articles = []
-    seen = set()
-    
-    # Bekannte Cerebro-Artikel - suche direkt nach diesen Namen
-    article_names = [
-        'Online Check-in',
-        'Online Check-out',
-        'Emergencie',
-        'Emergencies',
-        'Recepcion: First day',
-        'Recepcion: Fir t day',
-        'Keepa',
-        'KeePa',
-        'Servicio de Desayuno',
-        'Servicio de De ayuno'
-    ]
-    
-    # Suche nach jedem Artikel-Namen im Snapshot
-    for name in article_names:
-        if name in snapshot_content:
-            # Normalisiere Namen
-            normalized = name
-            if 'Emergencie' in normalized:
-                normalized = 'Emergencies'
-            elif 'Fir t day' in normalized:
-                normalized = 'Recepcion: First day'
-            elif 'De ayuno' in normalized:
-                normalized = 'Servicio de Desayuno'
-            elif normalized == 'KeePa':
-                normalized = 'Keepa'
-            
-            if normalized not in seen:
-                seen.add(normalized)
-                articles.append({"title": normalized})
-    
-    return articles
-
-def extract_requests(snapshot_content: str) -> List[Dict[str, Any]]:
-    """Extrahiert alle Requests aus der Hauptseite."""
-    requests = []
-    
-    # Suche nach Request-Zeilen: role: row mit Request-Daten
-    # Format: name: "Request Titel User1 User2 Status Datum ..."
-    pattern = r'role:\s*row\s*\n\s*name:\s*"([^"]+)"'
-    matches = re.finditer(pattern, snapshot_content, re.MULTILINE)
-    
-    for match in matches:
-        request_text = match.group(1)
-        # Zerlege den Request-Text (mehrere Leerzeichen als Trenner)
-        parts = [p.strip() for p in request_text.split('  ') if p.strip()]
-        
-        if len(parts) >= 4:
-            request = {
-                "title": parts[0] if parts[0] else "",
-                "requested_by": parts[1] if len(parts) > 1 else "",
-                "responsible": parts[2] if len(parts) > 2 else "",
-                "status": parts[3] if len(parts) > 3 else "",
-                "date": parts[4] if len(parts) > 4 else "",
-                "raw_text": request_text
-            }
-            requests.append(request)
-    
-    return requests
+    # Bekannte Cerebro-Artikel inkl. fehlerhafter Schreibweisen in einem Durchlauf,
+    # Namen kommen bereits normalisiert zurück
+    found = CEREBRO_ARTICLE_MATCHER.find_all(snapshot_content)
+    return [{"title": title} for title in CEREBRO_ARTICLE_MATCHER.in_canonical_order(found)]
 
 def extract_roles(snapshot_content: str) -> List[str]:
     """Extrahiert alle Rollen."""
@@ -151,9 +44,69 @@ def extract_roles(snapshot_content: str) -> List[str]:
     # Hier erstmal eine leere Liste, da wir die Rollen-Seite noch nicht haben
     return roles
 
+def extract_from_file(snapshot_file: Path, extractor: Callable[[str], List[Any]]) -> List[Any]:
+    """
+    Wendet eine Extraktionsfunktion blockweise auf eine Snapshot-Datei an.
+    
+    Die Datei wird per mmap in zeilenbündigen, überlappenden Blöcken gelesen,
+    so dass auch sehr große Snapshots nicht komplett in den Speicher müssen.
+    Blöcke überlappen um eine Zeile (overlap_lines=1): Zwei-Zeilen-Pattern wie
+    Requests ('role: row' + 'name: ...') liegen nie ganz in der Überlappung und
+    werden daher nicht doppelt gefunden. Einzeilige Treffer (Branches,
+    Cerebro-Titel) können doppelt vorkommen; main() entfernt sie über set()
+    bzw. Titel. User brauchen extract_users_from_chunks, weil ein Eintrag mit
+    Last Day Vorrang vor einem Dropdown-Eintrag in einem früheren Block hat.
+    """
+    results = []
+    for chunk in iter_snapshot_chunks(snapshot_file):
+        results.extend(extractor(chunk))
+    return results
+
+def is_cerebro_page(snapshot_file: Path) -> bool:
+    """Prüft blockweise, ob ein Snapshot eine Cerebro-Seite ist."""
+    for chunk in iter_snapshot_chunks(snapshot_file):
+        if 'Online Check-in' in chunk or 'Emergencie' in chunk or 'KeePa' in chunk:
+            return True
+    return False
+
+def extract_settings_from_file(snapshot_file: Path) -> Dict[str, List[Any]]:
+    """Extrahiert User und Branches aus der Settings-Seite."""
+    return {
+        # User pro Username über alle Blöcke zusammenführen (Last Day hat Vorrang)
+        "users": extract_users_from_chunks(iter_snapshot_chunks(snapshot_file)),
+        "branches": extract_from_file(snapshot_file, extract_branches),
+    }
+
+def extract_main_from_file(snapshot_file: Path) -> Dict[str, List[Any]]:
+    """Extrahiert Requests und Branches aus der Hauptseite."""
+    return {
+        "requests": extract_from_file(snapshot_file, extract_requests),
+        "branches": extract_from_file(snapshot_file, extract_branches),
+    }
+
+def extract_cerebro_from_file(snapshot_file: Path) -> Optional[List[Dict[str, Any]]]:
+    """Extrahiert die Cerebro-Artikel einer Datei; None, wenn es keine Cerebro-Seite ist."""
+    if not is_cerebro_page(snapshot_file):
+        return None
+    return extract_from_file(snapshot_file, extract_cerebro_articles)
+
 def main():
     """Hauptfunktion zum Extrahieren aller Daten."""
+    parser = argparse.ArgumentParser(description="Extrahiert alle Daten aus den Intranet-Snapshots.")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Anzahl Prozesse für die Suche nach Cerebro-Seiten (Standard: 1 = seriell)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Snapshot-Cache weder lesen noch schreiben")
+    parser.add_argument('--rebuild-cache', action='store_true',
+                        help="Alle Snapshots neu parsen und den Cache neu aufbauen")
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    
     print("Starte Extraktion der Intranet-Daten...")
+    metrics = RunMetrics("extract_all_data", args.profile)
+    cache = SnapshotCache(CACHE_FILE, source_fingerprint([__file__, snapshot_scanner.__file__, keyword_matcher.__file__,
+                                               snapshot_patterns.__file__]),
+                          enabled=not args.no_cache, rebuild=args.rebuild_cache)
     
     all_users = []
     all_branches = []
@@ -165,45 +118,35 @@ def main():
     settings_file = BROWSER_LOGS_DIR / "snapshot-2025-11-06T05-47-28-735Z.log"
     if settings_file.exists():
         print(f"Verarbeite Settings: {settings_file.name}")
-        with open(settings_file, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
-        users = extract_users_from_settings(content)
-        all_users.extend(users)
-        branches = extract_branches(content)
-        all_branches.extend(branches)
+        for _, extracted, error in cache.process([settings_file], extract_settings_from_file, metrics=metrics):
+            if error is not None:
+                raise error
+            all_users.extend(extracted["users"])
+            all_branches.extend(extracted["branches"])
     
     # Hauptseite für Requests
     main_file = BROWSER_LOGS_DIR / "snapshot-2025-11-06T05-48-43-131Z.log"
     if main_file.exists():
         print(f"Verarbeite Hauptseite: {main_file.name}")
-        with open(main_file, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
-        requests = extract_requests(content)
-        all_requests.extend(requests)
-        branches = extract_branches(content)
-        all_branches.extend(branches)
+        for _, extracted, error in cache.process([main_file], extract_main_from_file, metrics=metrics):
+            if error is not None:
+                raise error
+            all_requests.extend(extracted["requests"])
+            all_branches.extend(extracted["branches"])
     
     # Cerebro-Seite für Artikel - durchsuche alle Dateien
     cerebro_files = list(BROWSER_LOGS_DIR.glob("snapshot-*.log"))
-    for cerebro_file in cerebro_files:
-        try:
-            with open(cerebro_file, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-            # Prüfe ob es eine Cerebro-Seite ist
-            if 'Online Check-in' in content or 'Emergencie' in content or 'KeePa' in content:
-                print(f"Verarbeite Cerebro-Seite: {cerebro_file.name}")
-                articles = extract_cerebro_articles(content)
-                all_cerebro_articles.extend(articles)
-        except Exception as e:
-            pass  # Überspringe Fehler
+    for cerebro_file, articles, error in cache.process(cerebro_files, extract_cerebro_from_file, args.workers, metrics):
+        # Überspringe Fehler und Dateien, die keine Cerebro-Seite sind
+        if error is None and articles is not None:
+            print(f"Verarbeite Cerebro-Seite: {cerebro_file.name}")
+            all_cerebro_articles.extend(articles)
     
-    # Entferne Duplikate
-    unique_users = []
-    seen_usernames = set()
-    for user in all_users:
-        if user['username'] not in seen_usernames:
-            seen_usernames.add(user['username'])
-            unique_users.append(user)
+    cache.save()
+    print(cache.summary())
+    
+    # Entferne Duplikate (User mit Last Day haben Vorrang)
+    unique_users = merge_users([all_users])
     
     unique_branches = list(set(all_branches))
     unique_roles = list(set(all_roles))
@@ -218,20 +161,18 @@ def main():
     unique_users.sort(key=lambda x: x['username'].lower())
     
     # Speichere Ergebnisse
-    with open(OUTPUT_DIR / "users.json", 'w', encoding='utf-8') as f:
-        json.dump(unique_users, f, indent=2, ensure_ascii=False)
-    
-    with open(OUTPUT_DIR / "branches.json", 'w', encoding='utf-8') as f:
-        json.dump(unique_branches, f, indent=2, ensure_ascii=False)
-    
-    with open(OUTPUT_DIR / "roles.json", 'w', encoding='utf-8') as f:
-        json.dump(unique_roles, f, indent=2, ensure_ascii=False)
-    
-    with open(OUTPUT_DIR / "requests.json", 'w', encoding='utf-8') as f:
-        json.dump(all_requests, f, indent=2, ensure_ascii=False)
-    
-    with open(OUTPUT_DIR / "cerebro_articles.json", 'w', encoding='utf-8') as f:
-        json.dump(unique_cerebro, f, indent=2, ensure_ascii=False)
+    outputs = [
+        ("users.json", unique_users),
+        ("branches.json", unique_branches),
+        ("roles.json", unique_roles),
+        ("requests.json", all_requests),
+        ("cerebro_articles.json", unique_cerebro),
+    ]
+    for filename, records in outputs:
+        with metrics.stage(f"write_{filename}", rows_in=len(records)) as stage:
+            with open(OUTPUT_DIR / filename, 'w', encoding='utf-8') as f:
+                json.dump(records, f, indent=2, ensure_ascii=False)
+            stage.add_rows(rows_out=len(records))
     
     print(f"\nExtrahierte Daten:")
     print(f"- User: {len(unique_users)}")
@@ -241,6 +182,9 @@ def main():
     print(f"- Cerebro Artikel: {len(unique_cerebro)}")
     print(f"\nDaten gespeichert in: {OUTPUT_DIR}")
     
+    metrics.print_summary(metrics.save(RUN_REPORT_FILE))
+    print(f"Laufzeit-Bericht: {RUN_REPORT_FILE}")
+    
     # Zeige Beispiele
     print("\nBeispiele:")
     print(f"\nErste 5 User:")
@@ -4,102 +4,113 @@ Skript zum Extrahieren aller Daten aus dem alten Intranet-System
 für den Import in das neue System.
 """
 
+import argparse
 import json
-import re
 import os
+import traceback
 from pathlib import Path
 from typing import Dict, List, Any, Set
 
+import keyword_matcher
+import snapshot_patterns
+import snapshot_scanner
+from keyword_matcher import BRANCH_MATCHER, CEREBRO_NAV_MATCHER, CEREBRO_NAV_PREFIX
+from run_metrics import RunMetrics, add_profile_argument
+from snapshot_cache import SnapshotCache, source_fingerprint
+from snapshot_patterns import (INVALID_OPTION_NAMES, OPTION_USERNAME_PATTERN, REQUEST_NAME_PATTERN, ROLE_OPTION_PATTERN,
+                               split_user_last_day, split_user_name)
+from snapshot_scanner import SnapshotExtractor, SnapshotNode, scan_snapshot, scan_snapshot_file
+
 # Pfade
 BROWSER_LOGS_DIR = Path(r"C:\Users\patri\.cursor\browser-logs")
 OUTPUT_DIR = Path("extracted_data")
+CACHE_FILE = OUTPUT_DIR / ".cache_extract_intranet_data.json"
+# Laufzeit-Bericht pro Stufe/Snapshot-Datei (neben extracted_data/)
+RUN_REPORT_FILE = Path("extract_intranet_data_run.json")
 
-def extract_requests_from_snapshot(snapshot_content: str) -> List[Dict[str, Any]]:
-    """Extrahiert alle Requests aus einem Snapshot."""
-    requests = []
-    
-    # Suche nach Request-Zeilen im Snapshot
-    # Pattern: role: row mit Request-Daten
-    lines = snapshot_content.split('\n')
-    
-    # Finde alle Request-Zeilen die wie folgt aussehen:
-    # name: "Request Titel User1 User2 Status Datum ..."
-    pattern = r'name:\s*"([^"]+)"'
-    
-    for i, line in enumerate(lines):
-        if 'role: row' in line and 'name:' in line:
-            # Versuche Request-Daten zu extrahieren
-            match = re.search(pattern, line)
-            if match:
-                request_text = match.group(1)
-                # Zerlege den Request-Text
-                parts = request_text.split('  ')
-                if len(parts) >= 4:
-                    # Typisches Format: "Titel User1 User2 Status Datum"
-                    request = {
-                        "title": parts[0] if parts[0] else "",
-                        "requested_by": parts[1] if len(parts) > 1 else "",
-                        "responsible": parts[2] if len(parts) > 2 else "",
-                        "status": parts[3] if len(parts) > 3 else "",
-                        "date": parts[4] if len(parts) > 4 else "",
-                        "raw_text": request_text
-                    }
-                    requests.append(request)
-    
-    return requests
+class RequestExtractor(SnapshotExtractor):
+    """Extrahiert Requests aus row-Knoten."""
 
-def extract_users_from_snapshot(snapshot_content: str) -> List[Dict[str, Any]]:
-    """Extrahiert alle User aus einem Snapshot."""
-    users = []
-    seen_users: Set[str] = set()
+    def __init__(self):
+        self.requests: List[Dict[str, Any]] = []
+
+    def feed(self, node: SnapshotNode):
+        if node.role != 'row' or not node.name:
+            return
+        match = REQUEST_NAME_PATTERN.match(node.name)
+        if not match:
+            return
+        request_text = match.group(1)
+        # Zerlege den Request-Text
+        parts = request_text.split('  ')
+        if len(parts) >= 4:
+            # Typisches Format: "Titel User1 User2 Status Datum"
+            self.requests.append({
+                "title": parts[0] if parts[0] else "",
+                "requested_by": parts[1] if len(parts) > 1 else "",
+                "responsible": parts[2] if len(parts) > 2 else "",
+                "status": parts[3] if len(parts) > 3 else "",
+                "date": parts[4] if len(parts) > 4 else "",
+                "raw_text": request_text
+            })
+
+    def result(self) -> List[Dict[str, Any]]:
+        return self.requests
+
+class UserExtractor(SnapshotExtractor):
+    """
+    Extrahiert User aus den Knoten-Namen.
     
-    # Verwende findall statt finditer für bessere Performance bei großen Dateien
-    # Pattern 1: User mit vollständigem Namen: "Name (username)"
-    pattern1 = r'name:\s*([^(]+)\s*\(([^)]+)\)'
-    matches1 = re.findall(pattern1, snapshot_content)
-    for full_name, username in matches1:
-        full_name = full_name.strip()
-        username = username.strip()
-        if username and username not in seen_users:
-            seen_users.add(username)
-            users.append({
-                "username": username,
-                "full_name": full_name,
+    Die Reihenfolge entspricht den drei bisherigen Durchläufen: erst alle
+    "Name (username)", dann alle mit "| Last day:", dann einfache Usernamen aus
+    option-Elementen.
+    """
+
+    def __init__(self):
+        self.with_name: List[Dict[str, Any]] = []
+        self.with_last_day: List[Dict[str, Any]] = []
+        self.option_usernames: List[str] = []
+
+    def feed(self, node: SnapshotNode):
+        if not node.name:
+            return
+        
+        # Pattern 1: User mit vollständigem Namen: "Name (username)"
+        parts = split_user_name(node.name)
+        if parts:
+            full_name, username = parts
+            self.with_name.append({
+                "username": username.strip(),
+                "full_name": full_name.strip(),
                 "last_day": None
             })
-    
-    # Pattern 2: User mit Last Day: "Name (username) | Last day: YYYY-MM-DD"
-    pattern2 = r'name:\s*([^|]+)\s*\(([^)]+)\)\s*\|\s*Last\s+day:\s*(\d{4}-\d{2}-\d{2})'
-    matches2 = re.findall(pattern2, snapshot_content, re.IGNORECASE)
-    for full_name, username, last_day in matches2:
-        full_name = full_name.strip()
-        username = username.strip()
-        last_day = last_day.strip()
-        if username and username not in seen_users:
-            seen_users.add(username)
-            users.append({
-                "username": username,
-                "full_name": full_name,
+        
+        # Pattern 2: User mit Last Day: "Name (username) | Last day: YYYY-MM-DD"
+        parts = split_user_last_day(node.name)
+        if parts:
+            full_name, username, last_day = parts
+            self.with_last_day.append({
+                "username": username.strip(),
+                "full_name": full_name.strip(),
                 "last_day": last_day
             })
-    
-    # Pattern 3: Einfache Usernamen in option-Elementen (nur wenn Datei klein genug)
-    if len(snapshot_content) < 500000:  # Nur bei kleineren Dateien
-        pattern3 = r'role:\s*option\s*\n\s*name:\s*([A-Za-z0-9_][A-Za-z0-9_\s]*[A-Za-z0-9_])'
-        invalid_names = {
-            'Select', 'Choose', 'Select User', 'Public', 'Private', 'Approval', 'Approved',
-            'Branch', 'Role', 'Setting', 'Logout', 'Dashboard', 'Worktracker',
-            'Who\'s working?', 'Work Report', 'Cerebro', 'Toggle navigation',
-            'Logo', 'Save', 'Edit request', 'Request Description', 'Request:',
-            'Description:', 'Requested by:', 'Responsible:', 'Due Date:',
-            'Create To Do:', 'on', 'off', 'Alianza Paisa', 'Alianza Pai a',
-            'Manila', 'Nowhere', 'Parque Poblado'
-        }
         
-        matches3 = re.findall(pattern3, snapshot_content, re.MULTILINE)
-        for username in matches3:
-            username = username.strip()
-            if username and len(username) > 1 and username not in invalid_names:
+        # Pattern 3: Einfache Usernamen in option-Elementen
+        if node.role == 'option':
+            match = OPTION_USERNAME_PATTERN.match(node.name)
+            if match:
+                self.option_usernames.append(match.group(0).strip())
+
+    def result(self) -> List[Dict[str, Any]]:
+        users = []
+        seen_users: Set[str] = set()
+        for user in self.with_name + self.with_last_day:
+            if user['username'] and user['username'] not in seen_users:
+                seen_users.add(user['username'])
+                users.append(user)
+        
+        for username in self.option_usernames:
+            if username and len(username) > 1 and username not in INVALID_OPTION_NAMES:
                 if username not in seen_users:
                     seen_users.add(username)
                     users.append({
@@ -107,86 +118,129 @@ def extract_users_from_snapshot(snapshot_content: str) -> List[Dict[str, Any]]:
                         "full_name": None,
                         "last_day": None
                     })
-    
-    return users
+        
+        return users
+
+class BranchExtractor(SnapshotExtractor):
+    """Extrahiert alle Branches (Standorte), die irgendwo im Snapshot vorkommen."""
+
+    def __init__(self):
+        self.found: Set[str] = set()
+
+    def feed(self, node: SnapshotNode):
+        if len(self.found) == len(BRANCH_MATCHER.canonical_names):
+            return
+        for line in node.lines:
+            # Fehlerhafte Schreibweisen ("Alianza Pai a") liefern direkt den kanonischen Namen
+            self.found.update(BRANCH_MATCHER.find_all(line))
+
+    def result(self) -> List[str]:
+        return BRANCH_MATCHER.in_canonical_order(self.found)
+
+class RoleExtractor(SnapshotExtractor):
+    """Extrahiert Rollen aus option-Knoten."""
+
+    def __init__(self):
+        self.roles: List[str] = []
+
+    def feed(self, node: SnapshotNode):
+        if node.role != 'option' or not node.name:
+            return
+        match = ROLE_OPTION_PATTERN.match(node.name)
+        if match and match.group(1) not in self.roles:
+            self.roles.append(match.group(1))
+
+    def result(self) -> List[str]:
+        return self.roles
+
+class CerebroArticleExtractor(SnapshotExtractor):
+    """Extrahiert Cerebro-Artikel aus Navigations-Elementen (name: [Artikel-Name])."""
+
+    def __init__(self):
+        self.found: Set[str] = set()
+
+    def feed(self, node: SnapshotNode):
+        if len(self.found) == len(CEREBRO_NAV_MATCHER.canonical_names):
+            return
+        # Wie das frühere r'name:\s*(...)' irgendwo im Text des Knotens. Leerraum wird
+        # zusammengefasst, damit z.B. "Servicio  de Desayuno" passt
+        text = ' '.join(node.text.split()).lower()
+        if CEREBRO_NAV_PREFIX not in text:
+            return
+        for start, title in CEREBRO_NAV_MATCHER.finditer(text):
+            if text[:start].rstrip().endswith(CEREBRO_NAV_PREFIX):
+                self.found.add(title)
+
+    def result(self) -> List[Dict[str, Any]]:
+        # Reihenfolge der bekannten Artikel, Titel immer in kanonischer Schreibweise
+        return [{"title": title} for title in CEREBRO_NAV_MATCHER.in_canonical_order(self.found)]
+
+def extract_requests_from_snapshot(snapshot_content: str) -> List[Dict[str, Any]]:
+    """Extrahiert alle Requests aus einem Snapshot."""
+    return scan_snapshot(snapshot_content.splitlines(), [RequestExtractor()])[0]
+
+def extract_users_from_snapshot(snapshot_content: str) -> List[Dict[str, Any]]:
+    """Extrahiert alle User aus einem Snapshot."""
+    return scan_snapshot(snapshot_content.splitlines(), [UserExtractor()])[0]
 
 def extract_branches_from_snapshot(snapshot_content: str) -> List[str]:
     """Extrahiert alle Branches (Standorte) aus einem Snapshot."""
-    branches = []
-    seen_branches: Set[str] = set()
-    
-    # Bekannte Branches
-    known_branches = [
-        'Alianza Paisa',
-        'Alianza Pai a',  # Fehlerhafte Schreibweise von "Alianza Paisa"
-        'Manila',
-        'Nowhere',
-        'Parque Poblado'
-    ]
-    
-    for branch in known_branches:
-        if branch in snapshot_content:
-            # Normalisiere "Alianza Pai a" zu "Alianza Paisa"
-            normalized = 'Alianza Paisa' if branch == 'Alianza Pai a' else branch
-            if normalized not in seen_branches:
-                seen_branches.add(normalized)
-                branches.append(normalized)
-    
-    return branches
+    return scan_snapshot(snapshot_content.splitlines(), [BranchExtractor()])[0]
 
 def extract_roles_from_snapshot(snapshot_content: str) -> List[str]:
     """Extrahiert alle Rollen aus einem Snapshot."""
-    roles = []
-    # Rollen müssen aus den Dropdowns oder einer speziellen Seite extrahiert werden
-    # Typische Rollen könnten sein: Admin, Manager, Staff, etc.
-    # Suche nach Role-Optionen
-    
-    # Bekannte Rollen-Patterns (müssen angepasst werden basierend auf den tatsächlichen Daten)
-    role_patterns = [
-        r'role:\s*option\s*\n\s*name:\s*(Admin|Manager|Staff|Employee|Supervisor)',
-    ]
-    
-    for pattern in role_patterns:
-        matches = re.finditer(pattern, snapshot_content, re.MULTILINE | re.IGNORECASE)
-        for match in matches:
-            role = match.group(1)
-            if role and role not in roles:
-                roles.append(role)
-    
-    return roles
+    return scan_snapshot(snapshot_content.splitlines(), [RoleExtractor()])[0]
 
 def extract_cerebro_articles_from_snapshot(snapshot_content: str) -> List[Dict[str, Any]]:
     """Extrahiert alle Cerebro-Artikel aus einem Snapshot."""
-    articles = []
-    
-    # Suche nach Navigations-Elementen mit Artikel-Namen
-    # Pattern: name: [Artikel-Name]
-    article_patterns = [
-        r'name:\s*(Online Check-in)',
-        r'name:\s*(Online Check-out)',
-        r'name:\s*(Emergencie[s]?)',
-        r'name:\s*(Recepcion:?\s*First\s+day)',
-        r'name:\s*(KeePa|Keepa)',
-        r'name:\s*(Servicio\s+de\s+Desayuno)',
-    ]
-    
-    seen_titles: Set[str] = set()
-    
-    for pattern in article_patterns:
-        matches = re.finditer(pattern, snapshot_content, re.IGNORECASE)
-        for match in matches:
-            title = match.group(1).strip()
-            if title and title not in seen_titles:
-                seen_titles.add(title)
-                articles.append({"title": title})
-    
-    return articles
+    return scan_snapshot(snapshot_content.splitlines(), [CerebroArticleExtractor()])[0]
+
+def _all_extractors() -> List[SnapshotExtractor]:
+    return [UserExtractor(), BranchExtractor(), RoleExtractor(), RequestExtractor(), CerebroArticleExtractor()]
+
+def _extraction_result(results: List[Any]) -> Dict[str, List[Any]]:
+    users, branches, roles, requests, cerebro = results
+    return {
+        "users": users,
+        "branches": branches,
+        "roles": roles,
+        "requests": requests,
+        "cerebro": cerebro,
+    }
+
+def extract_all_from_snapshot(snapshot_content: str) -> Dict[str, List[Any]]:
+    """
+    Extrahiert User, Branches, Rollen, Requests und Cerebro-Artikel in einem
+    einzigen Durchlauf über den Snapshot.
+    """
+    return _extraction_result(scan_snapshot(snapshot_content.splitlines(), _all_extractors()))
+
+def extract_all_from_file(snapshot_file: Path) -> Dict[str, List[Any]]:
+    """
+    Wie extract_all_from_snapshot, liest die Datei aber blockweise per mmap.
+    Der Speicherbedarf hängt nicht von der Dateigröße ab.
+    """
+    return _extraction_result(scan_snapshot_file(snapshot_file, _all_extractors()))
 
 def main():
     """Hauptfunktion zum Extrahieren aller Daten."""
+    parser = argparse.ArgumentParser(description="Extrahiert Intranet-Daten aus Browser-Snapshots.")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Anzahl Prozesse für die Snapshot-Dateien (Standard: 1 = seriell)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Snapshot-Cache weder lesen noch schreiben")
+    parser.add_argument('--rebuild-cache', action='store_true',
+                        help="Alle Snapshots neu parsen und den Cache neu aufbauen")
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    
     print("Starte Extraktion der Intranet-Daten...")
+    metrics = RunMetrics("extract_intranet_data", args.profile)
     
     OUTPUT_DIR.mkdir(exist_ok=True)
+    cache = SnapshotCache(CACHE_FILE, source_fingerprint([__file__, snapshot_scanner.__file__, keyword_matcher.__file__,
+                                               snapshot_patterns.__file__]),
+                          enabled=not args.no_cache, rebuild=args.rebuild_cache)
     
     all_users = []
     all_branches = []
@@ -198,44 +252,36 @@ def main():
     snapshot_files = list(BROWSER_LOGS_DIR.glob("snapshot-*.log"))
     print(f"Gefundene Snapshot-Dateien: {len(snapshot_files)}")
     
-    # Sortiere nach Dateigröße, verarbeite kleinere zuerst
+    # Sortiere nach Dateigröße, Ergebnisse werden von klein nach groß zusammengeführt
     snapshot_files_sorted = sorted(snapshot_files, key=lambda p: p.stat().st_size)
+    if args.workers > 1:
+        print(f"Parallel mit {args.workers} Prozessen")
     
-    for snapshot_file in snapshot_files_sorted:
+    # Extrahiere alle Daten in einem Durchlauf pro Datei (auch große Dateien, blockweise gelesen),
+    # unveränderte Dateien kommen aus dem Cache
+    results = cache.process(snapshot_files_sorted, extract_all_from_file, args.workers, metrics)
+    for snapshot_file, extracted, error in results:
         file_size = snapshot_file.stat().st_size
         print(f"Verarbeite: {snapshot_file.name} ({file_size / 1024:.1f} KB)")
         
-        # Überspringe sehr große Dateien zunächst (nur bei Bedarf)
-        if file_size > 1000000:  # > 1MB
-            print(f"  Überspringe sehr große Datei vorerst...")
+        if error is not None:
+            print(f"Fehler beim Verarbeiten von {snapshot_file.name}: {error}")
+            traceback.print_exception(type(error), error, error.__traceback__)
             continue
-            
-        try:
-            with open(snapshot_file, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-            
-            # Extrahiere Daten
-            users = extract_users_from_snapshot(content)
-            all_users.extend(users)
-            print(f"  Gefunden: {len(users)} User")
-            
-            branches = extract_branches_from_snapshot(content)
-            all_branches.extend(branches)
-            
-            roles = extract_roles_from_snapshot(content)
-            all_roles.extend(roles)
-            
-            requests = extract_requests_from_snapshot(content)
-            all_requests.extend(requests)
-            print(f"  Gefunden: {len(requests)} Requests")
-            
-            cerebro = extract_cerebro_articles_from_snapshot(content)
-            all_cerebro_articles.extend(cerebro)
-            
-        except Exception as e:
-            print(f"Fehler beim Verarbeiten von {snapshot_file.name}: {e}")
-            import traceback
-            traceback.print_exc()
+        
+        all_users.extend(extracted["users"])
+        print(f"  Gefunden: {len(extracted['users'])} User")
+        
+        all_branches.extend(extracted["branches"])
+        all_roles.extend(extracted["roles"])
+        
+        all_requests.extend(extracted["requests"])
+        print(f"  Gefunden: {len(extracted['requests'])} Requests")
+        
+        all_cerebro_articles.extend(extracted["cerebro"])
+    
+    cache.save()
+    print(cache.summary())
     
     # Entferne Duplikate
     unique_users = []
@@ -255,20 +301,18 @@ def main():
             unique_cerebro.append(article)
     
     # Speichere Ergebnisse
-    with open(OUTPUT_DIR / "users.json", 'w', encoding='utf-8') as f:
-        json.dump(unique_users, f, indent=2, ensure_ascii=False)
-    
-    with open(OUTPUT_DIR / "branches.json", 'w', encoding='utf-8') as f:
-        json.dump(unique_branches, f, indent=2, ensure_ascii=False)
-    
-    with open(OUTPUT_DIR / "roles.json", 'w', encoding='utf-8') as f:
-        json.dump(unique_roles, f, indent=2, ensure_ascii=False)
-    
-    with open(OUTPUT_DIR / "requests.json", 'w', encoding='utf-8') as f:
-        json.dump(all_requests, f, indent=2, ensure_ascii=False)
-    
-    with open(OUTPUT_DIR / "cerebro_articles.json", 'w', encoding='utf-8') as f:
-        json.dump(unique_cerebro, f, indent=2, ensure_ascii=False)
+    outputs = [
+        ("users.json", unique_users),
+        ("branches.json", unique_branches),
+        ("roles.json", unique_roles),
+        ("requests.json", all_requests),
+        ("cerebro_articles.json", unique_cerebro),
+    ]
+    for filename, records in outputs:
+        with metrics.stage(f"write_{filename}", rows_in=len(records)) as stage:
+            with open(OUTPUT_DIR / filename, 'w', encoding='utf-8') as f:
+                json.dump(records, f, indent=2, ensure_ascii=False)
+            stage.add_rows(rows_out=len(records))
     
     print(f"\nExtrahierte Daten:")
     print(f"- User: {len(unique_users)}")
@@ -277,6 +321,9 @@ def main():
     print(f"- Requests: {len(all_requests)}")
     print(f"- Cerebro Artikel: {len(unique_cerebro)}")
     print(f"\nDaten gespeichert in: {OUTPUT_DIR}")
+    
+    metrics.print_summary(metrics.save(RUN_REPORT_FILE))
+    print(f"Laufzeit-Bericht: {RUN_REPORT_FILE}")
 
 if __name__ == "__main__":
     main()
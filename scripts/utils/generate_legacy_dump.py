@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Erzeugt synthetische Exporte der alten Intranet-Datenbank im phpMyAdmin-JSON-Format.
+
+Die Tabellen und Spalten entsprechen lafamili_sopl771.json (intra_users,
+intra_tasks, intra_requests, intra_cerebro, intra_users_branches,
+intra_users_roles und die Lookup-Tabellen), so dass prepare_import.py und
+benchmark_prepare_import.py damit in beliebiger Größe laufen können.
+
+Einstellbar sind die Gesamtzahl der Zeilen sowie der Anteil der Textwerte mit
+Mojibake (UTF-8 als Latin-1 gelesen, z.B. 'JosÃ©'), mit Emojis und mit
+ungültigen Datumswerten ('0000-00-00'). Zeilen werden direkt in die Datei
+geschrieben, auch 10 Mio. Zeilen brauchen daher kaum Speicher.
+
+Beispiel:
+    python generate_legacy_dump.py --rows 100000 --output /tmp/dump_100k.json
+    python generate_legacy_dump.py --rows 1000000 --mojibake-rate 0.3 --emoji-rate 0.05
+"""
+
+import argparse
+import json
+import random
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Tuple
+
+DATABASE_NAME = "lafamili_sopl771"
+
+# Anteile an der Gesamtzahl der Zeilen (Rest: Zuordnungstabellen)
+TABLE_SHARES = {
+    'intra_users': 0.02,
+    'intra_tasks': 0.44,
+    'intra_requests': 0.44,
+    'intra_cerebro': 0.02,
+}
+MIN_USERS = 10
+
+BRANCHES = ['Nowhere', 'Manila', 'Parque Poblado', 'Alianza Paisa']
+ROLES = ['Admin', 'Recepción', 'Limpieza', 'Manager', 'Mantenimiento']
+FIRST_NAMES = ['José', 'María', 'Ana', 'Peter', 'Zoë', 'Jürgen', 'Camila', 'Andrés', 'Sofía', 'Noël']
+LAST_NAMES = ['Pérez', 'Müller', 'Gómez', 'Núñez', 'Ammann', 'López', 'Castaño', 'Schön', 'Ríos']
+WORDS = ['limpiar', 'baño', 'habitación', 'recepción', 'check-in', 'desayuno', 'toallas', 'llaves',
+         'Schlüssel', 'pedido', 'lavandería', 'café', 'mañana', 'revisión', 'piscina', 'jardín']
+EMOJIS = ['😀', '👍', '🏨', '🧹', '✅', '🔑', '☕', '🎉']
+
+def mojibake(text: str) -> str:
+    """UTF-8-Bytes als Latin-1 gelesen (wie im alten Export)."""
+    return text.encode('utf-8').decode('latin-1')
+
+class _TextFactory:
+    """Erzeugt Texte mit den gewünschten Anteilen an Mojibake, Emojis und ungültigen Daten."""
+
+    def __init__(self, rng: random.Random, mojibake_rate: float, emoji_rate: float, invalid_date_rate: float):
+        self.rng = rng
+        self.mojibake_rate = mojibake_rate
+        self.emoji_rate = emoji_rate
+        self.invalid_date_rate = invalid_date_rate
+
+    def text(self, words: int) -> str:
+        rng = self.rng
+        value = ' '.join(rng.choice(WORDS) for _ in range(words))
+        if rng.random() < self.mojibake_rate:
+            value = mojibake(value)
+        # Emojis bleiben korrekt kodiert: zusammen mit Mojibake ein gemischter String
+        if rng.random() < self.emoji_rate:
+            value = f"{value} {rng.choice(EMOJIS)}"
+        return value
+
+    def name(self, names: List[str]) -> str:
+        value = self.rng.choice(names)
+        return mojibake(value) if self.rng.random() < self.mojibake_rate else value
+
+    def date(self, with_time: bool) -> str:
+        rng = self.rng
+        if rng.random() < self.invalid_date_rate:
+            return '0000-00-00 00:00:00' if with_time else '0000-00-00'
+        value = f"20{rng.randint(15, 24):02d}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+        if with_time:
+            value += f" {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}"
+        return value
+
+def _lookup_tables() -> Dict[str, List[Dict]]:
+    return {
+        'intra_branches': [
+            {"branch_id": str(i), "branch_name": name, "branch_direction": None} for i, name in enumerate(BRANCHES)
+        ],
+        'intra_roles': [{"role_id": str(i), "role_desc": name} for i, name in enumerate(ROLES)],
+        'intra_banks': [{"bank_id": "1", "bank_name": "Bancolombia"}, {"bank_id": "2", "bank_name": "Davivienda"}],
+        'intra_bats': [{"bat_id": "1", "bat_desc": "Ahorros"}, {"bat_id": "2", "bat_desc": "Corriente"}],
+        'intra_contract_type': [
+            {"contract_type_id": "1", "contract_type_desc": "Tiempo completo"},
+            {"contract_type_id": "2", "contract_type_desc": "Medio tiempo"},
+        ],
+    }
+
+def _users(count: int, texts: _TextFactory) -> Iterator[Dict]:
+    rng = texts.rng
+    for i in range(1, count + 1):
+        yield {
+            "id": str(i),
+            "username": f"user{i}",
+            "password": "$2y$10$" + ''.join(rng.choice('abcdefghijklmnopqrstuvwxyz./0123456789') for _ in range(53)),
+            "firstname": texts.name(FIRST_NAMES),
+            "lastname": texts.name(LAST_NAMES),
+            "birthday": texts.date(False),
+            "bank": str(rng.randint(0, 2)),
+            "ban": str(rng.randint(10 ** 9, 10 ** 10)),
+            "bat": str(rng.randint(1, 2)),
+            "contract_type": str(rng.randint(0, 2)),
+            "active_from": texts.date(False),
+            "active_to": texts.date(False),
+            "salary": rng.choice(['0', str(rng.randint(1000, 5000)), f"{rng.randint(1000, 5000)}.50"]),
+            "idnr": str(rng.randint(10 ** 7, 10 ** 8)),
+            "branch": str(rng.randrange(len(BRANCHES))),
+            "role": str(rng.randrange(len(ROLES))),
+        }
+
+def _tasks(count: int, users: int, requests: int, texts: _TextFactory) -> Iterator[Dict]:
+    rng = texts.rng
+    for i in range(1, count + 1):
+        yield {
+            "task_id": str(i),
+            "task": texts.text(4),
+            "task_desc": texts.text(12),
+            "task_desc_ext": texts.text(20) if rng.random() < 0.2 else None,
+            "status": str(rng.randint(1, 6)),
+            "user_id": str(rng.randint(1, users)),
+            "qc_id": str(rng.randint(0, users)),
+            "branch_id": str(rng.randrange(len(BRANCHES))),
+            "role": str(rng.randrange(len(ROLES))),
+            "due_date": texts.date(rng.random() < 0.5),
+            "started_at": texts.date(True),
+            "request_id": str(rng.randint(1, requests)) if requests and rng.random() < 0.3 else "0",
+        }
+
+def _requests(count: int, users: int, texts: _TextFactory) -> Iterator[Dict]:
+    rng = texts.rng
+    statuses = ['1', '2', '3', '4', '5', '6', '7', '8', '999']
+    for i in range(1, count + 1):
+        yield {
+            "request_id": str(i),
+            "request": texts.text(5),
+            "request_desc": texts.text(15) if rng.random() < 0.7 else None,
+            "status": rng.choice(statuses),
+            "requested_by": str(rng.randint(1, users)),
+            "responsible": str(rng.randint(1, users)),
+            "branch_id": str(rng.randrange(len(BRANCHES))),
+            "due_date": texts.date(True),
+            "task_id": rng.choice(["0", str(rng.randint(1, 1000))]),
+        }
+
+def _cerebro(count: int, texts: _TextFactory) -> Iterator[Dict]:
+    rng = texts.rng
+    for i in range(1, count + 1):
+        author = texts.name(FIRST_NAMES)
+        if rng.random() < 0.5:
+            author = f"{author} {texts.name(LAST_NAMES)}"
+        yield {
+            "id": str(i),
+            "cerebro_title": f"{texts.text(3)} {i}",
+            "cerebro_content": texts.text(rng.randint(50, 300)),
+            "cerebro_author": author,
+            "cerebro_created_at": texts.date(True),
+        }
+
+def _assignments(users: int, targets: int, column: str, rng: random.Random) -> Iterator[Dict]:
+    row_id = 0
+    for user_id in range(1, users + 1):
+        for target in rng.sample(range(targets), rng.randint(1, min(3, targets))):
+            row_id += 1
+            yield {"id": str(row_id), "user_id": str(user_id), column: str(target)}
+
+def table_sizes(rows: int) -> Dict[str, int]:
+    """Zeilen pro großer Tabelle für eine Gesamtgröße von ungefähr `rows` Zeilen."""
+    sizes = {name: int(rows * share) for name, share in TABLE_SHARES.items()}
+    sizes['intra_users'] = max(MIN_USERS, sizes['intra_users'])
+    return sizes
+
+def _write_table(f, name: str, rows: Iterator[Dict], first: bool) -> int:
+    f.write('\n' if first else '\n,')
+    f.write(json.dumps({"type": "table", "name": name, "database": DATABASE_NAME}, ensure_ascii=False)[:-1])
+    f.write(',"data":\n[')
+    count = 0
+    for row in rows:
+        f.write('\n' if count == 0 else ',\n')
+        f.write(json.dumps(row, ensure_ascii=False))
+        count += 1
+    f.write('\n]\n}')
+    return count
+
+def generate_dump(path: Path, rows: int, mojibake_rate: float = 0.2, emoji_rate: float = 0.02,
+                  invalid_date_rate: float = 0.05, seed: int = 0) -> Dict[str, int]:
+    """
+    Schreibt einen synthetischen Export nach `path` und gibt die Zeilen pro Tabelle zurück.
+
+    Gleicher Seed und gleiche Parameter ergeben dieselbe Datei.
+    """
+    rng = random.Random(seed)
+    texts = _TextFactory(rng, mojibake_rate, emoji_rate, invalid_date_rate)
+    sizes = table_sizes(rows)
+    users = sizes['intra_users']
+
+    tables: List[Tuple[str, Callable[[], Iterator[Dict]]]] = [(name, lambda data=data: iter(data)) for name, data in _lookup_tables().items()]
+    generators: Dict[str, Callable[[], Iterator[Dict]]] = {
+        'intra_users': lambda: _users(users, texts),
+        'intra_tasks': lambda: _tasks(sizes['intra_tasks'], users, sizes['intra_requests'], texts),
+        'intra_requests': lambda: _requests(sizes['intra_requests'], users, texts),
+        'intra_cerebro': lambda: _cerebro(sizes['intra_cerebro'], texts),
+        'intra_users_branches': lambda: _assignments(users, len(BRANCHES), 'branch_id', rng),
+        'intra_users_roles': lambda: _assignments(users, len(ROLES), 'role_id', rng),
+    }
+    tables += list(generators.items())
+
+    counts = {}
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('[')
+        f.write('\n' + json.dumps({"type": "header", "version": "5.2.1",
+                                   "comment": "Export to JSON plugin for PHPMyAdmin"}) + ',')
+        f.write('\n' + json.dumps({"type": "database", "name": DATABASE_NAME}) + ',')
+        for i, (name, make_rows) in enumerate(tables):
+            counts[name] = _write_table(f, name, make_rows(), i == 0)
+        f.write('\n]\n')
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description="Erzeugt einen synthetischen phpMyAdmin-Export der alten Datenbank.")
+    parser.add_argument('--rows', type=int, default=10000, help="Ungefähre Gesamtzahl Zeilen (Standard: 10000)")
+    parser.add_argument('--output', type=Path, default=Path(f"synthetic_{DATABASE_NAME}.json"),
+                        help="Zieldatei (Standard: synthetic_lafamili_sopl771.json)")
+    parser.add_argument('--mojibake-rate', type=float, default=0.2,
+                        help="Anteil der Textwerte mit Mojibake (Standard: 0.2)")
+    parser.add_argument('--emoji-rate', type=float, default=0.02,
+                        help="Anteil der Textwerte mit Emoji (Standard: 0.02)")
+    parser.add_argument('--invalid-date-rate', type=float, default=0.05,
+                        help="Anteil ungültiger Datumswerte wie 0000-00-00 (Standard: 0.05)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    counts = generate_dump(args.output, args.rows, args.mojibake_rate, args.emoji_rate,
+                           args.invalid_date_rate, args.seed)
+    size_mb = args.output.stat().st_size / (1024 * 1024)
+    print(f"[OK] {args.output}: {sum(counts.values())} Zeilen, {size_mb:.1f} MB")
+    for name, count in counts.items():
+        print(f"  {name}: {count}")
+
+if __name__ == "__main__":
+    main()
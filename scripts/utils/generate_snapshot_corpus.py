@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Erzeugt synthetische Browser-Snapshots (snapshot-*.log) im Accessibility-Tree-Format.
+
+Die Snapshots enthalten dieselben Knoten wie die echten Intranet-Seiten:
+User-Optionen "Name (username)" und "Name (username) | Last day: ...",
+Request-Zeilen (role: row), Branch- und Rollen-Optionen, Cerebro-Navigation
+und Füll-Knoten (cell, generic). Die Seite bestimmt die Mischung (settings,
+main, cerebro oder mixed mit allen Knoten).
+
+Mit --adversarial-rate wird ein Anteil der Knoten durch Worst-Case-Zeilen für
+die Extraktoren ersetzt (sehr lange name-Zeilen ohne '(' oder '|', offene
+Klammern, viele '|'-Abschnitte ohne "Last day", nicht geschlossene
+Anführungszeichen). Knoten werden blockweise direkt in die Datei geschrieben,
+auch Snapshots mit mehreren hundert MB brauchen daher kaum Speicher.
+
+Beispiel:
+    python generate_snapshot_corpus.py --sizes 64K 1M 16M --output-dir /tmp/snapshots
+    python generate_snapshot_corpus.py --sizes 200M --page settings --adversarial-rate 0.01
+"""
+
+import argparse
+import random
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+from keyword_matcher import BRANCH_NAMES, CEREBRO_ARTICLE_NAMES
+
+# Knoten pro Schreibvorgang
+WRITE_BATCH_NODES = 1000
+# Länge der langen Zeilen in adversarial Knoten (Zeichen)
+ADVERSARIAL_LINE_LENGTH = 20000
+
+FIRST_NAMES = ['José', 'María', 'Ana', 'Patrick', 'Zoe', 'Jürgen', 'Camila', 'Andrés', 'Sofía', 'Noël']
+LAST_NAMES = ['Pérez', 'Müller', 'Gómez', 'Núñez', 'Ammann', 'López', 'Castaño', 'Ríos']
+ROLES = ['Admin', 'Manager', 'Staff', 'Employee', 'Supervisor']
+STATUSES = ['Approval', 'Approved', 'Denied', 'To improve']
+WORDS = ['Limpiar', 'baño', 'habitación', 'recepción', 'toallas', 'llaves', 'pedido', 'lavandería',
+         'piscina', 'jardín', 'desayuno', 'revisión']
+UI_OPTIONS = ['Select User', 'Public', 'Private', 'Dashboard', 'Worktracker', 'Cerebro', 'Logout']
+
+# Gewichte der Knoten-Arten pro Seite
+PAGE_WEIGHTS: Dict[str, Dict[str, int]] = {
+    'settings': {'user_option': 30, 'user_last_day': 20, 'branch_option': 5, 'role_option': 5,
+                 'ui_option': 10, 'cell': 30},
+    'main': {'request_row': 40, 'user_option': 5, 'branch_option': 5, 'ui_option': 10, 'cell': 40},
+    'cerebro': {'cerebro_nav': 20, 'ui_option': 20, 'generic': 30, 'cell': 30},
+    'mixed': {'user_option': 15, 'user_last_day': 10, 'request_row': 20, 'branch_option': 5,
+              'role_option': 5, 'cerebro_nav': 5, 'ui_option': 10, 'generic': 10, 'cell': 20},
+}
+PAGES = tuple(PAGE_WEIGHTS)
+
+SIZE_UNITS = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+
+def parse_size(value: str) -> int:
+    """'64K', '1M', '1.5G' oder Bytes -> Bytes."""
+    value = value.strip().upper().rstrip('B')
+    if value and value[-1] in SIZE_UNITS:
+        return int(float(value[:-1]) * SIZE_UNITS[value[-1]])
+    return int(value)
+
+def format_size(size_bytes: int) -> str:
+    """Bytes -> kurze Bezeichnung für Dateinamen ('64K', '16M')."""
+    for unit in ('G', 'M', 'K'):
+        if size_bytes >= SIZE_UNITS[unit] and size_bytes % SIZE_UNITS[unit] == 0:
+            return f"{size_bytes // SIZE_UNITS[unit]}{unit}"
+    return str(size_bytes)
+
+class _NodeFactory:
+    """Erzeugt die Knoten eines Snapshots als Text."""
+
+    def __init__(self, rng: random.Random, line_length: int):
+        self.rng = rng
+        self.line_length = line_length
+
+    def _ref(self) -> str:
+        return f"ref-{self.rng.randrange(16 ** 5):05x}"
+
+    def _node(self, role: str, name: str, indent: int = 2) -> str:
+        pad = ' ' * indent
+        return f"{pad}- role: {role}\n{pad}  name: {name}\n{pad}  ref: {self._ref()}\n"
+
+    def _full_name(self) -> str:
+        return f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}"
+
+    def _username(self) -> str:
+        return f"{self.rng.choice(FIRST_NAMES).lower()[:3]}{self.rng.randrange(10000)}"
+
+    def _date(self) -> str:
+        return f"20{self.rng.randint(20, 25)}-{self.rng.randint(1, 12):02d}-{self.rng.randint(1, 28):02d}"
+
+    def user_option(self) -> str:
+        return self._node('option', f"{self._full_name()} ({self._username()})")
+
+    def user_last_day(self) -> str:
+        return self._node('option', f"{self._full_name()} ({self._username()}) | Last day: {self._date()}")
+
+    def request_row(self) -> str:
+        rng = self.rng
+        title = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 4)))
+        text = '  '.join([title, self.rng.choice(FIRST_NAMES), self.rng.choice(FIRST_NAMES),
+                          rng.choice(STATUSES), self._date()])
+        return self._node('row', f'"{text}"')
+
+    def branch_option(self) -> str:
+        return self._node('option', self.rng.choice(list(BRANCH_NAMES)))
+
+    def role_option(self) -> str:
+        return self._node('option', self.rng.choice(ROLES))
+
+    def cerebro_nav(self) -> str:
+        return self._node('link', self.rng.choice(list(CEREBRO_ARTICLE_NAMES)))
+
+    def ui_option(self) -> str:
+        return self._node('option', self.rng.choice(UI_OPTIONS))
+
+    def generic(self) -> str:
+        words = ' '.join(self.rng.choice(WORDS) for _ in range(self.rng.randint(3, 12)))
+        return f"    - role: generic\n      children:\n        - text: {words}\n"
+
+    def cell(self) -> str:
+        return self._node('cell', f'"{self.rng.choice(WORDS)}"', indent=4)
+
+    def adversarial(self) -> str:
+        """Worst-Case-Knoten für Pattern, die bis zum nächsten '(', ')', '|' oder '"' laufen."""
+        rng = self.rng
+        length = self.line_length
+        kind = rng.randrange(4)
+        if kind == 0:
+            # Lange Zeile ohne '(' und '|'
+            return self._node('option', ' '.join('palabra' for _ in range(length // 8)))
+        if kind == 1:
+            # Viele offene Klammern ohne ')'
+            return self._node('option', 'Ana (' * (length // 5))
+        if kind == 2:
+            # Viele "(x) |"-Abschnitte ohne "Last day"
+            return self._node('option', 'Ana (ana) | ' * (length // 12))
+        # Nicht geschlossenes Anführungszeichen in einer Request-Zeile
+        return self._node('row', '"' + '  '.join('Limpiar' for _ in range(length // 9)))
+
+def generate_snapshot(path: Path, size_bytes: int, page: str = 'mixed', adversarial_rate: float = 0.0,
+                      line_length: int = ADVERSARIAL_LINE_LENGTH, seed: int = 0) -> Dict[str, int]:
+    """
+    Schreibt einen Snapshot mit ungefähr size_bytes Bytes (UTF-8).
+
+    Gibt die Anzahl der erzeugten Knoten pro Art zurück.
+    """
+    rng = random.Random(seed)
+    factory = _NodeFactory(rng, line_length)
+    weights = PAGE_WEIGHTS[page]
+    kinds: List[str] = list(weights)
+    builders: Dict[str, Callable[[], str]] = {kind: getattr(factory, kind) for kind in kinds}
+    counts = {kind: 0 for kind in kinds}
+    counts['adversarial'] = 0
+
+    header = b"- role: document\n  name: La Familia Intranet\n"
+    size = len(header)
+    with open(path, 'wb') as f:
+        f.write(header)
+        while size < size_bytes:
+            parts = []
+            for kind in rng.choices(kinds, weights=list(weights.values()), k=WRITE_BATCH_NODES):
+                if adversarial_rate and rng.random() < adversarial_rate:
+                    kind = 'adversarial'
+                    node = factory.adversarial().encode('utf-8')
+                else:
+                    node = builders[kind]().encode('utf-8')
+                parts.append(node)
+                counts[kind] += 1
+                size += len(node)
+                if size >= size_bytes:
+                    break
+            f.write(b''.join(parts))
+    return counts
+
+def generate_corpus(output_dir: Path, sizes: List[int], pages: Tuple[str, ...] = ('mixed',),
+                    adversarial_rate: float = 0.0, seed: int = 0) -> List[Path]:
+    """Erzeugt einen Snapshot pro (Seite, Größe): snapshot-<seite>-<größe>.log."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for page in pages:
+        for size in sizes:
+            suffix = '-adversarial' if adversarial_rate else ''
+            path = output_dir / f"snapshot-{page}-{format_size(size)}{suffix}.log"
+            generate_snapshot(path, size, page, adversarial_rate, seed=seed)
+            paths.append(path)
+    return paths
+
+def main():
+    parser = argparse.ArgumentParser(description="Erzeugt synthetische Browser-Snapshots für die Extraktoren.")
+    parser.add_argument('--sizes', nargs='+', default=['64K', '1M', '16M'],
+                        help="Größen der Snapshots, z.B. 64K 1M 200M (Standard: 64K 1M 16M)")
+    parser.add_argument('--page', choices=PAGES, nargs='+', default=['mixed'],
+                        help="Seiten-Typ (Standard: mixed = alle Knoten-Arten)")
+    parser.add_argument('--adversarial-rate', type=float, default=0.0,
+                        help="Anteil der Worst-Case-Knoten mit langen Zeilen (Standard: 0)")
+    parser.add_argument('--output-dir', type=Path, default=Path("snapshot_corpus"))
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    sizes = [parse_size(size) for size in args.sizes]
+    paths = generate_corpus(args.output_dir, sizes, tuple(args.page), args.adversarial_rate, args.seed)
+    for path in paths:
+        print(f"  {path.name}: {path.stat().st_size / (1024 * 1024):.2f} MB")
+    print(f"\n[OK] {len(paths)} Snapshots in {args.output_dir}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Checkpoints für lange Läufe von prepare_import.py.
+
+Jede abgeschlossene Stufe wird festgehalten: die Lookups aus dem ersten
+Durchlauf über den Export (kleine Tabellen, Zeilenzahlen, Request-IDs, siehe
+read_lookups in prepare_import.py), jede geschriebene Ausgabe (users, tasks,
+...) mit dem Zustand, den der Rest des Laufs braucht (Delta-Manifest,
+Referenz-Zähler, ungültige Datumswerte, User-Spalten).
+Alle Dateien werden über .tmp-Dateien geschrieben und erst danach im Manifest
+(checkpoint.json) eingetragen, ein Abbruch hinterlässt daher nie eine halbe Stufe.
+
+Checkpoints sind optional: prepare_import.py schreibt sie nur mit --checkpoint
+(oder --resume). Mit --resume überspringt prepare_import.py alle abgeschlossenen
+Stufen und beginnt bei der ersten fehlenden neu. Der Checkpoint gilt nur für
+denselben Export (Pfad, Größe, mtime), dieselben Optionen und denselben
+Quelltext; sonst wird neu begonnen. Nach einem erfolgreichen Lauf wird er gelöscht.
+"""
+
+import json
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from snapshot_cache import source_fingerprint
+
+CHECKPOINT_DIR = ".checkpoint"
+CHECKPOINT_MANIFEST_FILE = "checkpoint.json"
+# Stufe mit den Lookups aus dem ersten Durchlauf über den Export
+LOOKUPS_STAGE = 'lookups'
+
+def run_fingerprint(source: Path, options: Dict[str, Any], module_files: Iterable[str]) -> Dict[str, Any]:
+    """Kennzeichnet einen Lauf: Export-Datei, Optionen und Quelltext der Transformationen."""
+    stat = source.stat()
+    return {
+        "source": str(source.resolve()),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "options": options,
+        "code": source_fingerprint(module_files),
+    }
+
+def _write_json_atomic(path: Path, data: Any):
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+    tmp_path.replace(path)
+
+class CheckpointStore:
+    """
+    Checkpoint-Verzeichnis mit Manifest {Stufe: Eintrag}.
+
+    resume=False: ein vorhandener Checkpoint wird verworfen.
+    enabled=False: es wird nichts gelesen oder geschrieben (ohne --checkpoint/--resume).
+    """
+
+    def __init__(self, directory: Path, fingerprint: Dict[str, Any], resume: bool = False, enabled: bool = True):
+        self.directory = directory
+        self.fingerprint = fingerprint
+        self.enabled = enabled
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        # Grund, warum ein vorhandener Checkpoint nicht verwendet wurde (für die Konsolenausgabe)
+        self.discarded: Optional[str] = None
+        if not enabled:
+            return
+        manifest = self._load() if resume else None
+        if manifest is not None and manifest.get("fingerprint") == fingerprint:
+            self.stages = manifest.get("stages", {})
+            return
+        if resume:
+            self.discarded = "kein Checkpoint vorhanden" if manifest is None else "Export, Optionen oder Code geändert"
+        self.clear()
+
+    def _load(self) -> Optional[Dict[str, Any]]:
+        path = self.directory / CHECKPOINT_MANIFEST_FILE
+        if not path.exists():
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            # Defektes Manifest: neu beginnen
+            return None
+
+    def _save_manifest(self):
+        _write_json_atomic(self.directory / CHECKPOINT_MANIFEST_FILE,
+                           {"fingerprint": self.fingerprint, "stages": self.stages})
+
+    def clear(self):
+        """Entfernt alle Checkpoint-Dateien."""
+        self.stages = {}
+        if self.directory.exists():
+            shutil.rmtree(self.directory)
+
+    @property
+    def resumed(self) -> bool:
+        return bool(self.stages)
+
+    def is_done(self, stage: str) -> bool:
+        """True, wenn die Stufe abgeschlossen ist und ihre Dateien noch existieren."""
+        entry = self.stages.get(stage)
+        if entry is None:
+            return False
+        return all(Path(path).exists() for path in entry.get("files", []))
+
+    def complete(self, stage: str, state: Optional[Dict[str, Any]] = None, files: Iterable[Path] = ()):
+        """
+        Markiert eine Stufe als abgeschlossen.
+
+        `state` wird als eigene Datei gespeichert, `files` sind die (bereits
+        vollständig geschriebenen) Ausgaben der Stufe.
+        """
+        if not self.enabled:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        entry: Dict[str, Any] = {
+            "completed": datetime.now().isoformat(timespec='seconds'),
+            "files": [str(path) for path in files],
+        }
+        if state is not None:
+            state_file = self.directory / f"{stage}.state.json"
+            _write_json_atomic(state_file, state)
+            entry["state"] = str(state_file)
+            entry["files"].append(str(state_file))
+        self.stages[stage] = entry
+        self._save_manifest()
+
+    def state(self, stage: str) -> Dict[str, Any]:
+        """Zustand einer abgeschlossenen Stufe."""
+        with open(self.stages[stage]["state"], 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def finish(self):
+        """Nach einem erfolgreichen Lauf: Checkpoint wird nicht mehr gebraucht."""
+        if self.enabled:
+            self.clear()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Delta-Erkennung für wiederholte Läufe von prepare_import.py.
+
+Pro Ausgabe (users, tasks, ...) wird ein Manifest {Schlüssel: Inhalts-Hash} des
+letzten übernommenen Laufs gespeichert. Die Vollausgabe in import_data/ wird
+immer vollständig geschrieben. Im Delta-Modus landen zusätzlich die neuen und
+geänderten Datensätze in import_data/delta/<Ausgabe>.json, gelöschte Schlüssel
+und die Anzahl unveränderter Datensätze im Bericht delta/delta.json.
+
+Das Manifest eines Delta-Laufs bleibt in delta/ liegen, bis das Delta mit
+accept_delta() (prepare_import.py --accept-delta) übernommen wurde; bis dahin
+vergleicht jeder weitere Delta-Lauf gegen den zuletzt übernommenen Stand.
+"""
+
+import hashlib
+import json
+import shutil
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List
+
+from import_io import iter_records, records_path, write_output
+from import_records import to_plain
+
+MANIFEST_FILE = ".manifest.json"
+DELTA_DIR = "delta"
+DELTA_REPORT_FILE = "delta.json"
+
+# Zuordnungstabellen ohne eigene ID: Schlüssel aus User und Ziel, damit z.B. ein
+# geändertes lastUsed als Änderung und nicht als Löschen + Einfügen erkannt wird
+RELATION_KEY_FIELDS = (
+    ('old_user_id', 'old_branch_id'),  # user_branches
+    ('old_user_id', 'old_role_id'),  # user_roles
+)
+
+def record_key(record: Dict[str, Any]) -> str:
+    """
+    Gibt den Schlüssel eines Datensatzes zurück.
+
+    Transformierte Datensätze haben 'old_id', Rohzeilen aus der alten DB meist 'id'.
+    Zuordnungen (user_branches, user_roles) werden über (User, Branch/Rolle)
+    identifiziert. Ohne all das ist der Inhalt selbst der Schlüssel.
+    """
+    for field in ('old_id', 'id'):
+        value = record.get(field)
+        if value is not None:
+            return str(value)
+    for fields in RELATION_KEY_FIELDS:
+        values = [record.get(field) for field in fields]
+        if all(value is not None for value in values):
+            return ':'.join(str(value) for value in values)
+    return json.dumps(to_plain(record), sort_keys=True, ensure_ascii=False)
+
+def record_hash(record: Dict[str, Any]) -> str:
+    """Berechnet einen stabilen Hash über den Inhalt eines Datensatzes."""
+    payload = json.dumps(to_plain(record), sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+def load_manifest(output_dir: Path) -> Dict[str, Dict[str, str]]:
+    """Lädt das Manifest des letzten Laufs (leer, falls keins existiert)."""
+    path = output_dir / MANIFEST_FILE
+    if not path.exists():
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_manifest(output_dir: Path, manifest: Dict[str, Dict[str, str]]):
+    """Speichert das Manifest des aktuellen Laufs."""
+    with open(output_dir / MANIFEST_FILE, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, separators=(',', ':'))
+
+def accept_delta(output_dir: Path) -> bool:
+    """
+    Übernimmt das Manifest eines Delta-Laufs, nachdem die Delta-Dateien angewendet
+    wurden, und entfernt delta/. Gibt False zurück, wenn kein Delta vorliegt.
+    """
+    delta_dir = output_dir / DELTA_DIR
+    pending = delta_dir / MANIFEST_FILE
+    if not pending.exists():
+        return False
+    pending.replace(output_dir / MANIFEST_FILE)
+    shutil.rmtree(delta_dir)
+    return True
+
+class DeltaTracker:
+    """
+    Vergleicht die Datensätze des aktuellen Laufs mit dem Manifest des letzten Laufs.
+
+    Das neue Manifest wird immer vollständig aufgebaut, damit auch ein normaler
+    Lauf die Basis für den nächsten Delta-Lauf bildet. track() liefert immer alle
+    Datensätze (für die Vollausgabe); die Delta-Dateien schreibt write_delta().
+    """
+
+    def __init__(self, previous_manifest: Dict[str, Dict[str, str]], delta: bool):
+        self.previous = previous_manifest
+        self.delta = delta
+        self.manifest: Dict[str, Dict[str, str]] = {}
+        self.report: Dict[str, Dict[str, Any]] = {}
+
+    def track(self, name: str, records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Registriert die Datensätze einer Ausgabe und liefert sie unverändert weiter."""
+        previous = self.previous.get(name, {})
+        current: Dict[str, str] = {}
+        inserted: List[str] = []
+        changed: List[str] = []
+        unchanged = 0
+
+        for record in records:
+            key = record_key(record)
+            digest = record_hash(record)
+            current[key] = digest
+            old_digest = previous.get(key)
+            if old_digest is None:
+                inserted.append(key)
+            elif old_digest != digest:
+                changed.append(key)
+            else:
+                unchanged += 1
+            yield record
+
+        self.manifest[name] = current
+        self.report[name] = {
+            "inserted": inserted,
+            "changed": changed,
+            "deleted": [key for key in previous if key not in current],
+            "unchanged": unchanged,
+        }
+
+    def write_delta(self, output_dir: Path, name: str, fmt: str) -> Path:
+        """
+        Schreibt die neuen und geänderten Datensätze einer bereits geschriebenen
+        Vollausgabe nach delta/<name> und gibt den Pfad zurück.
+
+        Die Datensätze werden dafür noch einmal aus der Vollausgabe gelesen, statt
+        sie während des Schreibens im Speicher zu sammeln.
+        """
+        stats = self.report[name]
+        keys = set(stats['inserted']) | set(stats['changed'])
+        delta_dir = output_dir / DELTA_DIR
+        delta_dir.mkdir(exist_ok=True)
+        records = iter_records(records_path(output_dir, name, fmt))
+        write_output(delta_dir, name, (record for record in records if record_key(record) in keys), fmt)
+        return records_path(delta_dir, name, fmt)
+
+    def export_state(self, name: str) -> Dict[str, Any]:
+        """Manifest und Bericht einer Ausgabe (für Checkpoints, siehe import_checkpoint.py)."""
+        return {"manifest": self.manifest[name], "report": self.report[name]}
+
+    def restore_state(self, name: str, state: Dict[str, Any]):
+        """Übernimmt den Stand einer Ausgabe, die in einem früheren Lauf geschrieben wurde."""
+        self.manifest[name] = state["manifest"]
+        self.report[name] = state["report"]
+
+    def summary(self, name: str) -> str:
+        """Kurze Zusammenfassung für die Konsolenausgabe."""
+        stats = self.report[name]
+        return (f"{len(stats['inserted'])} neu, {len(stats['changed'])} geändert, "
+                f"{len(stats['deleted'])} gelöscht, {stats['unchanged']} unverändert")
+
+    def save(self, output_dir: Path):
+        """
+        Speichert das neue Manifest.
+
+        Im Delta-Modus landen Manifest und Bericht in delta/ und werden erst mit
+        accept_delta() übernommen. Ein normaler Lauf übernimmt das Manifest direkt
+        und verwirft ein noch offenes Delta, das gegen den alten Stand berechnet wurde.
+        """
+        delta_dir = output_dir / DELTA_DIR
+        if self.delta:
+            delta_dir.mkdir(exist_ok=True)
+            save_manifest(delta_dir, self.manifest)
+            with open(delta_dir / DELTA_REPORT_FILE, 'w', encoding='utf-8') as f:
+                json.dump(self.report, f, indent=2, ensure_ascii=False)
+        else:
+            save_manifest(output_dir, self.manifest)
+            shutil.rmtree(delta_dir, ignore_errors=True)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Lese- und Schreibfunktionen für die Dateien in import_data/.
+
+Unterstützt zwei Formate:
+- json:   eingerücktes JSON-Array (bisheriges Format, z.B. users.json)
+- ndjson: ein Datensatz pro Zeile (z.B. users.ndjson), kompakter und zeilenweise lesbar
+
+Beide Formate werden inkrementell geschrieben, d.h. Datensätze können direkt aus
+einem Generator kommen und müssen nicht vorher als Liste im Speicher liegen.
+Datensätze sind Dicts oder ImportRecord-Objekte (siehe import_records.py), die
+sich ohne Zwischen-Dict selbst serialisieren.
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List
+
+from import_records import ImportRecord
+
+OUTPUT_FORMATS = ('json', 'ndjson')
+
+FILE_SUFFIXES = {
+    'json': '.json',
+    'ndjson': '.ndjson',
+}
+
+def records_path(output_dir: Path, name: str, fmt: str) -> Path:
+    """Gibt den Dateipfad für eine Ausgabe im gewünschten Format zurück."""
+    return output_dir / f"{name}{FILE_SUFFIXES[fmt]}"
+
+def find_records_file(output_dir: Path, name: str) -> Path:
+    """Sucht die vorhandene Datei einer Ausgabe (NDJSON vor JSON)."""
+    for fmt in ('ndjson', 'json'):
+        path = records_path(output_dir, name, fmt)
+        if path.exists():
+            return path
+    raise FileNotFoundError(f"Keine Datei für '{name}' in {output_dir} gefunden")
+
+def detect_format(path: Path) -> str:
+    """Ermittelt das Format einer Datei anhand der Endung."""
+    return 'ndjson' if path.suffix == FILE_SUFFIXES['ndjson'] else 'json'
+
+def _write_json_array(f, records: Iterable[Any]) -> int:
+    """Schreibt ein JSON-Array Element für Element (identisch zu json.dump mit indent=2)."""
+    count = 0
+    for record in records:
+        f.write('[\n  ' if count == 0 else ',\n  ')
+        if isinstance(record, ImportRecord):
+            f.write(record.to_json(indent=2, level=1))
+        else:
+            f.write(json.dumps(record, indent=2, ensure_ascii=False).replace('\n', '\n  '))
+        count += 1
+    f.write('\n]' if count else '[]')
+    return count
+
+def _write_ndjson(f, records: Iterable[Any]) -> int:
+    """Schreibt einen Datensatz pro Zeile."""
+    count = 0
+    for record in records:
+        if isinstance(record, ImportRecord):
+            f.write(record.to_json())
+        else:
+            f.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')))
+        f.write('\n')
+        count += 1
+    return count
+
+def write_records(path: Path, records: Iterable[Any], fmt: str = 'json') -> int:
+    """
+    Schreibt Datensätze inkrementell in eine Datei und gibt die Anzahl zurück.
+    
+    Geschrieben wird in eine .tmp-Datei, die erst am Ende umbenannt wird: bricht
+    der Lauf ab, bleibt die vorherige Datei vollständig erhalten.
+    """
+    if fmt not in OUTPUT_FORMATS:
+        raise ValueError(f"Unbekanntes Ausgabeformat: {fmt}")
+    tmp_path = path.with_name(path.name + '.tmp')
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            if fmt == 'ndjson':
+                count = _write_ndjson(f, records)
+            else:
+                count = _write_json_array(f, records)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    tmp_path.replace(path)
+    return count
+
+def write_output(output_dir: Path, name: str, records: Iterable[Any], fmt: str = 'json') -> int:
+    """
+    Schreibt eine Ausgabe (z.B. 'users') im gewünschten Format.
+
+    Eine Datei derselben Ausgabe im anderen Format wird entfernt, damit der
+    Importer nicht versehentlich veraltete Daten liest.
+    """
+    count = write_records(records_path(output_dir, name, fmt), records, fmt)
+    for other_fmt in OUTPUT_FORMATS:
+        if other_fmt != fmt:
+            records_path(output_dir, name, other_fmt).unlink(missing_ok=True)
+    return count
+
+def iter_records(path: Path) -> Iterator[Any]:
+    """Liest die Datensätze einer Datei; NDJSON wird Zeile für Zeile gelesen."""
+    with open(path, 'r', encoding='utf-8') as f:
+        if detect_format(path) == 'ndjson':
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from json.load(f)
+
+def read_records(path: Path) -> List[Dict]:
+    """Liest alle Datensätze einer Datei als Liste."""
+    return list(iter_records(path))
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Kompakte Datensatz-Klassen für die transformierten Daten aus prepare_import.py.
+
+Statt eines Dicts mit 7-16 Schlüsseln pro Zeile hat jeder Datensatz feste
+Felder über __slots__ (kein __dict__ pro Objekt). Das spart bei großen
+Task-/Request-Tabellen deutlich Speicher und macht den Feldzugriff in den
+nachgelagerten Joins schneller.
+
+Die Felder stehen in derselben Reihenfolge wie die Schlüssel der bisherigen
+Dicts, so dass to_json() dieselbe Ausgabe wie json.dumps(dict) erzeugt.
+Alle Feldwerte sind Skalare (str, int, float, bool oder None).
+"""
+
+import json
+from typing import Any, Dict, Optional
+
+class ImportRecord:
+    """Basisklasse: Felder = __slots__ der Unterklasse."""
+
+    __slots__ = ()
+
+    def __init__(self, **values: Any):
+        for field in self.__slots__:
+            setattr(self, field, values.pop(field, None))
+        if values:
+            raise TypeError(f"Unbekannte Felder für {type(self).__name__}: {', '.join(values)}")
+
+    def get(self, field: str, default: Any = None) -> Any:
+        """Dict-kompatibler Zugriff (z.B. für DeltaTracker)."""
+        return getattr(self, field, default)
+
+    def __getitem__(self, field: str) -> Any:
+        try:
+            return getattr(self, field)
+        except AttributeError:
+            raise KeyError(field) from None
+
+    def __eq__(self, other: Any) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in self.__slots__)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def to_json(self, indent: Optional[int] = None, level: int = 0) -> str:
+        """
+        Serialisiert den Datensatz direkt, ohne Zwischen-Dict.
+
+        indent=None: kompakt wie json.dumps(..., separators=(',', ':')).
+        indent=n:    wie json.dumps(..., indent=n), eingerückt für Tiefe `level`.
+        """
+        values = [json.dumps(getattr(self, field), ensure_ascii=False) for field in self.__slots__]
+        if indent is None:
+            return '{' + ','.join(f'"{field}":{value}' for field, value in zip(self.__slots__, values)) + '}'
+        inner = '\n' + ' ' * (indent * (level + 1))
+        outer = '\n' + ' ' * (indent * level)
+        items = ','.join(f'{inner}"{field}": {value}' for field, value in zip(self.__slots__, values))
+        return '{' + items + outer + '}'
+
+def to_plain(record: Any) -> Any:
+    """Gibt Datensätze als Dict zurück, alles andere unverändert."""
+    return record.to_dict() if isinstance(record, ImportRecord) else record
+
+class NewUser(ImportRecord):
+    __slots__ = (
+        'old_id', 'username', 'email', 'password', 'firstName', 'lastName', 'birthday',
+        'bankDetails', 'contract', 'salary', 'identificationNumber', 'contractType',
+        'activeFrom', 'activeTo', 'old_branch_id', 'old_role_id',
+    )
+
+class NewRequest(ImportRecord):
+    __slots__ = (
+        'old_id', 'title', 'description', 'status', 'old_requester_id', 'old_responsible_id',
+        'old_branch_id', 'dueDate', 'createTodo',
+    )
+
+class NewArticle(ImportRecord):
+    __slots__ = ('old_id', 'title', 'content', 'slug', 'old_author_id', 'author_name', 'author_ambiguous', 'createdAt')
+
+class NewTask(ImportRecord):
+    __slots__ = (
+        'old_id', 'title', 'description', 'status', 'old_responsible_id', 'old_quality_control_id',
+        'old_branch_id', 'old_role_id', 'dueDate', 'createdAt', 'old_request_id',
+    )
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Auflösung der Referenz-Spalten (old_*) der transformierten Datensätze.
+
+Die Transformationen in prepare_import.py behalten die IDs der alten Datenbank
+(old_requester_id, old_branch_id, ...). Statt diese beim Import einzeln
+nachzuschlagen, wird pro Ziel-Tabelle einmal ein Index {alte ID: neue ID}
+aufgebaut, und alle Referenz-Spalten einer Tabelle werden blockweise in einem
+Durchlauf aufgelöst (spaltenweise mit map(index.get, ...)).
+
+Nicht auflösbare Referenzen (z.B. branch_id "0" oder gelöschte User) werden pro
+Spalte gezählt und berichtet, statt erst beim INSERT an einem Foreign Key zu
+scheitern.
+"""
+
+import json
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+REFERENCE_REPORT_FILE = "references.json"
+
+# Zeilen pro Block beim spaltenweisen Auflösen
+RESOLVE_BATCH_SIZE = 10000
+# Beispielwerte pro Spalte im Bericht
+MAX_EXAMPLES = 5
+
+# Referenz-Spalten pro Ausgabe (in der Reihenfolge der Ausgaben): alte Spalte -> (Ziel-Tabelle, neue Spalte)
+REFERENCE_COLUMNS: Dict[str, Dict[str, Tuple[str, str]]] = {
+    'users': {
+        'old_branch_id': ('branches', 'branchId'),
+        'old_role_id': ('roles', 'roleId'),
+    },
+    'requests': {
+        'old_requester_id': ('users', 'requesterId'),
+        'old_responsible_id': ('users', 'responsibleId'),
+        'old_branch_id': ('branches', 'branchId'),
+    },
+    'cerebro': {
+        'old_author_id': ('users', 'createdById'),
+    },
+    'tasks': {
+        'old_responsible_id': ('users', 'responsibleId'),
+        'old_quality_control_id': ('users', 'qualityControlId'),
+        'old_branch_id': ('branches', 'branchId'),
+        'old_role_id': ('roles', 'roleId'),
+        'old_request_id': ('requests', 'requestId'),
+    },
+    'user_branches': {
+        'old_user_id': ('users', 'userId'),
+        'old_branch_id': ('branches', 'branchId'),
+    },
+    'user_roles': {
+        'old_user_id': ('users', 'userId'),
+        'old_role_id': ('roles', 'roleId'),
+    },
+}
+
+# Werte, die "keine Referenz" bedeuten
+EMPTY_REFERENCES = (None, '')
+
+class ColumnReport:
+    """Zähler für eine Referenz-Spalte."""
+
+    __slots__ = ('resolved', 'empty', 'dangling', 'examples')
+
+    def __init__(self):
+        self.resolved = 0
+        self.empty = 0
+        self.dangling = 0
+        self.examples: Dict[str, int] = {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "resolved": self.resolved,
+            "empty": self.empty,
+            "dangling": self.dangling,
+            "examples": self.examples,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ColumnReport':
+        report = cls()
+        report.resolved = data["resolved"]
+        report.empty = data["empty"]
+        report.dangling = data["dangling"]
+        report.examples = dict(data["examples"])
+        return report
+
+class ReferenceResolver:
+    """
+    Löst old_*-Spalten über Hash-Indizes {alte ID: neue ID} pro Ziel-Tabelle auf.
+
+    Die Indizes können nachträglich befüllt werden (z.B. vom Loader, sobald die
+    neuen IDs einer Tabelle bekannt sind). Alte IDs werden als String verglichen.
+    """
+
+    def __init__(self, indexes: Optional[Dict[str, Dict[str, Any]]] = None,
+                 batch_size: int = RESOLVE_BATCH_SIZE):
+        self.indexes: Dict[str, Dict[str, Any]] = {target: {} for target in ('users', 'branches', 'roles', 'requests')}
+        for target, index in (indexes or {}).items():
+            self.add_index(target, index)
+        self.batch_size = batch_size
+        self.reports: Dict[str, Dict[str, ColumnReport]] = {}
+
+    def add_index(self, target: str, index: Dict[Any, Any]):
+        """Übernimmt Zuordnungen alte ID -> neue ID für eine Ziel-Tabelle."""
+        self.indexes.setdefault(target, {}).update((str(old_id), new_id) for old_id, new_id in index.items())
+
+    def _report(self, name: str, column: str) -> ColumnReport:
+        return self.reports.setdefault(name, {}).setdefault(column, ColumnReport())
+
+    def _resolve_column(self, name: str, column: str, target: str, values: List[Any]) -> List[Any]:
+        index = self.indexes[target]
+        keys = [None if value in EMPTY_REFERENCES else str(value) for value in values]
+        resolved = list(map(index.get, keys))
+        report = self._report(name, column)
+        empty = keys.count(None)
+        missing = resolved.count(None) - empty
+        report.empty += empty
+        report.dangling += missing
+        report.resolved += len(keys) - empty - missing
+        if missing:
+            for key, new_id in zip(keys, resolved):
+                if key is not None and new_id is None:
+                    if key in report.examples or len(report.examples) < MAX_EXAMPLES:
+                        report.examples[key] = report.examples.get(key, 0) + 1
+        return resolved
+
+    def resolve(self, name: str, records: Iterable[Any],
+                only: Optional[Iterable[str]] = None) -> Iterator[Tuple[Any, Dict[str, Any]]]:
+        """
+        Liefert (Datensatz, {neue Spalte: neue ID oder None}) für jeden Datensatz.
+
+        Die Spalten werden pro Block von `batch_size` Datensätzen gemeinsam aufgelöst.
+        Mit `only` werden nur die angegebenen alten Spalten aufgelöst. Tabellen
+        ohne Referenz-Spalten (branches, roles) werden nur durchgereicht.
+        """
+        columns = REFERENCE_COLUMNS.get(name, {})
+        if only is not None:
+            columns = {column: columns[column] for column in only}
+        records = iter(records)
+        while True:
+            batch = list(islice(records, self.batch_size))
+            if not batch:
+                return
+            resolved_columns = {
+                new_column: self._resolve_column(name, column, target, [record.get(column) for record in batch])
+                for column, (target, new_column) in columns.items()
+            }
+            for i, record in enumerate(batch):
+                yield record, {new_column: values[i] for new_column, values in resolved_columns.items()}
+
+    def check(self, name: str, records: Iterable[Any]) -> Iterator[Any]:
+        """Reicht die Datensätze unverändert weiter und zählt dabei die Referenzen."""
+        for record, _ in self.resolve(name, records):
+            yield record
+
+    def _ordered_reports(self) -> List[Tuple[str, Dict[str, ColumnReport]]]:
+        """Zähler in der Reihenfolge von REFERENCE_COLUMNS, unabhängig von der Reihenfolge der Prüfung."""
+        order = {name: index for index, name in enumerate(REFERENCE_COLUMNS)}
+        return sorted(self.reports.items(), key=lambda item: order.get(item[0], len(order)))
+
+    def dangling_lines(self) -> List[str]:
+        """Eine Zeile pro Spalte mit nicht auflösbaren Referenzen."""
+        lines = []
+        for name, columns in self._ordered_reports():
+            for column, report in columns.items():
+                if report.dangling:
+                    examples = ', '.join(f"{value!r} ({count}x)" for value, count in report.examples.items())
+                    lines.append(f"{name}.{column}: {report.dangling} nicht auflösbar (z.B. {examples})")
+        return lines
+
+    def export_state(self, name: str) -> Dict[str, Dict[str, Any]]:
+        """Zähler einer Ausgabe (für Checkpoints, siehe import_checkpoint.py)."""
+        return {column: report.to_dict() for column, report in self.reports.get(name, {}).items()}
+
+    def restore_state(self, name: str, state: Dict[str, Dict[str, Any]]):
+        """Übernimmt die Zähler einer Ausgabe aus einem früheren Lauf."""
+        if not state:
+            # Ausgabe ohne Referenz-Spalten (branches, roles)
+            return
+        self.reports[name] = {column: ColumnReport.from_dict(data) for column, data in state.items()}
+
+    def to_dict(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        return {
+            name: {column: report.to_dict() for column, report in columns.items()}
+            for name, columns in self._ordered_reports()
+        }
+
+    def save(self, output_dir: Path):
+        """Schreibt den Bericht (references.json)."""
+        with open(output_dir / REFERENCE_REPORT_FILE, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Streaming-Leser für mysqldump-Dateien mit extended INSERTs.
+
+Liefert die Tabellen eines SQL-Dumps wie iter_export_tables in prepare_import.py
+als (Tabellenname, Zeilen-Iterator). Die Zeilen haben dieselbe Form wie im
+phpMyAdmin-JSON-Export: {Spalte: Wert als String oder None}. prepare_import.py
+kann damit direkt den Dump der alten Datenbank lesen, ohne vorher einen
+(größeren und langsamer erzeugten) JSON-Export anzulegen.
+
+Die Datei wird blockweise gelesen, und jedes INSERT INTO ... VALUES (...),(...)
+wird Tupel für Tupel zerlegt: weder die Datei noch ein einzelnes INSERT muss in
+den Speicher passen. Die Spaltennamen kommen aus der Spaltenliste des INSERT
+(mysqldump --complete-insert) oder aus dem vorangehenden CREATE TABLE. Andere
+Anweisungen (SET, LOCK TABLES, DROP TABLE, ...) und Kommentare werden
+übersprungen. Mit gzip komprimierte Dumps (.sql.gz) werden direkt gelesen.
+"""
+
+import gzip
+import re
+from itertools import groupby
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+SQL_DUMP_SUFFIXES = ('.sql', '.sql.gz')
+
+# Blockgröße beim Lesen des Dumps
+STREAM_CHUNK_SIZE = 1024 * 1024
+# Kopf einer Anweisung (CREATE TABLE ... (, INSERT INTO ... VALUES) muss in so viele Zeichen passen
+MAX_HEADER_SIZE = 64 * 1024
+
+# String-Literal in '...' mit Backslash-Escapes und '' (ohne verschachtelte
+# Wiederholungen, damit ein abgeschnittener String nicht exponentiell backtrackt)
+_STRING = r"'[^'\\]*(?:(?:\\.|'')[^'\\]*)*'"
+
+# Leerraum und Kommentare zwischen Anweisungen (-- ..., # ..., /* ... */ inkl. /*!40101 ... */)
+_GAP_PATTERN = re.compile(r"\s*(?:(?:--[^\n]*\n|#[^\n]*\n|/\*.*?\*/)\s*)*", re.S)
+_KEYWORD_PATTERN = re.compile(r"[A-Za-z]+")
+# Rest einer Anweisung bis einschließlich ';' (Semikolons in Strings und Namen zählen nicht)
+_STATEMENT_REST_PATTERN = re.compile(
+    r"""[^;'"`]*(?:(?:""" + _STRING + r"""|"[^"\\]*(?:\\.[^"\\]*)*"|`[^`]*`)[^;'"`]*)*;""", re.S)
+
+_NAME = r"(?:`(?:[^`]|``)+`|\w+)"
+_TABLE_NAME = rf"({_NAME}(?:\s*\.\s*{_NAME})?)"
+_CREATE_TABLE_PATTERN = re.compile(
+    rf"CREATE\s+(?:TEMPORARY\s+)?TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?{_TABLE_NAME}\s*\(", re.I)
+_INSERT_PATTERN = re.compile(
+    rf"(?:INSERT|REPLACE)(?:\s+(?:LOW_PRIORITY|DELAYED|HIGH_PRIORITY|IGNORE))*\s+INTO\s+{_TABLE_NAME}"
+    r"\s*(?:\(([^)]*)\))?\s*VALUES\s*", re.I)
+_NAME_PATTERN = re.compile(_NAME)
+# Spaltendefinition im CREATE TABLE: Zeile beginnt mit `name`
+_COLUMN_DEFINITION_PATTERN = re.compile(r"^\s*`((?:[^`]|``)+)`", re.M)
+
+# Ein Wert eines VALUES-Tupels samt folgendem ',' oder ')': String oder
+# unquotiertes Token (Zahl, NULL, 0x..., b'...')
+_VALUE_PATTERN = re.compile(r"\s*(?:(?:_binary\s*)?(" + _STRING + r")|([^,)'\s][^,)\s]*))\s*([,)])", re.S)
+_TUPLE_START_PATTERN = re.compile(r"\s*\(")
+_TUPLE_END_PATTERN = re.compile(r"\s*([,;])")
+
+# MySQL-Escapes in String-Literalen; \% und \_ bleiben wie in MySQL erhalten
+_ESCAPES = {'0': '\0', 'b': '\b', 'n': '\n', 'r': '\r', 't': '\t', 'Z': '\x1a', '%': '\\%', '_': '\\_'}
+_ESCAPE_PATTERN = re.compile(r"\\(.)|''", re.S)
+
+def is_sql_dump(file_path: Path) -> bool:
+    """True für .sql und .sql.gz."""
+    return file_path.name.lower().endswith(SQL_DUMP_SUFFIXES)
+
+def _replace_escape(match: 're.Match') -> str:
+    escaped = match.group(1)
+    if escaped is None:
+        return "'"
+    return _ESCAPES.get(escaped, escaped)
+
+def unescape_string(literal: str) -> str:
+    """Inhalt eines '...'-Literals ohne Anführungszeichen und Escapes."""
+    value = literal[1:-1]
+    if '\\' not in value and "''" not in value:
+        return value
+    return _ESCAPE_PATTERN.sub(_replace_escape, value)
+
+def _unquote_name(name: str) -> str:
+    """`tabelle` -> tabelle (`` steht für ein ` im Namen)."""
+    name = name.strip()
+    if name.startswith('`'):
+        return name[1:-1].replace('``', '`')
+    return name
+
+def _table_name(qualified: str) -> str:
+    """Tabellenname ohne Datenbank-Präfix (`db`.`tabelle` -> tabelle)."""
+    return _unquote_name(_NAME_PATTERN.findall(qualified)[-1])
+
+class _SqlStream:
+    """
+    Puffer über den Dump für das Zerlegen einzelner Anweisungen und Werte.
+
+    Wie _JsonStream in prepare_import.py: die Datei wird blockweise gelesen,
+    gelesene Daten werden beim Nachladen verworfen. Ein Treffer, der bis ans
+    Pufferende reicht, könnte abgeschnitten sein und wird nach dem Nachladen
+    wiederholt.
+    """
+
+    def __init__(self, f, chunk_size: int = STREAM_CHUNK_SIZE):
+        self._f = f
+        self._chunk_size = chunk_size
+        self._buf = ''
+        self._pos = 0
+        self._eof = False
+        # Spalten pro Tabelle aus CREATE TABLE
+        self.columns: Dict[str, List[str]] = {}
+
+    def _fill(self) -> bool:
+        """Liest den nächsten Block nach (mindestens so groß wie der Rest, damit große Werte linear bleiben)."""
+        if self._eof:
+            return False
+        chunk = self._f.read(max(self._chunk_size, len(self._buf) - self._pos))
+        if not chunk:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _match(self, pattern: 're.Pattern', lookahead: int = 1, limit: Optional[int] = None) -> Optional['re.Match']:
+        """
+        Wendet `pattern` an der aktuellen Position an und lädt nach, bis der Treffer
+        sicher vollständig ist. Mit `limit` gilt das Pattern als nicht passend, wenn
+        es auf so vielen Zeichen nicht passt (statt bis zum Dateiende nachzuladen).
+        """
+        while True:
+            match = pattern.match(self._buf, self._pos)
+            if self._eof:
+                return match
+            if match is not None and match.end() + lookahead <= len(self._buf):
+                return match
+            if match is None and limit is not None and len(self._buf) - self._pos >= limit:
+                return None
+            self._fill()
+
+    def _consume(self, match: 're.Match') -> 're.Match':
+        self._pos = match.end()
+        return match
+
+    def _skip_gap(self) -> bool:
+        """Überspringt Leerraum und Kommentare; False am Dateiende."""
+        while True:
+            match = self._match(_GAP_PATTERN, lookahead=2)
+            end = match.end()
+            # Kommentar, dessen Ende noch nicht im Puffer liegt
+            if not self._eof and self._buf.startswith(('--', '#', '/*'), end):
+                self._fill()
+                continue
+            self._pos = end
+            return end < len(self._buf)
+
+    def _skip_statement(self) -> str:
+        """Überspringt den Rest der aktuellen Anweisung und gibt ihn zurück."""
+        match = self._match(_STATEMENT_REST_PATTERN, lookahead=0)
+        if match is None:
+            # Letzte Anweisung ohne ';'
+            rest = self._buf[self._pos:]
+            self._pos = len(self._buf)
+            return rest
+        return self._consume(match).group(0)
+
+    def iter_rows(self) -> Iterator[Tuple[str, Optional[Dict]]]:
+        """
+        Liefert (Tabelle, Zeile) für jedes Tupel aller INSERTs und (Tabelle, None)
+        für jedes CREATE TABLE, damit auch leere Tabellen erscheinen.
+        """
+        while self._skip_gap():
+            if self._buf[self._pos] == ';':
+                self._pos += 1
+                continue
+            keyword = self._match(_KEYWORD_PATTERN, limit=MAX_HEADER_SIZE)
+            word = keyword.group(0).upper() if keyword else ''
+            if word == 'CREATE':
+                create = self._match(_CREATE_TABLE_PATTERN, limit=MAX_HEADER_SIZE)
+                if create is not None:
+                    table = _table_name(self._consume(create).group(1))
+                    body = self._skip_statement()
+                    self.columns[table] = [
+                        name.replace('``', '`') for name in _COLUMN_DEFINITION_PATTERN.findall(body)
+                    ]
+                    yield table, None
+                    continue
+            elif word in ('INSERT', 'REPLACE'):
+                insert = self._match(_INSERT_PATTERN, limit=MAX_HEADER_SIZE)
+                if insert is not None:
+                    self._consume(insert)
+                    table = _table_name(insert.group(1))
+                    if insert.group(2) is not None:
+                        columns = [_unquote_name(name) for name in insert.group(2).split(',')]
+                    else:
+                        columns = self.columns.get(table)
+                    if not columns:
+                        raise ValueError(f"Ungültiger SQL-Dump: keine Spalten für {table} "
+                                         f"(weder CREATE TABLE noch Spaltenliste im INSERT)")
+                    for row in self._iter_tuples(table, columns):
+                        yield table, row
+                    continue
+            self._skip_statement()
+
+    def _iter_tuples(self, table: str, columns: List[str]) -> Iterator[Dict]:
+        """Zerlegt die Tupel eines INSERT bis zum abschließenden ';'."""
+        while True:
+            start = self._match(_TUPLE_START_PATTERN, limit=MAX_HEADER_SIZE)
+            if start is None:
+                raise ValueError(f"Ungültiger SQL-Dump: '(' erwartet in INSERT für {table}")
+            self._consume(start)
+            values: List[Optional[str]] = []
+            while True:
+                match = self._match(_VALUE_PATTERN)
+                if match is None:
+                    raise ValueError(f"Ungültiger SQL-Dump: Wert erwartet in INSERT für {table}")
+                self._consume(match)
+                literal, token, separator = match.groups()
+                if literal is not None:
+                    values.append(unescape_string(literal))
+                else:
+                    values.append(None if token.upper() == 'NULL' else token)
+                if separator == ')':
+                    break
+            if len(values) != len(columns):
+                raise ValueError(f"Ungültiger SQL-Dump: {len(values)} Werte für {len(columns)} Spalten in {table}")
+            yield dict(zip(columns, values))
+
+            end = self._match(_TUPLE_END_PATTERN, lookahead=0, limit=MAX_HEADER_SIZE)
+            if end is None:
+                # z.B. ON DUPLICATE KEY UPDATE: Rest der Anweisung ignorieren
+                self._skip_statement()
+                return
+            if self._consume(end).group(1) == ';':
+                return
+
+def _open_dump(file_path: Path):
+    if file_path.name.lower().endswith('.gz'):
+        return gzip.open(file_path, 'rt', encoding='utf-8', newline='')
+    return open(file_path, 'r', encoding='utf-8', newline='')
+
+def iter_sql_dump_tables(file_path: Path) -> Iterator[Tuple[str, Iterator[Dict]]]:
+    """
+    Liest einen mysqldump inkrementell und liefert pro Tabelle (Tabellenname, Zeilen-Iterator).
+
+    Wie bei iter_export_tables muss der Zeilen-Iterator vor dem nächsten Schritt
+    verbraucht werden; nicht gelesene Zeilen werden sonst übersprungen.
+    Aufeinanderfolgende INSERTs derselben Tabelle ergeben einen Iterator.
+    """
+    with _open_dump(file_path) as f:
+        rows = _SqlStream(f).iter_rows()
+        for table, group in groupby(rows, key=lambda item: item[0]):
+            yield table, (row for _, row in group if row is not None)
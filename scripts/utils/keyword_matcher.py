@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Mehrfach-Stichwortsuche (Aho-Corasick) für bekannte Namen in Snapshots.
+
+Statt pro bekanntem Namen einmal den ganzen Text zu durchsuchen
+(`if name in snapshot_content`), wird aus allen Namen und ihren fehlerhaften
+Schreibweisen einmal ein Automat gebaut, der alle Vorkommen in einem einzigen
+Durchlauf findet und direkt den normalisierten (kanonischen) Namen liefert.
+"""
+
+from typing import Dict, Iterator, List, Set, Tuple
+
+class KeywordMatcher:
+    """
+    Aho-Corasick-Automat über {Schreibweise: kanonischer Name}.
+
+    Mit ignore_case=True werden Stichwörter und Text klein geschrieben verglichen.
+    """
+
+    def __init__(self, keywords: Dict[str, str], ignore_case: bool = False):
+        self.ignore_case = ignore_case
+        self.canonical_names: List[str] = list(dict.fromkeys(keywords.values()))
+        # Zustände: Übergänge, Fehler-Links, alle Treffer (inkl. Suffixe)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, str]]] = [[]]
+
+        for keyword, canonical in keywords.items():
+            self._add(self._fold(keyword), canonical)
+        self._build_fail_links()
+
+    def _fold(self, text: str) -> str:
+        return text.lower() if self.ignore_case else text
+
+    def _add(self, keyword: str, canonical: str):
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][char] = next_state
+            state = next_state
+        self._output[state].append((len(keyword), canonical))
+
+    def _build_fail_links(self):
+        # Breitensuche: Fehler-Link zeigt auf den längsten echten Suffix, der auch Präfix ist
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for char, next_state in self._goto[state].items():
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state].extend(self._output[self._fail[next_state]])
+                queue.append(next_state)
+
+    def finditer(self, text: str) -> Iterator[Tuple[int, str]]:
+        """Liefert (Startposition, kanonischer Name) für jedes Vorkommen in einem Durchlauf."""
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for pos, char in enumerate(self._fold(text)):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for length, canonical in output[state]:
+                yield pos - length + 1, canonical
+
+    def find_all(self, text: str) -> Set[str]:
+        """Gibt die Menge der kanonischen Namen zurück, die im Text vorkommen."""
+        return {canonical for _, canonical in self.finditer(text)}
+
+    def in_canonical_order(self, names: Set[str]) -> List[str]:
+        """Sortiert gefundene Namen in die Reihenfolge der Stichwort-Tabelle."""
+        return [name for name in self.canonical_names if name in names]
+
+# Bekannte Branches inkl. fehlerhafter Schreibweisen -> kanonischer Name
+BRANCH_NAMES = {
+    'Alianza Paisa': 'Alianza Paisa',
+    'Alianza Pai a': 'Alianza Paisa',  # Fehlerhafte Schreibweise
+    'Manila': 'Manila',
+    'Nowhere': 'Nowhere',
+    'Parque Poblado': 'Parque Poblado',
+}
+
+# Bekannte Cerebro-Artikel inkl. fehlerhafter Schreibweisen -> kanonischer Name
+CEREBRO_ARTICLE_NAMES = {
+    'Online Check-in': 'Online Check-in',
+    'Online Check-out': 'Online Check-out',
+    'Emergencie': 'Emergencies',
+    'Emergencies': 'Emergencies',
+    'Recepcion: First day': 'Recepcion: First day',
+    'Recepcion:First day': 'Recepcion: First day',
+    'Recepcion First day': 'Recepcion: First day',
+    'RecepcionFirst day': 'Recepcion: First day',
+    'Recepcion: Fir t day': 'Recepcion: First day',
+    'Keepa': 'Keepa',
+    'KeePa': 'Keepa',
+    'Servicio de Desayuno': 'Servicio de Desayuno',
+    'Servicio de De ayuno': 'Servicio de Desayuno',
+}
+
+BRANCH_MATCHER = KeywordMatcher(BRANCH_NAMES)
+CEREBRO_ARTICLE_MATCHER = KeywordMatcher(CEREBRO_ARTICLE_NAMES)
+# Für Navigations-Einträge (name: ...) ohne Beachtung der Groß-/Kleinschreibung
+CEREBRO_NAV_MATCHER = KeywordMatcher(CEREBRO_ARTICLE_NAMES, ignore_case=True)
+# Navigations-Eintrag: Titel steht direkt (bis auf Leerraum) hinter diesem Präfix
+CEREBRO_NAV_PREFIX = 'name:'
@@ -1,20 +1,65 @@
 #!/usr/bin/env python3
 """
 Import-Skript für die alte Intranet-Datenbank in die neue Prisma-Datenbank.
-Transformiert die Daten aus dem JSON-Export und importiert sie über Prisma.
+Transformiert die Daten aus dem JSON-Export (oder direkt aus einem mysqldump)
+und importiert sie über Prisma.
 """
 
+import argparse
 import json
 import re
+import unicodedata
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import nullcontext
 from datetime import datetime
+from functools import lru_cache
+from itertools import chain, islice
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Deque, Dict, List, Any, Optional, Iterable, Iterator, Tuple
+
+import import_delta
+import import_io
+import import_records
+import import_resolve
+import import_sql_dump
+import transform_user_relations as user_relations
+from import_checkpoint import CHECKPOINT_DIR, LOOKUPS_STAGE, CheckpointStore, run_fingerprint
+from import_delta import DELTA_DIR, DeltaTracker, accept_delta, load_manifest
+from import_io import OUTPUT_FORMATS, records_path, write_output
+from import_records import NewArticle, NewRequest, NewTask, NewUser
+from import_resolve import ReferenceResolver
+from import_sql_dump import is_sql_dump, iter_sql_dump_tables
+from run_metrics import RunMetrics, add_profile_argument, timed_call
+from transform_user_relations import UserKeyColumns, iter_last_used_join
 
 # Pfade
 JSON_FILE = Path("lafamili_sopl771.json")
 OUTPUT_DIR = Path("import_data")
+# Laufzeit-Bericht pro Stufe (neben import_data/, damit --delta ihn nicht sieht)
+RUN_REPORT_FILE = Path("prepare_import_run.json")
 OUTPUT_DIR.mkdir(exist_ok=True)
 
+# Blockgröße beim inkrementellen Lesen des JSON-Exports
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+# UTF-8-Sequenzen, die als Latin-1 gelesen wurden: Lead-Byte (Ã, Â, â, ð, ...)
+# gefolgt von der passenden Anzahl Continuation-Bytes (U+0080-U+00BF)
+MOJIBAKE_PATTERN = re.compile(
+    '[\xc2-\xdf][\x80-\xbf]'
+    '|[\xe0-\xef][\x80-\xbf]{2}'
+    '|[\xf0-\xf4][\x80-\xbf]{3}'
+)
+
+def _repair_mojibake_match(match: re.Match) -> str:
+    """Dekodiert eine gefundene Sequenz; ungültige Sequenzen bleiben unverändert."""
+    span = match.group()
+    try:
+        return span.encode('latin-1').decode('utf-8')
+    except UnicodeDecodeError:
+        # z.B. Overlong-Encodings oder Surrogates - wie bisher nicht anfassen
+        return span
+
 def fix_encoding(text: str) -> str:
     """
     Repariert falsch kodierte UTF-8 Zeichen.
@@ -24,8 +69,10 @@ def fix_encoding(text: str) -> str:
     
     Beispiel: 'TÃ©' -> 'Té', 'JosÃ©' -> 'José'
     
-    Die Funktion versucht, den gesamten String zu konvertieren. Falls das fehlschlägt,
-    wird versucht, den String in Teile zu zerlegen und nur die problematischen Teile zu korrigieren.
+    Die Funktion versucht, den gesamten String zu konvertieren. Falls das fehlschlägt
+    (z.B. bei gemischten Strings mit bereits korrekten Emojis), werden in einem
+    einzigen Durchlauf nur die Stellen mit UTF-8-als-Latin-1-Signatur repariert.
+    Die Laufzeit ist linear in der Länge des Strings.
     """
     if not isinstance(text, str):
         return text
@@ -34,35 +81,8 @@ def fix_encoding(text: str) -> str:
     try:
         return text.encode('latin-1').decode('utf-8')
     except (UnicodeEncodeError, UnicodeDecodeError):
-        # Falls die Konvertierung fehlschlägt, versuche eine teilweise Korrektur
-        # Dies kann bei gemischten Strings (z.B. mit bereits korrekten Emojis) nötig sein
-        try:
-            # Versuche, den String Zeichen für Zeichen zu korrigieren
-            result = []
-            i = 0
-            while i < len(text):
-                # Versuche, ab Position i einen Teilstring zu korrigieren
-                found_match = False
-                for j in range(i + 1, min(i + 10, len(text) + 1)):
-                    try:
-                        substring = text[i:j]
-                        corrected = substring.encode('latin-1').decode('utf-8')
-                        result.append(corrected)
-                        i = j
-                        found_match = True
-                        break
-                    except (UnicodeEncodeError, UnicodeDecodeError):
-                        continue
-                
-                if not found_match:
-                    # Wenn keine Korrektur möglich ist, füge das Zeichen unverändert hinzu
-                    result.append(text[i])
-                    i += 1
-            
-            return ''.join(result)
-        except:
-            # Falls alles fehlschlägt, gebe den originalen Text zurück
-            return text
+        # Falls die Konvertierung fehlschlägt, nur die betroffenen Sequenzen korrigieren
+        return MOJIBAKE_PATTERN.sub(_repair_mojibake_match, text)
 
 def fix_encoding_recursive(obj: Any) -> Any:
     """
@@ -77,32 +97,469 @@ def fix_encoding_recursive(obj: Any) -> Any:
     else:
         return obj
 
-def parse_json_export(file_path: Path) -> Dict[str, List[Dict]]:
-    """Parst den phpMyAdmin JSON Export in ein Dictionary mit Tabellennamen als Keys."""
-    tables = {}
+# Freitext-Spalten der großen Tabellen. Nur hier wird Encoding repariert;
+# IDs, bcrypt-Hashes und Datumswerte können kein Mojibake enthalten.
+# Für nicht aufgeführte Tabellen wird das Profil aus einer Stichprobe ermittelt.
+TEXT_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    'intra_users': ('username', 'firstname', 'lastname', 'ban', 'idnr'),
+    'intra_requests': ('request', 'request_desc'),
+    'intra_tasks': ('task', 'task_desc', 'task_desc_ext'),
+    'intra_cerebro': ('cerebro_title', 'cerebro_content', 'cerebro_author'),
+    'intra_users_branches': (),
+    'intra_users_roles': (),
+}
+
+# Werte dieser Form sind nie Freitext (IDs, Beträge, Datumswerte, bcrypt-Hashes)
+NON_TEXT_VALUE_PATTERN = re.compile(
+    r'-?\d+(?:\.\d+)?'
+    r'|\d{4}-\d{2}-\d{2}(?: \d{2}:\d{2}:\d{2})?'
+    r'|\$2[aby]?\$\d{2}\$[./A-Za-z0-9]{53}'
+)
+
+# Anzahl Zeilen, aus denen das Spaltenprofil einer Tabelle ermittelt wird
+ENCODING_SAMPLE_SIZE = 200
+
+def detect_text_columns(sample_rows: List[Dict]) -> Tuple[str, ...]:
+    """
+    Ermittelt die Spalten, die Freitext enthalten können.
+    
+    Eine Spalte wird nur ausgeschlossen, wenn alle Werte der Stichprobe eindeutig
+    kein Text sind (Zahl, Datum, Hash). Spalten, die in der Stichprobe nur null
+    sind, bleiben sicherheitshalber im Profil.
+    """
+    columns: Dict[str, None] = {}  # alle Spalten in Original-Reihenfolge
+    has_value = set()
+    has_text = set()
+    for row in sample_rows:
+        for key, value in row.items():
+            columns.setdefault(key)
+            if value is None:
+                continue
+            has_value.add(key)
+            if not (isinstance(value, str) and NON_TEXT_VALUE_PATTERN.fullmatch(value)):
+                has_text.add(key)
+    return tuple(key for key in columns if key in has_text or key not in has_value)
+
+def repair_row(row: Dict, text_columns: Tuple[str, ...]) -> Dict:
+    """
+    Repariert das Encoding der angegebenen Spalten einer Zeile.
+    
+    Reine ASCII-Werte werden sofort übersprungen. Die Zeile wird nur kopiert,
+    wenn sich tatsächlich ein Wert ändert; sonst wird das Original zurückgegeben.
+    """
+    fixed = None
+    for column in text_columns:
+        value = row.get(column)
+        if isinstance(value, str):
+            if value.isascii():
+                continue
+            repaired = fix_encoding(value)
+        elif isinstance(value, (dict, list)):
+            repaired = fix_encoding_recursive(value)
+        else:
+            continue
+        if repaired != value:
+            if fixed is None:
+                fixed = dict(row)
+            fixed[column] = repaired
+    return row if fixed is None else fixed
+
+def iter_repaired_rows(table_name: str, rows: Iterator[Dict]) -> Iterator[Dict]:
+    """Repariert das Encoding der Zeilen einer Tabelle anhand ihres Spaltenprofils."""
+    rows = iter(rows)
+    text_columns = TEXT_COLUMNS.get(table_name)
+    sample: List[Dict] = []
+    if text_columns is None:
+        sample = list(islice(rows, ENCODING_SAMPLE_SIZE))
+        text_columns = detect_text_columns(sample)
+    for row in chain(sample, rows):
+        yield repair_row(row, text_columns)
+
+class _JsonStream:
+    """
+    Puffer über eine Textdatei für das inkrementelle Parsen einzelner JSON-Werte.
     
+    Liest die Datei blockweise und dekodiert jeweils nur den nächsten Wert
+    (z.B. eine Tabellenzeile) mit raw_decode. Der Speicherbedarf ist damit durch
+    den größten einzelnen Wert begrenzt, nicht durch die gesamte Datei.
+    """
+
+    def __init__(self, f, chunk_size: int = STREAM_CHUNK_SIZE):
+        self._f = f
+        self._chunk_size = chunk_size
+        self._buf = ''
+        self._pos = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self, min_size: int = 0) -> bool:
+        """Liest den nächsten Block nach; verwirft dabei bereits gelesene Daten."""
+        if self._eof:
+            return False
+        chunk = self._f.read(max(self._chunk_size, min_size))
+        if not chunk:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Gibt das nächste Nicht-Whitespace-Zeichen zurück ('' bei Dateiende)."""
+        while True:
+            buf = self._buf
+            pos = self._pos
+            while pos < len(buf) and buf[pos] in ' \t\n\r':
+                pos += 1
+            self._pos = pos
+            if pos < len(buf):
+                return buf[pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, chars: str) -> str:
+        """Konsumiert das nächste Strukturzeichen, das eines von `chars` sein muss."""
+        ch = self.peek()
+        if not ch or ch not in chars:
+            raise ValueError(f"Ungültiger JSON-Export: erwartet {chars!r}, gefunden {ch!r}")
+        self._pos += 1
+        return ch
+
+    def value(self) -> Any:
+        """Dekodiert den nächsten vollständigen JSON-Wert."""
+        self.peek()
+        while True:
+            try:
+                obj, end = self._decoder.raw_decode(self._buf, self._pos)
+                # Eine Zahl am Pufferende könnte abgeschnitten sein
+                if end < len(self._buf) or self._eof:
+                    self._pos = end
+                    return obj
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            # Wert unvollständig: Puffer verdoppeln, damit große Werte linear bleiben
+            if not self._fill(len(self._buf) - self._pos):
+                obj, end = self._decoder.raw_decode(self._buf, self._pos)
+                self._pos = end
+                return obj
+
+
+def _iter_export_item(stream: _JsonStream) -> Iterator[Tuple[str, Iterator[Dict]]]:
+    """
+    Liest ein Objekt des Top-Level-Arrays. Für Tabellen wird (Name, Zeilen-Iterator)
+    geliefert, wobei die Zeilen des "data"-Arrays einzeln aus der Datei gelesen werden.
+    """
+    header: Dict[str, Any] = {}
+    pending_rows: List[Dict] = []
+    streamed = False
+
+    stream.expect('{')
+    if stream.peek() == '}':
+        stream.expect('}')
+        return
+    while True:
+        key = stream.value()
+        stream.expect(':')
+        if key == 'data' and stream.peek() == '[' and header.get('type') == 'table' and header.get('name'):
+            # Normalfall (phpMyAdmin schreibt type/name vor data): Zeilen direkt streamen
+            streamed = True
+            yield header['name'], _iter_array(stream)
+        elif key == 'data' and stream.peek() == '[':
+            # Header noch unvollständig: Zeilen zwischenspeichern
+            pending_rows = list(_iter_array(stream))
+        else:
+            header[key] = stream.value()
+        if stream.expect(',}') == '}':
+            break
+
+    if not streamed and header.get('type') == 'table' and header.get('name'):
+        yield header['name'], iter(pending_rows)
+
+
+def _iter_array(stream: _JsonStream) -> Iterator[Any]:
+    """Liefert die Elemente eines JSON-Arrays einzeln."""
+    stream.expect('[')
+    if stream.peek() == ']':
+        stream.expect(']')
+        return
+    while True:
+        yield stream.value()
+        if stream.expect(',]') == ']':
+            return
+
+
+def iter_export_tables(file_path: Path) -> Iterator[Tuple[str, Iterator[Dict]]]:
+    """
+    Liest den phpMyAdmin JSON Export inkrementell und liefert pro Tabelle
+    (Tabellenname, Zeilen-Iterator).
+    
+    Wie bei itertools.groupby muss der Zeilen-Iterator vor dem nächsten Schritt
+    verbraucht werden; nicht gelesene Zeilen werden sonst übersprungen.
+    Die Zeilen sind die Rohdaten aus dem Export (ohne Encoding-Reparatur).
+    """
     with open(file_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+        stream = _JsonStream(f)
+        stream.expect('[')
+        if stream.peek() == ']':
+            return
+        while True:
+            for table_name, rows in _iter_export_item(stream):
+                yield table_name, rows
+                # Rest der Tabelle überspringen, falls der Aufrufer nicht alles gelesen hat
+                for _ in rows:
+                    pass
+            if stream.expect(',]') == ']':
+                return
+
+
+def iter_json_export(file_path: Path) -> Iterator[Tuple[str, Dict]]:
+    """
+    Liest den phpMyAdmin JSON Export zeilenweise und liefert (Tabellenname, Zeile).
+    
+    Im Gegensatz zu parse_json_export wird nie der ganze Export im Speicher gehalten;
+    der Speicherbedarf ist durch die größte einzelne Zeile begrenzt.
+    """
+    for table_name, rows in iter_export_tables(file_path):
+        for row in rows:
+            yield table_name, row
+
+
+def _collect_tables(file_path: Path, export_tables: Iterator[Tuple[str, Iterator[Dict]]],
+                    metrics: Optional[RunMetrics] = None) -> Dict[str, List[Dict]]:
+    """Liest die Tabellen eines Exports vollständig und repariert das Encoding."""
+    tables = {}
+    if metrics is not None:
+        metrics['parse'].add_rows(bytes_in=file_path.stat().st_size)
+    
+    for table_name, rows in export_tables:
+        if metrics is not None:
+            rows = metrics.iterate('parse', rows)
+        # Repariere falsch kodierte Zeichen zeilenweise und nur in Text-Spalten;
+        # unveränderte Zeilen werden nicht kopiert
+        repaired = iter_repaired_rows(table_name, rows)
+        if metrics is not None:
+            repaired = metrics.iterate('encoding_repair', repaired, exclude=('parse',))
+        fixed_data = list(repaired)
+        tables[table_name] = fixed_data
+        print(f"Gefunden: {table_name} - {len(fixed_data)} Einträge")
     
+    return tables
+
+
+def parse_json_export(file_path: Path, metrics: Optional[RunMetrics] = None) -> Dict[str, List[Dict]]:
+    """
+    Parst den phpMyAdmin JSON Export in ein Dictionary mit Tabellennamen als Keys.
+    
+    Mit `metrics` werden Parsen und Encoding-Reparatur als eigene Stufen gemessen.
+    """
     # Die Datei ist ein Array von Objekten
     # Jedes Objekt mit type="table" enthält eine Tabelle
-    for item in data:
-        if item.get('type') == 'table':
-            table_name = item.get('name')
-            table_data = item.get('data', [])
-            if table_name:
-                # Repariere falsch kodierte Zeichen in den Tabellendaten
-                fixed_data = fix_encoding_recursive(table_data)
-                tables[table_name] = fixed_data
-                print(f"Gefunden: {table_name} - {len(fixed_data)} Einträge")
+    return _collect_tables(file_path, iter_export_tables(file_path), metrics)
+
+
+def parse_sql_dump(file_path: Path, metrics: Optional[RunMetrics] = None) -> Dict[str, List[Dict]]:
+    """
+    Parst einen mysqldump (.sql oder .sql.gz) wie parse_json_export.
     
-    return tables
+    Die Zeilen der extended INSERTs werden direkt gestreamt (siehe import_sql_dump.py).
+    """
+    return _collect_tables(file_path, iter_sql_dump_tables(file_path), metrics)
+
+
+def parse_export(file_path: Path, metrics: Optional[RunMetrics] = None) -> Dict[str, List[Dict]]:
+    """
+    Parst einen SQL-Dump oder einen phpMyAdmin JSON Export (anhand der Endung).
+    
+    Hält alle Tabellen im Speicher (z.B. für benchmark_prepare_import.py). main()
+    liest den Export stattdessen in zwei Durchläufen (read_lookups, dann gestreamt).
+    """
+    if is_sql_dump(file_path):
+        return parse_sql_dump(file_path, metrics)
+    return parse_json_export(file_path, metrics)
+
+# Große Tabellen (alte Tabelle -> Ausgabe): laufen im zweiten Durchlauf Zeile für
+# Zeile durch Reparatur, Transformation und Schreiben. Alle übrigen Tabellen
+# (User, Branches, Rollen, Banken, ...) sind klein und werden als Lookups gehalten.
+STREAMED_TABLES: Dict[str, str] = {
+    'intra_requests': 'requests',
+    'intra_cerebro': 'cerebro',
+    'intra_tasks': 'tasks',
+    'intra_users_branches': 'user_branches',
+    'intra_users_roles': 'user_roles',
+}
+
+def iter_tables(file_path: Path) -> Iterator[Tuple[str, Iterator[Dict]]]:
+    """Liefert (Tabellenname, Zeilen-Iterator) aus einem SQL-Dump oder JSON-Export (anhand der Endung)."""
+    if is_sql_dump(file_path):
+        return iter_sql_dump_tables(file_path)
+    return iter_export_tables(file_path)
+
+def read_lookups(file_path: Path, metrics: Optional[RunMetrics] = None) -> Dict[str, Any]:
+    """
+    Erster Durchlauf über den Export: liest nur, was die Transformationen brauchen.
+    
+    - tables: alle Tabellen außer STREAMED_TABLES, vollständig und Encoding-repariert
+    - row_counts: Anzahl Zeilen pro Tabelle
+    - request_ids: IDs der Requests (Ziel der Task-Referenzen)
+    - cerebro_authors: Autorennamen im Cerebro, je einmal (für die Warnung bei mehrdeutigen Autoren)
+    
+    Die Zeilen der großen Tabellen werden nicht gehalten. Das Ergebnis ist
+    JSON-serialisierbar und wird so auch im Checkpoint gespeichert.
+    """
+    tables: Dict[str, List[Dict]] = {}
+    row_counts: Dict[str, int] = {}
+    request_ids: List[str] = []
+    authors: Dict[Optional[str], None] = {}
+    measure = nullcontext() if metrics is None else metrics.stage('read_lookups', bytes_in=file_path.stat().st_size)
+    with measure as stage:
+        for table_name, rows in iter_tables(file_path):
+            if table_name not in STREAMED_TABLES:
+                # Repariere falsch kodierte Zeichen zeilenweise und nur in Text-Spalten
+                tables[table_name] = list(iter_repaired_rows(table_name, rows))
+                count = len(tables[table_name])
+            else:
+                count = 0
+                for row in rows:
+                    count += 1
+                    if table_name == 'intra_requests':
+                        request_ids.append(row['request_id'])
+                    elif table_name == 'intra_cerebro':
+                        authors.setdefault(repair_row(row, ('cerebro_author',)).get('cerebro_author', ''))
+            row_counts[table_name] = count
+            print(f"Gefunden: {table_name} - {count} Einträge")
+        if stage is not None:
+            stage.add_rows(rows_out=sum(row_counts.values()))
+    
+    return {
+        "tables": tables,
+        "row_counts": row_counts,
+        "request_ids": request_ids,
+        "cerebro_authors": list(authors),
+    }
+
+# Formate der Datumsspalten im alten MySQL-Export
+DATE_FORMAT = '%Y-%m-%d'
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+DATE_FORMATS = (DATE_FORMAT,)
+DATETIME_FORMATS = (DATETIME_FORMAT,)
+DATE_OR_DATETIME_FORMATS = (DATETIME_FORMAT, DATE_FORMAT)
+
+# Anzahl gecachter Datumswerte (viele Zeilen teilen sich z.B. dieselbe due_date)
+DATE_CACHE_SIZE = 8192
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _parse_date(value: str, formats: Tuple[str, ...]) -> Optional[str]:
+    """
+    Parst einen Datumsstring in ISO-Format.
+    
+    Die Standardbreiten 'YYYY-MM-DD' und 'YYYY-MM-DD HH:MM:SS' werden per Slicing
+    zerlegt; nur abweichende Formen (z.B. ohne führende Nullen) gehen über strptime.
+    """
+    fields = None
+    if value.isascii():
+        length = len(value)
+        if length == 10 and DATE_FORMAT in formats and value[4] == '-' and value[7] == '-':
+            fields = (value[0:4], value[5:7], value[8:10])
+        elif (length == 19 and DATETIME_FORMAT in formats and value[4] == '-' and value[7] == '-'
+              and value[10] == ' ' and value[13] == ':' and value[16] == ':'):
+            fields = (value[0:4], value[5:7], value[8:10], value[11:13], value[14:16], value[17:19])
+    
+    if fields is not None and all(field.isdigit() for field in fields):
+        try:
+            return datetime(*map(int, fields)).isoformat()
+        except ValueError:
+            # Ungültiges Kalenderdatum (z.B. Monat 13) - strptime würde ebenfalls scheitern
+            return None
+    
+    for fmt in formats:
+        try:
+            return datetime.strptime(value, fmt).isoformat()
+        except ValueError:
+            continue
+    return None
+
+class DateNormalizer:
+    """
+    Gemeinsame Datumskonvertierung für alle Transformer.
+    
+    Leere Werte und MySQL-Nulldaten ('0000-00-00...') ergeben None. Alle anderen
+    Werte, die sich nicht parsen lassen, werden pro Spalte gezählt.
+    """
+
+    def __init__(self):
+        self.unparseable: Dict[str, int] = {}
+
+    def normalize(self, value: Any, column: str, formats: Tuple[str, ...] = DATE_FORMATS) -> Optional[str]:
+        """Konvertiert einen Datumswert ins ISO-Format oder gibt None zurück."""
+        if not value:
+            return None
+        if isinstance(value, str):
+            if value.startswith('0000-00-00'):
+                return None
+            result = _parse_date(value, formats)
+            if result is not None:
+                return result
+        self.unparseable[column] = self.unparseable.get(column, 0) + 1
+        return None
+
+# Standard-Instanz, deren Zähler main() am Ende ausgibt
+DATE_NORMALIZER = DateNormalizer()
+
+def normalize_name(name: str) -> str:
+    """Normalisiert einen Namen für Vergleiche (Whitespace, Groß-/Kleinschreibung, Akzente)."""
+    decomposed = unicodedata.normalize('NFKD', name)
+    without_accents = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return ' '.join(without_accents.casefold().split())
+
+class AuthorIndex:
+    """
+    Namensindex der alten User für die Zuordnung von Cerebro-Autoren.
+    
+    Wird einmal aus den (encoding-reparierten) User-Zeilen aufgebaut und erlaubt
+    O(1)-Lookups über den vollen Namen oder den Vornamen.
+    """
+
+    def __init__(self, old_users: List[Dict]):
+        self.by_full_name: Dict[str, List[str]] = {}
+        self.by_first_name: Dict[str, List[str]] = {}
+        for user in old_users:
+            firstname = (user.get('firstname') or '').strip()
+            lastname = (user.get('lastname') or '').strip()
+            full_name = normalize_name(f"{firstname} {lastname}")
+            first_name = normalize_name(firstname)
+            if full_name:
+                self.by_full_name.setdefault(full_name, []).append(user['id'])
+            if first_name:
+                self.by_first_name.setdefault(first_name, []).append(user['id'])
+
+    def candidates(self, author_name: str) -> List[str]:
+        """Gibt alle passenden User-IDs zurück; voller Name hat Vorrang vor dem Vornamen."""
+        key = normalize_name(author_name or '')
+        if not key:
+            return []
+        return self.by_full_name.get(key) or self.by_first_name.get(key) or []
+
+    def resolve(self, author_name: str) -> Optional[str]:
+        """Gibt die User-ID zurück, wenn der Name eindeutig ist, sonst None."""
+        candidates = self.candidates(author_name)
+        return candidates[0] if len(candidates) == 1 else None
+
+    def ambiguous(self, author_names: List[str]) -> Dict[str, List[str]]:
+        """Liefert die Autorennamen, die auf mehrere User passen, mit allen Kandidaten."""
+        report = {}
+        for author_name in author_names:
+            candidates = self.candidates(author_name)
+            if len(candidates) > 1:
+                report[author_name] = candidates
+        return report
 
 def transform_users(old_users: List[Dict], old_branches: Dict[str, Dict], old_roles: Dict[str, Dict], 
                     banks_lookup: Dict[str, Dict], bats_lookup: Dict[str, Dict], 
-                    contract_types_lookup: Dict[str, Dict]) -> List[Dict]:
+                    contract_types_lookup: Dict[str, Dict], dates: Optional[DateNormalizer] = None) -> List[NewUser]:
     """Transformiert User-Daten von alter zu neuer Struktur."""
     new_users = []
+    dates = dates or DATE_NORMALIZER
     
     # Erstelle Mapping für Branch-IDs
     branch_id_map = {}  # old_id -> new_branch_name
@@ -116,12 +573,7 @@ def transform_users(old_users: List[Dict], old_branches: Dict[str, Dict], old_ro
     
     for old_user in old_users:
         # Geburtstag konvertieren
-        birthday = None
-        if old_user.get('birthday') and old_user['birthday'] != '0000-00-00':
-            try:
-                birthday = datetime.strptime(old_user['birthday'], '%Y-%m-%d').isoformat()
-            except:
-                pass
+        birthday = dates.normalize(old_user.get('birthday'), 'intra_users.birthday')
         
         # Email generieren (username@lafamilia.local als Fallback)
         email = f"{old_user['username']}@lafamilia.local"
@@ -155,39 +607,28 @@ def transform_users(old_users: List[Dict], old_branches: Dict[str, Dict], old_ro
             contract_type = contract_types_lookup.get(contract_type_id, {}).get('contract_type_desc', '')
         
         # Active-From/To konvertieren
-        active_from = None
-        active_to = None
-        if old_user.get('active_from') and old_user['active_from'] != '0000-00-00':
-            try:
-                active_from = datetime.strptime(old_user['active_from'], '%Y-%m-%d').isoformat()
-            except:
-                pass
-        
-        if old_user.get('active_to') and old_user['active_to'] != '0000-00-00':
-            try:
-                active_to = datetime.strptime(old_user['active_to'], '%Y-%m-%d').isoformat()
-            except:
-                pass
+        active_from = dates.normalize(old_user.get('active_from'), 'intra_users.active_from')
+        active_to = dates.normalize(old_user.get('active_to'), 'intra_users.active_to')
         
-        new_user = {
-            "old_id": old_user['id'],
-            "username": old_user['username'],
-            "email": email,
-            "password": old_user.get('password', ''),  # Bcrypt-Hash bleibt erhalten
-            "firstName": old_user.get('firstname', '') or None,
-            "lastName": old_user.get('lastname', '') or None,
-            "birthday": birthday,
-            "bankDetails": bank_details,
-            "contract": contract_type,
-            "salary": float(old_user['salary']) if old_user.get('salary') and old_user['salary'] != '0' else None,
-            "identificationNumber": old_user.get('idnr') or None,
-            "contractType": contract_type,
-            "activeFrom": active_from,
-            "activeTo": active_to,
+        new_user = NewUser(
+            old_id=old_user['id'],
+            username=old_user['username'],
+            email=email,
+            password=old_user.get('password', ''),  # Bcrypt-Hash bleibt erhalten
+            firstName=old_user.get('firstname', '') or None,
+            lastName=old_user.get('lastname', '') or None,
+            birthday=birthday,
+            bankDetails=bank_details,
+            contract=contract_type,
+            salary=float(old_user['salary']) if old_user.get('salary') and old_user['salary'] != '0' else None,
+            identificationNumber=old_user.get('idnr') or None,
+            contractType=contract_type,
+            activeFrom=active_from,
+            activeTo=active_to,
             # Mapping-Daten für später
-            "old_branch_id": old_user.get('branch'),
-            "old_role_id": old_user.get('role'),
-        }
+            old_branch_id=old_user.get('branch'),
+            old_role_id=old_user.get('role'),
+        )
         
         new_users.append(new_user)
     
@@ -221,9 +662,11 @@ def transform_roles(old_roles: List[Dict]) -> List[Dict]:
     
     return new_roles
 
-def transform_requests(old_requests: List[Dict], user_id_map: Dict[str, int], branch_id_map: Dict[str, int], status_map: Dict[str, str]) -> List[Dict]:
+def transform_requests(old_requests: List[Dict], user_id_map: Dict[str, int], branch_id_map: Dict[str, int], status_map: Dict[str, str],
+                       dates: Optional[DateNormalizer] = None) -> List[NewRequest]:
     """Transformiert Request-Daten."""
     new_requests = []
+    dates = dates or DATE_NORMALIZER
     
     for old_request in old_requests:
         # Status mapping
@@ -231,34 +674,28 @@ def transform_requests(old_requests: List[Dict], user_id_map: Dict[str, int], br
         new_status = status_map.get(old_status, 'approval')
         
         # Datum konvertieren
-        due_date = None
-        if old_request.get('due_date') and old_request['due_date'] != '0000-00-00 00:00:00':
-            try:
-                due_date = datetime.strptime(old_request['due_date'], '%Y-%m-%d %H:%M:%S').isoformat()
-            except:
-                try:
-                    due_date = datetime.strptime(old_request['due_date'], '%Y-%m-%d').isoformat()
-                except:
-                    pass
+        due_date = dates.normalize(old_request.get('due_date'), 'intra_requests.due_date', DATE_OR_DATETIME_FORMATS)
         
-        new_request = {
-            "old_id": old_request['request_id'],
-            "title": old_request.get('request', ''),
-            "description": old_request.get('request_desc') or None,
-            "status": new_status,
-            "old_requester_id": old_request.get('requested_by'),
-            "old_responsible_id": old_request.get('responsible'),
-            "old_branch_id": old_request.get('branch_id'),
-            "dueDate": due_date,
-            "createTodo": old_request.get('task_id') == '0' or False,
-        }
+        new_request = NewRequest(
+            old_id=old_request['request_id'],
+            title=old_request.get('request', ''),
+            description=old_request.get('request_desc') or None,
+            status=new_status,
+            old_requester_id=old_request.get('requested_by'),
+            old_responsible_id=old_request.get('responsible'),
+            old_branch_id=old_request.get('branch_id'),
+            dueDate=due_date,
+            createTodo=old_request.get('task_id') == '0' or False,
+        )
         new_requests.append(new_request)
     
     return new_requests
 
-def transform_cerebro(old_cerebro: List[Dict], users_by_name: Dict[str, Dict]) -> List[Dict]:
+def transform_cerebro(old_cerebro: List[Dict], author_index: AuthorIndex,
+                      dates: Optional[DateNormalizer] = None) -> List[NewArticle]:
     """Transformiert Cerebro-Artikel."""
     new_cerebro = []
+    dates = dates or DATE_NORMALIZER
     
     for old_article in old_cerebro:
         # Slug generieren aus Titel
@@ -266,42 +703,33 @@ def transform_cerebro(old_cerebro: List[Dict], users_by_name: Dict[str, Dict]) -
         slug = re.sub(r'[^a-z0-9]+', '-', title.lower()).strip('-')
         
         # Datum konvertieren
-        created_at = None
-        if old_article.get('cerebro_created_at'):
-            try:
-                created_at = datetime.strptime(old_article['cerebro_created_at'], '%Y-%m-%d %H:%M:%S').isoformat()
-            except:
-                pass
+        created_at = dates.normalize(old_article.get('cerebro_created_at'), 'intra_cerebro.cerebro_created_at', DATETIME_FORMATS)
         
-        # Autor finden: Name -> User-ID
+        # Autor finden: Name -> User-ID (nur bei eindeutigem Treffer)
         author_name = old_article.get('cerebro_author', '')
-        old_author_id = None
-        if author_name:
-            # Suche nach User mit diesem Namen (firstname + lastname)
-            for user_id, user_data in users_by_name.items():
-                firstname = (user_data.get('firstname') or '').strip()
-                lastname = (user_data.get('lastname') or '').strip()
-                full_name = f"{firstname} {lastname}".strip()
-                if full_name == author_name or firstname == author_name:
-                    old_author_id = user_id
-                    break
+        candidates = author_index.candidates(author_name) if author_name else []
+        old_author_id = candidates[0] if len(candidates) == 1 else None
         
-        new_article = {
-            "old_id": old_article['id'],
-            "title": title,
-            "content": old_article.get('cerebro_content', ''),
-            "slug": slug,
-            "old_author_id": old_author_id,  # User-ID aus der alten DB
-            "author_name": author_name,  # Name als Fallback
-            "createdAt": created_at,
-        }
+        new_article = NewArticle(
+            old_id=old_article['id'],
+            title=title,
+            content=old_article.get('cerebro_content', ''),
+            slug=slug,
+            old_author_id=old_author_id,  # User-ID aus der alten DB
+            author_name=author_name,  # Name als Fallback
+            # Mehrdeutiger Name: Loader verwenden den Admin-User statt einer Namenssuche
+            author_ambiguous=len(candidates) > 1,
+            createdAt=created_at,
+        )
         new_cerebro.append(new_article)
     
     return new_cerebro
 
-def transform_tasks(old_tasks: List[Dict], task_status_map: Dict[str, str]) -> List[Dict]:
+def transform_tasks(old_tasks: List[Dict], task_status_map: Dict[str, str],
+                    dates: Optional[DateNormalizer] = None) -> List[NewTask]:
     """Transformiert Task-Daten."""
     new_tasks = []
+    dates = dates or DATE_NORMALIZER
     
     for old_task in old_tasks:
         # Status mapping
@@ -309,22 +737,8 @@ def transform_tasks(old_tasks: List[Dict], task_status_map: Dict[str, str]) -> L
         new_status = task_status_map.get(old_status, 'open')
         
         # Datum konvertieren
-        due_date = None
-        if old_task.get('due_date') and old_task['due_date'] != '0000-00-00 00:00:00':
-            try:
-                due_date = datetime.strptime(old_task['due_date'], '%Y-%m-%d %H:%M:%S').isoformat()
-            except:
-                try:
-                    due_date = datetime.strptime(old_task['due_date'], '%Y-%m-%d').isoformat()
-                except:
-                    pass
-        
-        created_at = None
-        if old_task.get('started_at') and old_task['started_at'] != '0000-00-00 00:00:00':
-            try:
-                created_at = datetime.strptime(old_task['started_at'], '%Y-%m-%d %H:%M:%S').isoformat()
-            except:
-                pass
+        due_date = dates.normalize(old_task.get('due_date'), 'intra_tasks.due_date', DATE_OR_DATETIME_FORMATS)
+        created_at = dates.normalize(old_task.get('started_at'), 'intra_tasks.started_at', DATETIME_FORMATS)
         
         # Beschreibung kombinieren
         description = old_task.get('task_desc', '') or ''
@@ -335,33 +749,140 @@ def transform_tasks(old_tasks: List[Dict], task_status_map: Dict[str, str]) -> L
             else:
                 description = task_desc_ext
         
-        new_task = {
-            "old_id": old_task['task_id'],
-            "title": old_task.get('task', ''),
-            "description": description or None,
-            "status": new_status,
-            "old_responsible_id": old_task.get('user_id'),  # Kann null sein
-            "old_quality_control_id": old_task.get('qc_id'),  # Kann null sein
-            "old_branch_id": old_task.get('branch_id'),  # Kann "0" oder null sein
-            "old_role_id": old_task.get('role'),  # Kann null sein
-            "dueDate": due_date,
-            "createdAt": created_at,
-            "old_request_id": old_task.get('request_id'),  # Für Referenz
-        }
+        new_task = NewTask(
+            old_id=old_task['task_id'],
+            title=old_task.get('task', ''),
+            description=description or None,
+            status=new_status,
+            old_responsible_id=old_task.get('user_id'),  # Kann null sein
+            old_quality_control_id=old_task.get('qc_id'),  # Kann null sein
+            old_branch_id=old_task.get('branch_id'),  # Kann "0" oder null sein
+            old_role_id=old_task.get('role'),  # Kann null sein
+            dueDate=due_date,
+            createdAt=created_at,
+            old_request_id=old_task.get('request_id'),  # Für Referenz
+        )
         new_tasks.append(new_task)
     
     return new_tasks
 
-def main():
-    """Hauptfunktion."""
-    print("Starte Import-Vorbereitung...")
+# Blockgröße für die Transformation: im seriellen Modus ist höchstens ein Block
+# Ergebnisse im Speicher, im Prozess-Pool ist ein Block ein Job
+TRANSFORM_CHUNK_SIZE = 5000
+# Höchstens so viele Jobs pro Worker gleichzeitig im Pool: hält alle Worker
+# beschäftigt, ohne die ganze Tabelle auf einmal zu verteilen
+PENDING_JOBS_PER_WORKER = 2
+
+# Lookup-Daten im Worker-Prozess (einmal pro Prozess über den Initializer gesetzt)
+_worker_context: Dict[str, Any] = {}
+
+def run_transform(name: str, rows: List[Dict], context: Dict[str, Any], dates: DateNormalizer) -> List[Dict]:
+    """Führt den Transformer für eine Tabelle (oder einen Block davon) aus."""
+    if name == 'users':
+        return transform_users(rows, context['branches'], context['roles'], context['banks'],
+                               context['bats'], context['contract_types'], dates)
+    if name == 'branches':
+        return transform_branches(rows)
+    if name == 'roles':
+        return transform_roles(rows)
+    if name == 'requests':
+        # Referenzen bleiben alte IDs (Auflösung siehe import_resolve.py)
+        return transform_requests(rows, {}, {}, context['status_map'], dates)
+    if name == 'cerebro':
+        return transform_cerebro(rows, context['author_index'], dates)
+    if name == 'tasks':
+        return transform_tasks(rows, context['task_status_map'], dates)
+    raise ValueError(f"Unbekannte Transformation: {name}")
+
+def _iter_chunks(rows: Iterable[Dict]) -> Iterator[List[Dict]]:
+    """Teilt eine Tabelle (Liste oder Zeilen-Stream) in Blöcke von TRANSFORM_CHUNK_SIZE Zeilen."""
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, TRANSFORM_CHUNK_SIZE))
+        if not chunk:
+            return
+        yield chunk
+
+def _iter_serial(name: str, rows: Iterable[Dict], context: Dict[str, Any]) -> Iterator[Dict]:
+    """Transformiert eine Tabelle blockweise im eigenen Prozess."""
+    for chunk in _iter_chunks(rows):
+        yield from run_transform(name, chunk, context, DATE_NORMALIZER)
+
+def _init_transform_worker(context: Dict[str, Any]):
+    """Übernimmt die Lookup-Daten im Worker-Prozess (nur lesend genutzt)."""
+    _worker_context.clear()
+    _worker_context.update(context)
+
+def _run_transform_job(name: str, rows: List[Dict]) -> Tuple[List[Dict], Dict[str, int], Dict[str, Any]]:
+    """
+    Worker-Job: transformiert einen Block und liefert die Datums-Zähler und die
+    im Worker gemessene Zeit (Wall, CPU, Peak RSS) mit zurück.
+    """
+    dates = DateNormalizer()
+    records, measured = timed_call(lambda chunk: run_transform(name, chunk, _worker_context, dates), rows)
+    return records, dates.unparseable, measured
+
+def _job_records(name: str, future: Future, metrics: Optional[RunMetrics] = None) -> List[Dict]:
+    """Wartet auf einen Job und übernimmt seine Datums-Zähler und Messwerte."""
+    records, unparseable, measured = future.result()
+    for column, count in unparseable.items():
+        DATE_NORMALIZER.unparseable[column] = DATE_NORMALIZER.unparseable.get(column, 0) + count
+    if metrics is not None:
+        # CPU-Zeit der Worker; transform_<name> misst im Hauptprozess nur das Warten
+        metrics.record(f'transform_{name}:worker', measured, rows_out=len(records))
+    return records
+
+def _iter_pool(name: str, rows: Iterable[Dict], pool: ProcessPoolExecutor, max_pending: int,
+               metrics: Optional[RunMetrics] = None) -> Iterator[Dict]:
+    """
+    Verteilt die Blöcke einer Tabelle auf den Pool und liefert die Ergebnisse in
+    Eingabe-Reihenfolge.
     
-    # Parse JSON
-    print(f"\nLese JSON-Datei: {JSON_FILE}")
-    tables = parse_json_export(JSON_FILE)
+    Es sind höchstens `max_pending` Jobs gleichzeitig unterwegs; der nächste Block
+    wird erst gelesen und verteilt, wenn der älteste Job abgeholt wurde.
+    """
+    pending: Deque[Future] = deque()
+    for chunk in _iter_chunks(rows):
+        pending.append(pool.submit(_run_transform_job, name, chunk))
+        if len(pending) >= max_pending:
+            yield from _job_records(name, pending.popleft(), metrics)
+    while pending:
+        yield from _job_records(name, pending.popleft(), metrics)
+
+def transform_streams(inputs: Dict[str, Iterable[Dict]], context: Dict[str, Any],
+                      pool: Optional[ProcessPoolExecutor] = None,
+                      metrics: Optional[RunMetrics] = None, workers: int = 1) -> Dict[str, Iterator[Dict]]:
+    """
+    Liefert pro Tabelle aus `inputs` (Name -> alte Zeilen als Liste oder Stream)
+    einen Iterator über die transformierten Datensätze.
     
-    print(f"\nGefundene Tabellen: {list(tables.keys())}")
+    Ohne Pool wird seriell und erst beim Lesen transformiert. Mit Pool (mit
+    `workers` Prozessen) werden die Blöcke beim Lesen verteilt, höchstens
+    PENDING_JOBS_PER_WORKER pro Worker gleichzeitig; die Iteratoren liefern die
+    Ergebnisse in der Reihenfolge der Eingabe, die Ausgabe ist daher identisch
+    zum seriellen Lauf.
+    Der Pool muss mit initializer=_init_transform_worker und dem Kontext erstellt sein.
+    Mit `metrics` wird jeder Job im Worker gemessen (Stufe transform_<name>:worker).
+    """
+    if pool is None:
+        return {name: _iter_serial(name, rows, context) for name, rows in inputs.items()}
     
+    max_pending = PENDING_JOBS_PER_WORKER * max(workers, 1)
+    return {name: _iter_pool(name, rows, pool, max_pending, metrics) for name, rows in inputs.items()}
+
+def run_transforms(inputs: Dict[str, List[Dict]], context: Dict[str, Any], workers: int = 1) -> Dict[str, List[Dict]]:
+    """Transformiert alle Tabellen vollständig (optional mit einem Prozess-Pool)."""
+    if workers <= 1:
+        return {name: list(records) for name, records in transform_streams(inputs, context).items()}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_transform_worker,
+                             initargs=(context,)) as pool:
+        return {name: list(records) for name, records in transform_streams(inputs, context, pool, workers=workers).items()}
+
+def build_transform_context(tables: Dict[str, List[Dict]]) -> Dict[str, Any]:
+    """
+    Erstellt aus den Lookup-Tabellen des Exports den Kontext der Transformationen
+    (Lookup-Dictionaries, Autoren-Index, Status-Mappings).
+    """
     # Lade Lookup-Tabellen
     old_branches_list = tables.get('intra_branches', [])
     old_roles_list = tables.get('intra_roles', [])
@@ -378,9 +899,9 @@ def main():
     bats_dict = {b['bat_id']: b for b in tables.get('intra_bats', [])}
     contract_types_dict = {c['contract_type_id']: c for c in tables.get('intra_contract_type', [])}
     
-    # User-Dictionary für Cerebro-Autoren-Suche
+    # Namensindex für Cerebro-Autoren-Suche
     old_users_list = tables.get('intra_users', [])
-    users_by_name = {u['id']: u for u in old_users_list}
+    author_index = AuthorIndex(old_users_list)
     
     # Status-Mapping: alte Status-IDs zu neuen Status-Namen (für Requests)
     status_map = {
@@ -405,77 +926,262 @@ def main():
         '6': 'done',              # Abgeschlossen (alternative)
     }
     
-    # Transformiere Daten
-    print("\nTransformiere Daten...")
-    
-    # User
-    old_users = tables.get('intra_users', [])
-    new_users = transform_users(old_users, branches_dict, roles_dict, banks_dict, bats_dict, contract_types_dict)
-    print(f"User: {len(old_users)} -> {len(new_users)}")
+    return {
+        'branches': branches_dict,
+        'roles': roles_dict,
+        'banks': banks_dict,
+        'bats': bats_dict,
+        'contract_types': contract_types_dict,
+        'author_index': author_index,
+        'status_map': status_map,
+        'task_status_map': task_status_map,
+    }
+
+def build_transform_inputs(tables: Dict[str, List[Dict]]) -> Tuple[Dict[str, Any], Dict[str, List[Dict]]]:
+    """
+    Erstellt aus den vollständig geladenen Tabellen des Exports (parse_export) den
+    Kontext und die Eingaben {Name: alte Zeilen} für transform_streams / run_transforms.
+    """
+    inputs = {
+        'users': tables.get('intra_users', []),
+        'branches': tables.get('intra_branches', []),
+        'roles': tables.get('intra_roles', []),
+        'requests': tables.get('intra_requests', []),
+        'cerebro': tables.get('intra_cerebro', []),
+        'tasks': tables.get('intra_tasks', []),
+    }
+    return build_transform_context(tables), inputs
+
+def _checkpoint_state(name: str, count: int, tracker: DeltaTracker, resolver: ReferenceResolver,
+                      dates_before: Dict[str, int], user_columns: Optional[UserKeyColumns] = None) -> Dict[str, Any]:
+    """Zustand einer geschriebenen Ausgabe, den der Rest des Laufs braucht (für --resume)."""
+    state = {
+        "count": count,
+        "delta": tracker.export_state(name),
+        "references": resolver.export_state(name),
+        # Nur die in dieser Stufe gezählten ungültigen Datumswerte
+        "unparseable": {
+            column: total - dates_before.get(column, 0)
+            for column, total in DATE_NORMALIZER.unparseable.items() if total != dates_before.get(column, 0)
+        },
+    }
+    if user_columns is not None:
+        state["user_columns"] = user_columns.to_dict()
+    return state
+
+def _restore_checkpoint_state(name: str, state: Dict[str, Any], tracker: DeltaTracker,
+                              resolver: ReferenceResolver) -> int:
+    """Übernimmt den Zustand einer Ausgabe aus dem Checkpoint und gibt ihre Anzahl zurück."""
+    tracker.restore_state(name, state["delta"])
+    resolver.restore_state(name, state["references"])
+    for column, count in state["unparseable"].items():
+        DATE_NORMALIZER.unparseable[column] = DATE_NORMALIZER.unparseable.get(column, 0) + count
+    return state["count"]
+
+def main():
+    """Hauptfunktion."""
+    parser = argparse.ArgumentParser(description="Bereitet den Import der alten Intranet-Datenbank vor.")
+    parser.add_argument('--input', type=Path, default=JSON_FILE,
+                        help=f"phpMyAdmin JSON Export oder mysqldump (.sql, .sql.gz) (Standard: {JSON_FILE})")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Anzahl Prozesse für die Transformation (Standard: 1 = seriell)")
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default='json',
+                        help="Ausgabeformat: json (eingerücktes Array) oder ndjson (ein Datensatz pro Zeile)")
+    parser.add_argument('--delta', action='store_true',
+                        help="Zusätzlich neue und geänderte Datensätze seit dem letzten übernommenen Lauf "
+                             f"nach {OUTPUT_DIR / DELTA_DIR}/ schreiben")
+    parser.add_argument('--accept-delta', action='store_true',
+                        help=f"Delta in {OUTPUT_DIR / DELTA_DIR}/ als angewendet übernehmen (Manifest fortschreiben) und beenden")
+    parser.add_argument('--checkpoint', action='store_true',
+                        help="Abgeschlossene Stufen in import_data/.checkpoint festhalten, damit ein abgebrochener "
+                             "Lauf mit --resume fortgesetzt werden kann (kostet zusätzlichen Platz und Schreibzugriffe)")
+    parser.add_argument('--resume', action='store_true',
+                        help="Abgeschlossene Stufen eines mit --checkpoint abgebrochenen Laufs überspringen "
+                             "(schreibt selbst weiter Checkpoints)")
+    add_profile_argument(parser)
+    args = parser.parse_args()
     
-    # Branches
-    new_branches = transform_branches(old_branches_list)
-    print(f"Branches: {len(old_branches_list)} -> {len(new_branches)}")
+    if args.accept_delta:
+        if accept_delta(OUTPUT_DIR):
+            print(f"[OK] Delta übernommen, Manifest in {OUTPUT_DIR} aktualisiert")
+        else:
+            print(f"[WARN] Kein offenes Delta in {OUTPUT_DIR / DELTA_DIR}")
+        return
     
-    # Roles
-    new_roles = transform_roles(old_roles_list)
-    print(f"Roles: {len(old_roles_list)} -> {len(new_roles)}")
+    print("Starte Import-Vorbereitung...")
+    # Wall-/CPU-Zeit, Zeilen und Peak RSS pro Stufe. Mit --workers > 1 misst
+    # transform_* nur das Warten auf die Worker; deren Zeit und CPU stehen in
+    # transform_*:worker.
+    metrics = RunMetrics("prepare_import", args.profile)
     
-    # Requests
-    old_requests = tables.get('intra_requests', [])
-    new_requests = transform_requests(old_requests, {}, {}, status_map)  # ID-Mappings kommen später
-    print(f"Requests: {len(old_requests)} -> {len(new_requests)}")
+    # Abgeschlossene Stufen (Lookups, jede Ausgabe) für --resume; nur mit --checkpoint oder --resume
+    fingerprint = run_fingerprint(args.input, {"format": args.format, "delta": args.delta}, [
+        __file__, import_delta.__file__, import_io.__file__, import_records.__file__, import_resolve.__file__,
+        import_sql_dump.__file__, user_relations.__file__])
+    checkpoint = CheckpointStore(OUTPUT_DIR / CHECKPOINT_DIR, fingerprint, args.resume, args.checkpoint or args.resume)
+    if checkpoint.discarded:
+        print(f"[WARN] Checkpoint nicht verwendbar ({checkpoint.discarded}), starte neu")
+    elif checkpoint.resumed:
+        print(f"Setze abgebrochenen Lauf fort: {', '.join(checkpoint.stages)} bereits abgeschlossen")
     
-    # Cerebro
-    old_cerebro = tables.get('intra_cerebro', [])
-    new_cerebro = transform_cerebro(old_cerebro, users_by_name)
-    print(f"Cerebro: {len(old_cerebro)} -> {len(new_cerebro)}")
+    if checkpoint.is_done(LOOKUPS_STAGE):
+        print(f"\nLade Lookup-Tabellen aus Checkpoint: {checkpoint.directory}")
+        with metrics.stage('load_checkpoint'):
+            lookups = checkpoint.state(LOOKUPS_STAGE)
+    else:
+        # Erster Durchlauf über JSON-Export bzw. SQL-Dump: nur die Lookups behalten
+        print(f"\nLese {'SQL-Dump' if is_sql_dump(args.input) else 'JSON-Datei'}: {args.input}")
+        lookups = read_lookups(args.input, metrics)
+        with metrics.stage('checkpoint_lookups'):
+            checkpoint.complete(LOOKUPS_STAGE, lookups)
     
-    # Tasks
-    old_tasks = tables.get('intra_tasks', [])
-    new_tasks = transform_tasks(old_tasks, task_status_map)
-    print(f"Tasks: {len(old_tasks)} -> {len(new_tasks)}")
+    tables, row_counts = lookups['tables'], lookups['row_counts']
+    print(f"\nGefundene Tabellen: {list(row_counts)}")
     
-    # User-Branches
-    old_user_branches = tables.get('intra_users_branches', [])
-    print(f"User-Branches: {len(old_user_branches)} Zuordnungen")
+    context = build_transform_context(tables)
+    author_index = context['author_index']
+    old_users = tables.get('intra_users', [])
     
-    # User-Roles
-    old_user_roles = tables.get('intra_users_roles', [])
-    print(f"User-Roles: {len(old_user_roles)} Zuordnungen")
+    # Transformierte Datensätze werden direkt beim Erzeugen in die Dateien geschrieben
+    print(f"\nTransformiere und speichere Daten ({args.format})...")
+    if args.workers > 1:
+        print(f"Parallel mit {args.workers} Prozessen")
+    pool = None
+    if args.workers > 1:
+        pool = ProcessPoolExecutor(max_workers=args.workers, initializer=_init_transform_worker,
+                                   initargs=(context,))
+    # Manifest des letzten übernommenen Laufs für den Delta-Vergleich
+    tracker = DeltaTracker(load_manifest(OUTPUT_DIR), args.delta)
+    # Join-Spalten der User für user_branches/user_roles (alle User, auch im Delta-Modus)
+    user_columns = UserKeyColumns()
+    # Prüft alle old_*-Referenzen gegen die IDs im Export (neue IDs vergibt erst die Datenbank)
+    resolver = ReferenceResolver({
+        'users': {u['id']: u['id'] for u in old_users},
+        'branches': {b['branch_id']: b['branch_id'] for b in tables.get('intra_branches', [])},
+        'roles': {r['role_id']: r['role_id'] for r in tables.get('intra_roles', [])},
+        'requests': {request_id: request_id for request_id in lookups['request_ids']},
+    })
     
-    # Speichere transformierte Daten
-    print("\nSpeichere transformierte Daten...")
+    # Ausgabe -> (alte Tabelle, Bezeichnung, Einheit)
+    outputs = {
+        'users': ('intra_users', 'User', ''),
+        'branches': ('intra_branches', 'Branches', ''),
+        'roles': ('intra_roles', 'Roles', ''),
+        'requests': ('intra_requests', 'Requests', ''),
+        'cerebro': ('intra_cerebro', 'Cerebro', ''),
+        'tasks': ('intra_tasks', 'Tasks', ''),
+        'user_branches': ('intra_users_branches', 'User-Branches', ' Zuordnungen'),
+        'user_roles': ('intra_users_roles', 'User-Roles', ' Zuordnungen'),
+    }
     
-    with open(OUTPUT_DIR / "users.json", 'w', encoding='utf-8') as f:
-        json.dump(new_users, f, indent=2, ensure_ascii=False)
+    def report(name: str, count: int, restored: bool = False):
+        """Konsolenausgabe einer Ausgabe: alte Zeilen -> Datensätze (bei --delta mit Änderungen)."""
+        table_name, label, unit = outputs[name]
+        print(f"{label}: {row_counts.get(table_name, 0)} -> {count}{unit}{' (aus Checkpoint)' if restored else ''}")
+        if args.delta:
+            print(f"  Delta: {tracker.summary(name)}")
     
-    with open(OUTPUT_DIR / "branches.json", 'w', encoding='utf-8') as f:
-        json.dump(new_branches, f, indent=2, ensure_ascii=False)
+    def restore(name: str) -> Dict[str, Any]:
+        """Übernimmt eine im abgebrochenen Lauf geschriebene Ausgabe aus dem Checkpoint."""
+        state = checkpoint.state(name)
+        report(name, _restore_checkpoint_state(name, state, tracker, resolver), restored=True)
+        return state
     
-    with open(OUTPUT_DIR / "roles.json", 'w', encoding='utf-8') as f:
-        json.dump(new_roles, f, indent=2, ensure_ascii=False)
+    def write(name: str, records: Iterator[Dict], dates_before: Dict[str, int]):
+        """Schreibt eine Ausgabe (bei --delta auch die Delta-Datei) und schließt ihre Stufe im Checkpoint ab."""
+        records = resolver.check(name, records)
+        # Die Datensätze werden beim Schreiben erzeugt: Transformation abziehen
+        with metrics.stage(f'write_{name}', exclude=(f'transform_{name}',)) as stage:
+            count = write_output(OUTPUT_DIR, name, tracker.track(name, records), args.format)
+            stage.add_rows(rows_out=count)
+        files = [records_path(OUTPUT_DIR, name, args.format)]
+        if args.delta:
+            with metrics.stage(f'write_{name}_delta', rows_in=count):
+                files.append(tracker.write_delta(OUTPUT_DIR, name, args.format))
+        checkpoint.complete(name, _checkpoint_state(name, count, tracker, resolver, dates_before,
+                                                    user_columns if name == 'users' else None), files)
+        report(name, count)
     
-    with open(OUTPUT_DIR / "requests.json", 'w', encoding='utf-8') as f:
-        json.dump(new_requests, f, indent=2, ensure_ascii=False)
+    try:
+        # Ausgaben aus den Lookup-Tabellen (User zuerst: ihre Spalten braucht der lastUsed-Join)
+        for name in ('users', 'branches', 'roles'):
+            if checkpoint.is_done(name):
+                state = restore(name)
+                if name == 'users':
+                    user_columns = UserKeyColumns.from_dict(state['user_columns'])
+                continue
+            old_rows = tables.get(outputs[name][0], [])
+            dates_before = dict(DATE_NORMALIZER.unparseable)
+            records = transform_streams({name: old_rows}, context, pool, metrics, args.workers)[name]
+            records = metrics.iterate(f'transform_{name}', records, rows_in=len(old_rows))
+            if name == 'users':
+                records = user_columns.collect(records)
+            write(name, records, dates_before)
+        
+        # User-Branches und User-Roles mit lastUsed-Flag direkt aus den User-Spalten
+        # im Speicher (früher ein zweiter Lauf mit transform_user_relations.py)
+        with metrics.stage('transform_user_relations'):
+            relation_joins = {
+                'user_branches': ('branch_id', 'old_branch_id', user_columns.active_branches()),
+                'user_roles': ('role_id', 'old_role_id', user_columns.active_roles()),
+            }
+        
+        # Zweiter Durchlauf: große Tabellen Zeile für Zeile reparieren, transformieren, schreiben
+        pending = []
+        for name in STREAMED_TABLES.values():
+            if checkpoint.is_done(name):
+                restore(name)
+            else:
+                pending.append(name)
+        if pending:
+            for table_name, rows in iter_tables(args.input):
+                name = STREAMED_TABLES.get(table_name)
+                if name not in pending:
+                    continue
+                pending.remove(name)
+                dates_before = dict(DATE_NORMALIZER.unparseable)
+                rows = metrics.iterate(f'read_{name}', iter_repaired_rows(table_name, rows))
+                if name in relation_joins:
+                    records = iter_last_used_join(rows, *relation_joins[name])
+                else:
+                    records = transform_streams({name: rows}, context, pool, metrics, args.workers)[name]
+                records = metrics.iterate(f'transform_{name}', records, rows_in=row_counts.get(table_name, 0),
+                                          exclude=(f'read_{name}',))
+                write(name, records, dates_before)
+        # Tabellen, die im Export fehlen, ergeben leere Ausgaben
+        for name in pending:
+            write(name, iter(()), dict(DATE_NORMALIZER.unparseable))
+    finally:
+        if pool is not None:
+            pool.shutdown()
     
-    with open(OUTPUT_DIR / "cerebro.json", 'w', encoding='utf-8') as f:
-        json.dump(new_cerebro, f, indent=2, ensure_ascii=False)
+    ambiguous_authors = author_index.ambiguous(lookups['cerebro_authors'])
+    for author_name, candidates in ambiguous_authors.items():
+        print(f"  [WARN] Autor '{author_name}' nicht eindeutig (User-IDs: {', '.join(candidates)})")
     
-    with open(OUTPUT_DIR / "tasks.json", 'w', encoding='utf-8') as f:
-        json.dump(new_tasks, f, indent=2, ensure_ascii=False)
+    tracker.save(OUTPUT_DIR)
     
-    with open(OUTPUT_DIR / "user_branches.json", 'w', encoding='utf-8') as f:
-        json.dump(old_user_branches, f, indent=2, ensure_ascii=False)
+    # Referenzen ohne Ziel pro Spalte (Details in references.json)
+    for line in resolver.dangling_lines():
+        print(f"  [WARN] {line}")
+    resolver.save(OUTPUT_DIR)
+    # Alle Stufen geschrieben: Checkpoint wird nicht mehr gebraucht
+    checkpoint.finish()
     
-    with open(OUTPUT_DIR / "user_roles.json", 'w', encoding='utf-8') as f:
-        json.dump(old_user_roles, f, indent=2, ensure_ascii=False)
+    # Nicht parsebare Datumswerte pro Spalte
+    for column, count in sorted(DATE_NORMALIZER.unparseable.items()):
+        print(f"  [WARN] {column}: {count} ungültige Datumswerte")
     
     print(f"\n[OK] Daten gespeichert in: {OUTPUT_DIR}")
+    metrics.print_summary(metrics.save(RUN_REPORT_FILE))
+    print(f"Laufzeit-Bericht: {RUN_REPORT_FILE}")
     print("\nNächste Schritte:")
     print("1. Prüfe die transformierten Daten in import_data/")
-    print("2. Erstelle Import-Skript mit Prisma Client")
-    print("3. Importiere die Daten in die Datenbank")
+    print("2. Importiere die Daten in die Datenbank:")
+    print("   python import_loader.py --database $DATABASE_URL")
+    if args.delta:
+        print(f"3. Wende die Änderungen aus {OUTPUT_DIR / DELTA_DIR}/ an (delta.json: gelöschte Schlüssel)")
+        print("   und übernimm das Delta danach: python prepare_import.py --accept-delta")
 
 if __name__ == "__main__":
     main()
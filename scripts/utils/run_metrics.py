@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Messung pro Stufe für die Migrations-Skripte (prepare_import.py, Extraktoren).
+
+Pro Stufe (Parsen, Encoding-Reparatur, jede Transformation, jedes Schreiben,
+jede Snapshot-Datei) werden Wall- und CPU-Zeit, Zeilen rein/raus, Zeilen/s und
+der Speicher-Höchststand (Peak RSS) erfasst und am Ende als JSON-Bericht
+gespeichert, damit sich die Laufzeiten verschiedener Läufe vergleichen lassen.
+
+Stufen werden entweder als Block gemessen (with metrics.stage(...)) oder als
+Iterator (metrics.iterate(...)): dann zählt nur die Zeit, in der der Iterator
+die nächsten Zeilen liefert. So lassen sich Transformation und Schreiben auch
+dann getrennt messen, wenn die Datensätze gestreamt werden. Mit `exclude`
+wird die Zeit darin verschachtelter Stufen abgezogen.
+
+Die CPU-Zeit einer Stufe ist die des eigenen Prozesses. Arbeit in Worker-
+Prozessen wird dort mit timed_call gemessen und mit record() als eigene Stufe
+übernommen; die Gesamtsumme enthält zusätzlich alle beendeten Kindprozesse.
+Der Speicher-Peak einer Stufe ist unter Linux der echte Höchststand während
+der Stufe (VmHWM wird über /proc/self/clear_refs zurückgesetzt). Wo das nicht
+geht, ist es der Höchststand des Prozesses bis zum Ende der Stufe
+("peak_rss_scope": "process" im Bericht).
+
+Optional wird jede (oder jede ausgewählte) Stufe mit cProfile profiliert; die
+Profile landen als .prof-Dateien im Profil-Verzeichnis (python -m pstats ...).
+"""
+
+import cProfile
+import json
+import os
+import platform
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Zeilen pro Zeitmessung bei iterate(): hält den Overhead pro Zeile vernachlässigbar
+ITERATE_BATCH_SIZE = 1000
+# Schreiben von '5' setzt den Speicher-Höchststand (VmHWM, ru_maxrss) zurück (Linux)
+CLEAR_REFS_FILE = Path("/proc/self/clear_refs")
+
+def peak_rss_mb() -> Optional[float]:
+    """
+    Höchststand des Arbeitsspeichers dieses Prozesses in MB (None, falls nicht verfügbar).
+
+    Seit dem Start bzw. seit dem letzten reset_peak_rss().
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux: KB, macOS: Bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def reset_peak_rss() -> bool:
+    """Setzt den Speicher-Höchststand des Prozesses zurück; False, falls nicht möglich."""
+    try:
+        with open(CLEAR_REFS_FILE, 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+class _PeakHolder:
+    """Höchststand einer offenen Messung (Vergleich über Identität)."""
+
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value: Optional[float] = None
+
+class _PeakTracker:
+    """
+    Speicher-Peak pro Messung, auch bei verschachtelten Messungen.
+
+    Vor jedem Zurücksetzen wird der bisherige Höchststand allen offenen
+    Messungen (und dem Prozess-Peak) gutgeschrieben.
+    """
+
+    def __init__(self):
+        self.supported: Optional[bool] = None
+        self.process_peak: Optional[float] = None
+        self._open: List[_PeakHolder] = []
+
+    def _fold(self):
+        peak = peak_rss_mb()
+        if peak is None:
+            return
+        for holder in self._open:
+            holder.value = peak if holder.value is None else max(holder.value, peak)
+        self.process_peak = peak if self.process_peak is None else max(self.process_peak, peak)
+
+    def begin(self) -> _PeakHolder:
+        self._fold()
+        if self.supported is not False:
+            self.supported = reset_peak_rss()
+        holder = _PeakHolder()
+        self._open.append(holder)
+        return holder
+
+    def end(self, holder: _PeakHolder) -> Optional[float]:
+        self._fold()
+        self._open = [other for other in self._open if other is not holder]
+        return holder.value
+
+    def peak(self) -> Optional[float]:
+        """Höchststand des Prozesses seit dem Start (trotz Zurücksetzen)."""
+        self._fold()
+        return self.process_peak
+
+_PEAKS = _PeakTracker()
+
+def cpu_seconds() -> float:
+    """CPU-Zeit dieses Prozesses plus beendeter Kindprozesse (z.B. Prozess-Pool nach shutdown)."""
+    cpu = time.process_time()
+    if resource is not None:
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        cpu += children.ru_utime + children.ru_stime
+    return cpu
+
+class StageMetrics:
+    """Summen einer Stufe über alle Messungen."""
+
+    __slots__ = ('name', 'wall', 'cpu', 'rows_in', 'rows_out', 'bytes_in', 'peak_rss_mb', 'calls', 'exclude', 'profile')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.rows_in: Optional[int] = None
+        self.rows_out: Optional[int] = None
+        self.bytes_in: Optional[int] = None
+        self.peak_rss_mb: Optional[float] = None
+        self.calls = 0
+        self.exclude: Tuple[str, ...] = ()
+        self.profile: Optional[str] = None
+
+    def add_rows(self, rows_in: Optional[int] = None, rows_out: Optional[int] = None, bytes_in: Optional[int] = None):
+        if rows_in is not None:
+            self.rows_in = (self.rows_in or 0) + rows_in
+        if rows_out is not None:
+            self.rows_out = (self.rows_out or 0) + rows_out
+        if bytes_in is not None:
+            self.bytes_in = (self.bytes_in or 0) + bytes_in
+
+    def add_peak(self, peak: Optional[float]):
+        if peak is not None:
+            self.peak_rss_mb = peak if self.peak_rss_mb is None else max(self.peak_rss_mb, peak)
+
+def timed_call(func: Callable[[Any], Any], arg: Any, profile_file: Optional[str] = None) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Ruft func(arg) auf und misst dabei Wall-/CPU-Zeit und Peak RSS.
+
+    Läuft auch in Worker-Prozessen (Funktion auf Modulebene); das Profil wird
+    dann im Worker in `profile_file` geschrieben. CPU-Zeit und Peak RSS sind
+    die des aufrufenden Prozesses während des Aufrufs.
+    """
+    profiler = cProfile.Profile() if profile_file else None
+    peak = _PEAKS.begin()
+    start_wall, start_cpu = time.perf_counter(), time.process_time()
+    if profiler:
+        profiler.enable()
+    try:
+        result = func(arg)
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(profile_file)
+    wall, cpu = time.perf_counter() - start_wall, time.process_time() - start_cpu
+    return result, {
+        "wall": wall,
+        "cpu": cpu,
+        "peak_rss_mb": _PEAKS.end(peak),
+    }
+
+class RunMetrics:
+    """
+    Sammelt die Messwerte eines Laufs.
+
+    profile=None: kein Profiling. Eine leere Liste profiliert alle Stufen, sonst
+    nur Stufen, deren Name mit einem der Einträge beginnt (z.B. 'transform').
+    """
+
+    def __init__(self, script: str, profile: Optional[Iterable[str]] = None, profile_dir: Optional[Path] = None):
+        self.script = script
+        self.stages: Dict[str, StageMetrics] = {}
+        self.profile = None if profile is None else tuple(profile)
+        self.profile_dir = profile_dir or Path("profiles")
+        self._profilers: Dict[str, cProfile.Profile] = {}
+        self._profiling = False
+        self.started = datetime.now()
+        self._start_wall = time.perf_counter()
+        self._start_cpu = cpu_seconds()
+
+    def __getitem__(self, name: str) -> StageMetrics:
+        stage = self.stages.get(name)
+        if stage is None:
+            stage = self.stages[name] = StageMetrics(name)
+        return stage
+
+    def should_profile(self, name: str) -> bool:
+        if self.profile is None:
+            return False
+        return not self.profile or any(name.startswith(prefix) for prefix in self.profile)
+
+    def profile_file(self, name: str) -> Path:
+        safe_name = ''.join(c if c.isalnum() or c in '-_.' else '_' for c in name)
+        return self.profile_dir / f"{self.script}.{safe_name}.prof"
+
+    @contextmanager
+    def _measure(self, stage: StageMetrics):
+        # cProfile kann nicht verschachtelt laufen: innere Stufen zählen zum äußeren Profil
+        profiler = None
+        if not self._profiling and self.should_profile(stage.name):
+            profiler = self._profilers.setdefault(stage.name, cProfile.Profile())
+            self._profiling = True
+            profiler.enable()
+        peak = _PEAKS.begin()
+        start_wall, start_cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            stage.wall += time.perf_counter() - start_wall
+            stage.cpu += time.process_time() - start_cpu
+            if profiler:
+                profiler.disable()
+                self._profiling = False
+            stage.add_peak(_PEAKS.end(peak))
+
+    @contextmanager
+    def stage(self, name: str, rows_in: Optional[int] = None, bytes_in: Optional[int] = None,
+              exclude: Iterable[str] = ()) -> Iterator[StageMetrics]:
+        """Misst einen Block. Zeilen raus setzt der Aufrufer mit stage.add_rows(rows_out=...)."""
+        stage = self[name]
+        stage.exclude = tuple(exclude)
+        stage.calls += 1
+        stage.add_rows(rows_in, bytes_in=bytes_in)
+        with self._measure(stage):
+            yield stage
+
+    def iterate(self, name: str, iterable: Iterable[Any], rows_in: Optional[int] = None,
+                exclude: Iterable[str] = (), batch_size: int = ITERATE_BATCH_SIZE) -> Iterator[Any]:
+        """Reicht die Elemente weiter und misst die Zeit, die das Liefern kostet (blockweise)."""
+        stage = self[name]
+        stage.exclude = tuple(exclude)
+        stage.calls += 1
+        stage.add_rows(rows_in, rows_out=0)
+        iterator = iter(iterable)
+        while True:
+            with self._measure(stage):
+                batch = list(islice(iterator, batch_size))
+            if not batch:
+                return
+            stage.rows_out += len(batch)
+            yield from batch
+
+    def record(self, name: str, measured: Dict[str, Any], rows_in: Optional[int] = None,
+               rows_out: Optional[int] = None, bytes_in: Optional[int] = None):
+        """Übernimmt eine Messung aus einem anderen Prozess (siehe timed_call)."""
+        stage = self[name]
+        stage.calls += 1
+        stage.wall += measured["wall"]
+        stage.cpu += measured["cpu"]
+        stage.add_peak(measured.get("peak_rss_mb"))
+        stage.add_rows(rows_in, rows_out, bytes_in)
+
+    def worker_profile_file(self, name: str) -> Optional[str]:
+        """Profil-Datei für timed_call in einem Worker (None, falls die Stufe nicht profiliert wird)."""
+        if not self.should_profile(name):
+            return None
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        self[name].profile = str(self.profile_file(name))
+        return self[name].profile
+
+    def _stage_dict(self, stage: StageMetrics) -> Dict[str, Any]:
+        wall, cpu = stage.wall, stage.cpu
+        for excluded in stage.exclude:
+            if excluded in self.stages:
+                wall -= self.stages[excluded].wall
+                cpu -= self.stages[excluded].cpu
+        wall, cpu = max(wall, 0.0), max(cpu, 0.0)
+        rows = stage.rows_out if stage.rows_out is not None else stage.rows_in
+        return {
+            "stage": stage.name,
+            "wall_s": round(wall, 6),
+            "cpu_s": round(cpu, 6),
+            "rows_in": stage.rows_in,
+            "rows_out": stage.rows_out,
+            "rows_per_s": round(rows / wall, 1) if rows and wall else None,
+            "mb_per_s": round(stage.bytes_in / (1024 * 1024) / wall, 2) if stage.bytes_in and wall else None,
+            "peak_rss_mb": round(stage.peak_rss_mb, 1) if stage.peak_rss_mb is not None else None,
+            "calls": stage.calls,
+            "excludes": list(stage.exclude),
+            "profile": stage.profile,
+        }
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "script": self.script,
+            "started": self.started.isoformat(timespec='seconds'),
+            "finished": datetime.now().isoformat(timespec='seconds'),
+            "argv": sys.argv[1:],
+            "python": platform.python_version(),
+            "pid": os.getpid(),
+            "wall_s": round(time.perf_counter() - self._start_wall, 6),
+            "cpu_s": round(cpu_seconds() - self._start_cpu, 6),
+            "peak_rss_mb": _PEAKS.peak(),
+            # stage: Höchststand während der Stufe; process: Höchststand des Prozesses bis Stufenende
+            "peak_rss_scope": "stage" if _PEAKS.supported else "process",
+            "stages": [self._stage_dict(stage) for stage in self.stages.values()],
+        }
+
+    def save_profiles(self) -> List[Path]:
+        """Schreibt die Profile der im Hauptprozess profilierten Stufen."""
+        paths = []
+        if self._profilers:
+            self.profile_dir.mkdir(parents=True, exist_ok=True)
+        for name, profiler in self._profilers.items():
+            path = self.profile_file(name)
+            profiler.dump_stats(str(path))
+            self[name].profile = str(path)
+            paths.append(path)
+        return paths
+
+    def save(self, path: Path) -> Dict[str, Any]:
+        """Schreibt Profile und Bericht; gibt den Bericht zurück."""
+        self.save_profiles()
+        report = self.report()
+        tmp_path = path.with_suffix(path.suffix + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        tmp_path.replace(path)
+        return report
+
+    def print_summary(self, report: Optional[Dict[str, Any]] = None):
+        report = report or self.report()
+        print(f"\n{'Stufe':<34} {'Wall':>9} {'CPU':>9} {'Zeilen':>10} {'Zeilen/s':>11} {'RSS MB':>8}")
+        for stage in report["stages"]:
+            rows = stage["rows_out"] if stage["rows_out"] is not None else stage["rows_in"]
+            rows_per_s = f"{stage['rows_per_s']:.0f}" if stage["rows_per_s"] else '-'
+            rss = f"{stage['peak_rss_mb']:.0f}" if stage["peak_rss_mb"] is not None else '-'
+            print(f"{stage['stage'][:34]:<34} {stage['wall_s']:>8.3f}s {stage['cpu_s']:>8.3f}s "
+                  f"{rows if rows is not None else '-':>10} {rows_per_s:>11} {rss:>8}")
+        print(f"{'Gesamt':<34} {report['wall_s']:>8.3f}s {report['cpu_s']:>8.3f}s")
+
+def add_profile_argument(parser):
+    """Gemeinsame Option --profile für die Skripte mit RunMetrics."""
+    parser.add_argument('--profile', nargs='*', metavar='STUFE',
+                        help="Stufen mit cProfile profilieren (ohne Angabe: alle; sonst Namens-Präfixe, "
+                             "z.B. transform_tasks write)")
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Festplatten-Cache für die Extraktionsergebnisse einzelner Snapshot-Dateien.
+
+Pro Snapshot-Datei und Extraktionsfunktion wird das Ergebnis zusammen mit
+Größe, mtime und SHA-1 des Inhalts gespeichert. Bei einem erneuten Lauf werden
+nur neue oder geänderte Dateien geparst, alle anderen Ergebnisse kommen aus dem
+Cache. Hat sich nur die mtime geändert (z.B. Datei kopiert), entscheidet der
+Inhalts-Hash.
+
+Der Cache ist an den Quelltext der Extraktions-Module gebunden: ändert sich
+ein Extraktor, werden alle Einträge verworfen.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from run_metrics import RunMetrics
+from snapshot_scanner import process_snapshot_files
+
+HASH_CHUNK_SIZE = 4 * 1024 * 1024
+
+def file_sha1(path: Path) -> str:
+    """Berechnet den SHA-1 des Dateiinhalts blockweise."""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def source_fingerprint(module_files: Iterable[str]) -> str:
+    """Hash über den Quelltext der Module, deren Extraktoren im Cache landen."""
+    digest = hashlib.sha1()
+    for module_file in module_files:
+        digest.update(Path(module_file).read_bytes())
+    return digest.hexdigest()
+
+class SnapshotCache:
+    """
+    Cache {Funktion:Pfad -> Ergebnis} in einer JSON-Datei.
+
+    enabled=False: Cache wird weder gelesen noch geschrieben (--no-cache).
+    rebuild=True:  vorhandene Einträge werden ignoriert und neu geschrieben (--rebuild-cache).
+    """
+
+    def __init__(self, cache_file: Path, version: str, enabled: bool = True, rebuild: bool = False):
+        self.cache_file = cache_file
+        self.version = version
+        self.enabled = enabled
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.used: Dict[str, Dict[str, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+        if enabled and not rebuild:
+            self.entries = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if not self.cache_file.exists():
+            return {}
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            # Defekter Cache wird einfach neu aufgebaut
+            return {}
+        if data.get("version") != self.version:
+            return {}
+        return data.get("entries", {})
+
+    @staticmethod
+    def _key(func: Callable[[Path], Any], path: Path) -> str:
+        return f"{func.__name__}:{path.resolve()}"
+
+    def lookup(self, func: Callable[[Path], Any], path: Path) -> Tuple[bool, Any]:
+        """Gibt (Treffer, Ergebnis) für eine Datei zurück."""
+        if not self.enabled:
+            return False, None
+        key = self._key(func, path)
+        entry = self.entries.get(key)
+        if entry is None:
+            return False, None
+        stat = path.stat()
+        if entry["size"] != stat.st_size:
+            return False, None
+        if entry["mtime_ns"] != stat.st_mtime_ns:
+            # Gleiche Größe, andere mtime: Inhalt vergleichen
+            if entry["sha1"] != file_sha1(path):
+                return False, None
+            entry["mtime_ns"] = stat.st_mtime_ns
+        self.used[key] = entry
+        return True, entry["result"]
+
+    def store(self, func: Callable[[Path], Any], path: Path, result: Any):
+        """Speichert das Ergebnis einer frisch geparsten Datei."""
+        if not self.enabled:
+            return
+        stat = path.stat()
+        self.used[self._key(func, path)] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha1": file_sha1(path),
+            "result": result,
+        }
+
+    def process(self, snapshot_files: List[Path], func: Callable[[Path], Any], workers: int = 1,
+                metrics: Optional[RunMetrics] = None) -> Iterator[Tuple[Path, Any, Optional[BaseException]]]:
+        """
+        Wie process_snapshot_files, aber Dateien mit gültigem Cache-Eintrag werden
+        nicht geparst (und nicht gemessen). Reihenfolge der Ergebnisse bleibt die
+        von `snapshot_files`.
+        """
+        cached: Dict[Path, Any] = {}
+        for snapshot_file in snapshot_files:
+            hit, result = self.lookup(func, snapshot_file)
+            if hit:
+                cached[snapshot_file] = result
+        self.hits += len(cached)
+
+        missing = [snapshot_file for snapshot_file in snapshot_files if snapshot_file not in cached]
+        self.misses += len(missing)
+        fresh = process_snapshot_files(missing, func, workers, metrics)
+
+        for snapshot_file in snapshot_files:
+            if snapshot_file in cached:
+                yield snapshot_file, cached[snapshot_file], None
+                continue
+            snapshot_file, result, error = next(fresh)
+            if error is None:
+                self.store(func, snapshot_file, result)
+            yield snapshot_file, result, error
+
+    def save(self):
+        """
+        Schreibt den Cache. Einträge für Dateien, die in diesem Lauf nicht
+        vorkamen (gelöschte Snapshots), werden dabei entfernt.
+        """
+        if not self.enabled:
+            return
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.cache_file.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({"version": self.version, "entries": self.used}, f, ensure_ascii=False)
+        tmp_file.replace(self.cache_file)
+
+    def summary(self) -> str:
+        """Kurze Statistik für die Konsolenausgabe."""
+        if not self.enabled:
+            return "Cache deaktiviert"
+        total = self.hits + self.misses
+        return f"Cache: {self.hits}/{total} Dateien aus dem Cache, {self.misses} neu geparst"
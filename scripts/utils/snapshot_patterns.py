@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Gemeinsame, vorkompilierte Pattern und Extraktoren für die Snapshot-Skripte.
+
+Wird von extract_intranet_data.py, extract_all_data.py und
+extract_users_simple.py importiert, damit jedes Pattern nur an einer Stelle
+steht und nur einmal pro Prozess kompiliert wird.
+
+Es gibt zwei Arten von Pattern:
+- Text-Pattern laufen über den Inhalt eines ganzen Snapshots (bzw. Blocks).
+- Knoten-Pattern werden mit .match() auf den Text nach 'name:' eines
+  einzelnen Knotens angewendet (siehe snapshot_scanner).
+
+TEXT_PATTERNS und NODE_PATTERNS enthalten die Pattern unter einem Namen, z.B.
+für benchmark_snapshot_patterns.py.
+"""
+
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Text-Pattern
+# Request-Zeilen: role: row mit Request-Daten
+REQUEST_ROW_PATTERN = re.compile(r'role:\s*row\s*\n\s*name:\s*"([^"]+)"', re.MULTILINE)
+
+# Knoten-Pattern (angewendet auf den Text nach 'name:')
+REQUEST_NAME_PATTERN = re.compile(r'"([^"]+)"')
+# Rest nach der ')' von "Name (username) | Last day: YYYY-MM-DD"
+LAST_DAY_PATTERN = re.compile(r'\s*\|\s*Last\s+day:\s*(\d{4}-\d{2}-\d{2})', re.IGNORECASE)
+OPTION_USERNAME_PATTERN = re.compile(r'[A-Za-z0-9_][A-Za-z0-9_\s]*[A-Za-z0-9_]')
+# Bekannte Rollen (müssen angepasst werden basierend auf den tatsächlichen Daten)
+ROLE_OPTION_PATTERN = re.compile(r'(Admin|Manager|Staff|Employee|Supervisor)', re.IGNORECASE)
+
+TEXT_PATTERNS = {
+    'request_row': REQUEST_ROW_PATTERN,
+}
+
+NODE_PATTERNS = {
+    'request_name': REQUEST_NAME_PATTERN,
+    'option_username': OPTION_USERNAME_PATTERN,
+    'role_option': ROLE_OPTION_PATTERN,
+}
+
+# Option-Namen, die keine Usernamen sind
+INVALID_OPTION_NAMES = {
+    'Select', 'Choose', 'Select User', 'Public', 'Private', 'Approval', 'Approved',
+    'Branch', 'Role', 'Setting', 'Logout', 'Dashboard', 'Worktracker',
+    'Who\'s working?', 'Work Report', 'Cerebro', 'Toggle navigation',
+    'Logo', 'Save', 'Edit request', 'Request Description', 'Request:',
+    'Description:', 'Requested by:', 'Responsible:', 'Due Date:',
+    'Create To Do:', 'on', 'off', 'Alianza Paisa', 'Alianza Pai a',
+    'Manila', 'Nowhere', 'Parque Poblado'
+}
+
+# User-Einträge werden zeilenweise mit str.find zerlegt statt mit Pattern wie
+# `([^|]+)\s*\(([^)]+)\)`, die auf langen Zeilen ohne Klammern (bzw. über
+# Zeilengrenzen hinweg) stark backtracken. Jede Zeile wird so in linearer Zeit
+# und ohne Größen-Grenzen verarbeitet.
+
+def split_user_name(value: str) -> Optional[Tuple[str, str]]:
+    r"""
+    Zerlegt "Name (username)..." in (Name, username).
+
+    Wie bisher `([^(]+)\s*\(([^)]+)\)`: Name bis zur ersten '(', username bis
+    zur ersten ')'. Beide Teile sind ungetrimmt.
+    """
+    open_pos = value.find('(')
+    if open_pos <= 0:
+        return None
+    close_pos = value.find(')', open_pos + 1)
+    if close_pos <= open_pos + 1:
+        return None
+    return value[:open_pos], value[open_pos + 1:close_pos]
+
+def split_user_last_day(value: str) -> Optional[Tuple[str, str, str]]:
+    r"""
+    Zerlegt "Name (username) | Last day: YYYY-MM-DD" in (Name, username, Datum).
+
+    Wie bisher `([^|]+)\s*\(([^)]+)\)\s*\|\s*Last\s+day:\s*(...)`: der Name
+    endet vor dem ersten '|', der username reicht bis zur nächsten ')'. Wie beim
+    Backtracking des Pattern wird die am weitesten rechts stehende passende '('
+    genommen. Die Klammer-Abschnitte werden von rechts nach links je einmal
+    geprüft, daher linear. Teile sind ungetrimmt.
+    """
+    end = value.find('|')
+    while end > 1:
+        open_pos = value.rfind('(', 1, end)
+        if open_pos == -1:
+            return None
+        close_pos = value.find(')', open_pos + 1)
+        if close_pos == -1:
+            return None
+        if close_pos == open_pos + 1:
+            # Leerer username: weiter links im selben Abschnitt suchen
+            end = open_pos
+            continue
+        match = LAST_DAY_PATTERN.match(value, close_pos + 1)
+        if match:
+            return value[:open_pos], value[open_pos + 1:close_pos], match.group(1)
+        # Alle '(' bis zur vorherigen ')' enden an derselben ')' und scheitern genauso
+        end = value.rfind(')', 0, open_pos)
+    return None
+
+def _name_value(line: str) -> Optional[str]:
+    """Text nach dem ersten 'name:' einer Zeile (ohne führende Leerzeichen)."""
+    pos = line.find('name:')
+    if pos == -1:
+        return None
+    return line[pos + len('name:'):].lstrip()
+
+def _is_option_role_line(line: str) -> bool:
+    """True für Zeilen wie '- role: option'."""
+    pos = line.find('role:')
+    return pos != -1 and line[pos + len('role:'):].strip() == 'option'
+
+def _clean_full_name(full_name: str) -> str:
+    return full_name.strip().strip('"').strip()
+
+def extract_users_from_settings(snapshot_content: str) -> List[Dict[str, Any]]:
+    """Extrahiert alle User aus der Settings-Seite."""
+    users = []
+    seen_usernames = set()
+    lines = snapshot_content.splitlines()
+
+    # Pattern 1: User mit Last Day: "Name (username) | Last day: YYYY-MM-DD"
+    for line in lines:
+        value = _name_value(line)
+        parts = split_user_last_day(value) if value is not None else None
+        if not parts:
+            continue
+        full_name, username, last_day = parts
+        full_name = _clean_full_name(full_name)
+        username = username.strip()
+        if username and username not in seen_usernames:
+            seen_usernames.add(username)
+            users.append({
+                "username": username,
+                "full_name": full_name,
+                "last_day": last_day
+            })
+
+    # Pattern 2: User ohne Last Day: "Name (username)" in der name-Zeile direkt
+    # nach 'role: option' (Dropdown-Einträge mit dem exakten Format)
+    option_names = []
+    expect_name = False
+    for line in lines:
+        if expect_name:
+            if not line.strip():
+                continue
+            stripped = line.lstrip()
+            if stripped.startswith('name:'):
+                option_names.append(stripped[len('name:'):].lstrip())
+            expect_name = False
+        if _is_option_role_line(line):
+            expect_name = True
+
+    for value in option_names:
+        parts = split_user_name(value)
+        if not parts:
+            continue
+        full_name, username = parts
+        full_name = _clean_full_name(full_name)
+        username = username.strip()
+        # Filtere nur gültige User (nicht "Select User" oder andere UI-Elemente)
+        if (username and len(username) > 1 and len(username) < 50 and
+            username not in seen_usernames and
+            username != "Select User" and
+            not username.startswith('ref-') and
+            'ref:' not in username and
+            'ref:' not in full_name):
+            seen_usernames.add(username)
+            users.append({
+                "username": username,
+                "full_name": full_name,
+                "last_day": None
+            })
+
+    return users
+
+def merge_users(user_lists: Iterable[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Führt die User mehrerer Blöcke eines Snapshots zusammen.
+
+    Ergibt dasselbe wie extract_users_from_settings über den ganzen Text: ein
+    Eintrag mit Last Day hat Vorrang vor einem Dropdown-Eintrag desselben
+    Usernamens, auch wenn beide in verschiedenen Blöcken stehen. Reihenfolge:
+    erst alle User mit Last Day, dann die übrigen (jeweils erstes Vorkommen).
+    """
+    with_last_day: Dict[str, Dict[str, Any]] = {}
+    without_last_day: Dict[str, Dict[str, Any]] = {}
+    for users in user_lists:
+        for user in users:
+            target = with_last_day if user['last_day'] is not None else without_last_day
+            target.setdefault(user['username'], user)
+    return list(with_last_day.values()) + [
+        user for username, user in without_last_day.items() if username not in with_last_day
+    ]
+
+def extract_users_from_chunks(chunks: Iterable[str]) -> List[Dict[str, Any]]:
+    """extract_users_from_settings für einen blockweise gelesenen Snapshot (siehe iter_snapshot_chunks)."""
+    return merge_users(extract_users_from_settings(chunk) for chunk in chunks)
+
+def extract_requests(snapshot_content: str) -> List[Dict[str, Any]]:
+    """Extrahiert alle Requests aus der Hauptseite."""
+    requests = []
+    for match in REQUEST_ROW_PATTERN.finditer(snapshot_content):
+        request_text = match.group(1)
+        # Zerlege den Request-Text (mehrere Leerzeichen als Trenner)
+        parts = [p.strip() for p in request_text.split('  ') if p.strip()]
+        
+        if len(parts) >= 4:
+            requests.append({
+                "title": parts[0] if parts[0] else "",
+                "requested_by": parts[1] if len(parts) > 1 else "",
+                "responsible": parts[2] if len(parts) > 2 else "",
+                "status": parts[3] if len(parts) > 3 else "",
+                "date": parts[4] if len(parts) > 4 else "",
+                "raw_text": request_text
+            })
+    
+    return requests
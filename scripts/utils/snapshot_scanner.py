@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Einmaliges Zerlegen von Browser-Snapshots (Accessibility-Tree) in Knoten.
+
+Ein Snapshot besteht aus Einträgen wie:
+
+    - role: option
+      name: Patrick Ammann (Pat)
+      ref: ref-abc123
+
+Der Scanner liest den Snapshot genau einmal Zeile für Zeile, fasst die Zeilen
+zu Knoten (role, name, Rohzeilen) zusammen und gibt jeden Knoten an alle
+registrierten Extraktoren weiter.
+
+Große Snapshot-Dateien werden per mmap in zeilenbündigen Blöcken gelesen, so dass
+auch Dateien mit mehreren hundert MB mit begrenztem Speicher verarbeitet werden.
+"""
+
+import mmap
+import os
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from run_metrics import RunMetrics, timed_call
+
+ROLE_MARKER = 'role:'
+NAME_MARKER = 'name:'
+
+# Blockgröße beim Lesen von Snapshot-Dateien
+SNAPSHOT_CHUNK_SIZE = 4 * 1024 * 1024
+
+class SnapshotNode(NamedTuple):
+    """Ein Knoten des Accessibility-Trees."""
+    role: Optional[str]  # None für Zeilen vor dem ersten role-Eintrag
+    name: Optional[str]  # Text nach 'name:' (ungekürzt, inkl. Anführungszeichen)
+    lines: List[str]     # alle Rohzeilen des Knotens
+
+    @property
+    def text(self) -> str:
+        return '\n'.join(self.lines)
+
+class SnapshotExtractor(ABC):
+    """Basisklasse: erhält jeden Knoten über feed() und liefert am Ende result()."""
+
+    @abstractmethod
+    def feed(self, node: SnapshotNode):
+        """Verarbeitet einen Knoten."""
+
+    @abstractmethod
+    def result(self) -> Any:
+        """Ergebnis nach dem letzten Knoten."""
+
+def _strip_marker(line: str) -> str:
+    """Entfernt Einrückung und Listen-Präfix ('- ') einer Zeile."""
+    return line.lstrip(' \t-')
+
+def iter_snapshot_nodes(lines: Iterable[str]) -> Iterator[SnapshotNode]:
+    """
+    Zerlegt die Zeilen eines Snapshots in Knoten.
+
+    Ein Knoten beginnt mit einer 'role:'-Zeile; die erste folgende 'name:'-Zeile
+    liefert den Namen. Steht 'name:' in derselben Zeile wie 'role:', wird der
+    Name von dort übernommen.
+    """
+    role: Optional[str] = None
+    name: Optional[str] = None
+    node_lines: List[str] = []
+
+    for line in lines:
+        line = line.rstrip('\r\n')
+        stripped = _strip_marker(line)
+        if stripped.startswith(ROLE_MARKER):
+            if node_lines:
+                yield SnapshotNode(role, name, node_lines)
+            rest = stripped[len(ROLE_MARKER):]
+            name_pos = rest.find(NAME_MARKER)
+            if name_pos != -1:
+                role = rest[:name_pos].strip()
+                name = rest[name_pos + len(NAME_MARKER):].strip()
+            else:
+                role = rest.strip()
+                name = None
+            node_lines = [line]
+        else:
+            if name is None and role is not None and stripped.startswith(NAME_MARKER):
+                name = stripped[len(NAME_MARKER):].strip()
+            node_lines.append(line)
+
+    if node_lines:
+        yield SnapshotNode(role, name, node_lines)
+
+def scan_snapshot(lines: Iterable[str], extractors: Iterable[SnapshotExtractor]) -> List[Any]:
+    """
+    Liest einen Snapshot einmal und gibt jeden Knoten an alle Extraktoren.
+
+    Gibt die Ergebnisse der Extraktoren in derselben Reihenfolge zurück.
+    """
+    extractors = list(extractors)
+    for node in iter_snapshot_nodes(lines):
+        for extractor in extractors:
+            extractor.feed(node)
+    return [extractor.result() for extractor in extractors]
+
+def iter_snapshot_chunks(path: Path, chunk_size: int = SNAPSHOT_CHUNK_SIZE, overlap_lines: int = 1) -> Iterator[str]:
+    """
+    Liest eine Snapshot-Datei per mmap in zeilenbündigen Text-Blöcken.
+
+    Jeder Block endet an einem Zeilenende. Mit overlap_lines > 0 beginnt jeder
+    Block mit den letzten Zeilen des vorherigen, damit Pattern über zwei Zeilen
+    (z.B. 'role: option' + 'name: ...') an Blockgrenzen nicht verloren gehen.
+    Treffer, die ganz in der Überlappung liegen, können doppelt geliefert werden.
+    """
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start = 0
+            while start < size:
+                end = min(start + chunk_size, size)
+                if end < size:
+                    newline = mm.find(b'\n', end - 1)
+                    end = size if newline == -1 else newline + 1
+                yield mm[start:end].decode('utf-8', errors='ignore')
+                if end >= size:
+                    return
+                # Nächster Block beginnt overlap_lines Zeilen vor dem Ende (immer nach `start`)
+                next_start = end
+                for _ in range(overlap_lines):
+                    newline = mm.rfind(b'\n', start, next_start - 1)
+                    if newline == -1:
+                        break
+                    next_start = newline + 1
+                start = next_start
+
+def iter_snapshot_lines(path: Path, chunk_size: int = SNAPSHOT_CHUNK_SIZE) -> Iterator[str]:
+    """Liefert die Zeilen einer Snapshot-Datei, ohne die ganze Datei zu laden."""
+    for chunk in iter_snapshot_chunks(path, chunk_size, overlap_lines=0):
+        lines = chunk.split('\n')
+        if lines[-1] == '':
+            lines.pop()
+        yield from lines
+
+def scan_snapshot_file(path: Path, extractors: Iterable[SnapshotExtractor]) -> List[Any]:
+    """Wie scan_snapshot, liest die Datei aber blockweise statt komplett."""
+    return scan_snapshot(iter_snapshot_lines(path), extractors)
+
+def _record_metrics(metrics: Optional[RunMetrics], func: Callable[[Path], Any], snapshot_file: Path,
+                    result: Any, measured: Dict[str, Any]):
+    if metrics is not None:
+        rows_out = len(result) if hasattr(result, '__len__') else None
+        metrics.record(f"{func.__name__}:{snapshot_file.name}", measured, rows_in=1, rows_out=rows_out,
+                       bytes_in=snapshot_file.stat().st_size)
+
+def process_snapshot_files(snapshot_files: List[Path], func: Callable[[Path], Any], workers: int = 1,
+                           metrics: Optional[RunMetrics] = None) -> Iterator[Tuple[Path, Any, Optional[BaseException]]]:
+    """
+    Wendet `func` auf jede Snapshot-Datei an und liefert (Datei, Ergebnis, Fehler).
+
+    Die Ergebnisse kommen immer in der Reihenfolge von `snapshot_files`, damit das
+    Zusammenführen und Entfernen von Duplikaten wie im seriellen Lauf funktioniert.
+    Mit workers > 1 laufen die Dateien in einem Prozess-Pool; die größten Dateien
+    werden zuerst gestartet, damit am Ende keine einzelne große Datei nachläuft.
+    `func` muss eine Funktion auf Modulebene sein (wird an die Worker übergeben).
+    Mit `metrics` wird jede Datei als eigene Stufe gemessen (auch im Worker).
+    """
+    def profile_file(snapshot_file: Path) -> Optional[str]:
+        if metrics is None:
+            return None
+        return metrics.worker_profile_file(f"{func.__name__}:{snapshot_file.name}")
+
+    if workers <= 1:
+        for snapshot_file in snapshot_files:
+            try:
+                result, measured = timed_call(func, snapshot_file, profile_file(snapshot_file))
+            except Exception as e:
+                yield snapshot_file, None, e
+                continue
+            _record_metrics(metrics, func, snapshot_file, result, measured)
+            yield snapshot_file, result, None
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        for snapshot_file in sorted(snapshot_files, key=lambda p: p.stat().st_size, reverse=True):
+            futures[snapshot_file] = pool.submit(timed_call, func, snapshot_file, profile_file(snapshot_file))
+        for snapshot_file in snapshot_files:
+            try:
+                result, measured = futures.pop(snapshot_file).result()
+            except Exception as e:
+                yield snapshot_file, None, e
+                continue
+            _record_metrics(metrics, func, snapshot_file, result, measured)
+            yield snapshot_file, result, None
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Prüft, dass die blockweise User-Extraktion dasselbe liefert wie die über den
+ganzen Snapshot, auch wenn Dropdown- und Last-Day-Eintrag eines Users in
+verschiedenen Blöcken stehen.
+
+Ausführen:
+    python -m pytest test_snapshot_chunks.py
+    python test_snapshot_chunks.py
+"""
+
+import tempfile
+from pathlib import Path
+
+from snapshot_patterns import extract_users_from_chunks, extract_users_from_settings
+from snapshot_scanner import SNAPSHOT_CHUNK_SIZE, iter_snapshot_chunks
+
+def _node(role: str, name: str, ref: int) -> str:
+    return f"  - role: {role}\n    name: {name}\n    ref: ref-{ref:05x}\n"
+
+def write_settings_snapshot(path: Path, size_bytes: int):
+    """Dropdown-Eintrag von 'ana' am Anfang, ihr Last-Day-Eintrag am Ende der Datei."""
+    parts = [_node('option', 'Ana Pérez (ana)', 0), _node('option', 'Zoe Müller (zoe) | Last day: 2023-02-01', 1)]
+    size = sum(len(part.encode('utf-8')) for part in parts)
+    ref = 2
+    while size < size_bytes:
+        part = _node('cell', '"Limpiar baño"', ref)
+        parts.append(part)
+        size += len(part.encode('utf-8'))
+        ref += 1
+    parts.append(_node('option', 'Ana Pérez (ana) | Last day: 2024-05-01', ref))
+    parts.append(_node('option', 'Zoe Müller (zoe)', ref + 1))
+    path.write_text(''.join(parts), encoding='utf-8')
+
+def test_last_day_wins_across_chunks():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "snapshot-settings.log"
+        write_settings_snapshot(path, SNAPSHOT_CHUNK_SIZE + 1024 * 1024)
+        assert path.stat().st_size > SNAPSHOT_CHUNK_SIZE
+        chunks = list(iter_snapshot_chunks(path))
+        assert len(chunks) > 1
+        assert 'Ana Pérez (ana)\n' in chunks[0] and 'Last day: 2024-05-01' in chunks[-1]
+
+        whole = extract_users_from_settings(path.read_text(encoding='utf-8'))
+        chunked = extract_users_from_chunks(iter_snapshot_chunks(path))
+
+    assert chunked == whole
+    users = {user['username']: user for user in chunked}
+    assert users['ana']['last_day'] == '2024-05-01'
+    assert users['zoe']['last_day'] == '2023-02-01'
+
+if __name__ == "__main__":
+    test_last_day_wins_across_chunks()
+    print("[OK] Blockweise Extraktion entspricht der über den ganzen Snapshot")
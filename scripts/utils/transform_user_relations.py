@@ -1,92 +1,171 @@
 #!/usr/bin/env python3
 """
 Transformiert User-Branches und User-Roles mit lastUsed-Flag.
+
+Der Join läuft spaltenweise: von den Usern werden nur die Spalten old_id,
+old_branch_id und old_role_id als parallele Listen gehalten, und das
+lastUsed-Flag wird pro Block als eine Gleichheit über die Schlüssel-Spalten
+berechnet (map(operator.eq, ...)) statt Zeile für Zeile.
+
+prepare_import.py ruft transform_user_relations() direkt mit den User-Spalten
+im Speicher auf und schreibt user_branches/user_roles bereits transformiert.
+Dieses Skript ist nur noch ein Wrapper, um die Zuordnungen aus den Dateien in
+import_data/ neu zu berechnen (z.B. nach manuellen Änderungen an users.json).
 """
 
-import json
+import operator
+from itertools import islice
 from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from import_io import detect_format, find_records_file, iter_records, write_output
+from import_records import NewUser
 
 # Pfade
 OUTPUT_DIR = Path("import_data")
 
+# Zuordnungen pro Block beim spaltenweisen Join
+RELATION_BATCH_SIZE = 10000
+
+class UserKeyColumns:
+    """Die Join-Spalten der transformierten User als parallele Listen."""
+
+    def __init__(self):
+        self.user_ids: List[Any] = []
+        self.branch_ids: List[Any] = []
+        self.role_ids: List[Any] = []
+
+    def add(self, user: Any):
+        if isinstance(user, NewUser):
+            # Datensätze aus prepare_import.py: direkter Feldzugriff
+            self.user_ids.append(user.old_id)
+            self.branch_ids.append(user.old_branch_id)
+            self.role_ids.append(user.old_role_id)
+        else:
+            self.user_ids.append(user.get('old_id'))
+            self.branch_ids.append(user.get('old_branch_id'))
+            self.role_ids.append(user.get('old_role_id'))
+
+    def collect(self, users: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Übernimmt die Spalten, während die User weitergereicht werden (z.B. zum Schreiben)."""
+        for user in users:
+            self.add(user)
+            yield user
+
+    @classmethod
+    def from_records(cls, users: Iterable[Dict[str, Any]]) -> 'UserKeyColumns':
+        columns = cls()
+        for user in users:
+            columns.add(user)
+        return columns
+
+    def to_dict(self) -> Dict[str, List[Any]]:
+        return {"user_ids": self.user_ids, "branch_ids": self.branch_ids, "role_ids": self.role_ids}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, List[Any]]) -> 'UserKeyColumns':
+        columns = cls()
+        columns.user_ids = list(data["user_ids"])
+        columns.branch_ids = list(data["branch_ids"])
+        columns.role_ids = list(data["role_ids"])
+        return columns
+
+    @staticmethod
+    def _active_index(user_ids: List[Any], values: List[Any]) -> Dict[Any, Any]:
+        # Nur User mit gesetzter ID und gesetztem Wert (wie bisher)
+        return {user_id: value for user_id, value in zip(user_ids, values) if user_id and value}
+
+    def active_branches(self) -> Dict[Any, Any]:
+        """{user_id: branch_id} - aktiver Branch aus User-Eintrag"""
+        return self._active_index(self.user_ids, self.branch_ids)
+
+    def active_roles(self) -> Dict[Any, Any]:
+        """{user_id: role_id} - aktive Role aus User-Eintrag"""
+        return self._active_index(self.user_ids, self.role_ids)
+
+def _iter_batches(rows: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+def iter_last_used_join(rows: Iterable[Dict[str, Any]], value_key: str, out_key: str,
+                        active: Dict[Any, Any], batch_size: int = RELATION_BATCH_SIZE) -> Iterator[Dict[str, Any]]:
+    """
+    Joint Zuordnungen (user_id, value_key) mit dem aktiven Wert pro User.
+
+    Pro Block werden die Spalten user_id und value_key gebildet, der aktive Wert
+    per Index nachgeschlagen und lastUsed als eine Gleichheit über beide
+    Spalten berechnet.
+    """
+    for batch in _iter_batches(rows, batch_size):
+        user_ids = [row.get('user_id') for row in batch]
+        values = [row.get(value_key) for row in batch]
+        last_used = map(operator.eq, map(active.get, user_ids), values)
+        for user_id, value, is_active in zip(user_ids, values, last_used):
+            yield {
+                "old_user_id": user_id,
+                out_key: value,
+                "lastUsed": is_active
+            }
+
 def transform_user_branches(old_user_branches: list, users_active_branches: dict) -> list:
     """
     Transformiert User-Branches mit lastUsed-Flag.
     users_active_branches: {user_id: branch_id} - aktiver Branch aus User-Eintrag
     """
-    transformed = []
-    
-    for ub in old_user_branches:
-        user_id = ub.get('user_id')
-        branch_id = ub.get('branch_id')
-        
-        # Prüfe ob dies der aktive Branch ist
-        is_active = users_active_branches.get(user_id) == branch_id
-        
-        transformed.append({
-            "old_user_id": user_id,
-            "old_branch_id": branch_id,
-            "lastUsed": is_active
-        })
-    
-    return transformed
+    return list(iter_last_used_join(old_user_branches, 'branch_id', 'old_branch_id', users_active_branches))
 
 def transform_user_roles(old_user_roles: list, users_active_roles: dict) -> list:
     """
     Transformiert User-Roles mit lastUsed-Flag.
     users_active_roles: {user_id: role_id} - aktive Role aus User-Eintrag
     """
-    transformed = []
-    
-    for ur in old_user_roles:
-        user_id = ur.get('user_id')
-        role_id = ur.get('role_id')
-        
-        # Prüfe ob dies die aktive Role ist
-        is_active = users_active_roles.get(user_id) == role_id
-        
-        transformed.append({
-            "old_user_id": user_id,
-            "old_role_id": role_id,
-            "lastUsed": is_active
-        })
-    
-    return transformed
+    return list(iter_last_used_join(old_user_roles, 'role_id', 'old_role_id', users_active_roles))
+
+def transform_user_relations(user_columns: UserKeyColumns, old_user_branches: Iterable[Dict[str, Any]],
+                             old_user_roles: Iterable[Dict[str, Any]]) -> Tuple[Iterator[Dict], Iterator[Dict]]:
+    """
+    Transformiert beide Zuordnungstabellen aus den User-Spalten im Speicher.
+
+    Gibt zwei Generatoren zurück, die direkt geschrieben werden können.
+    """
+    return (
+        iter_last_used_join(old_user_branches, 'branch_id', 'old_branch_id', user_columns.active_branches()),
+        iter_last_used_join(old_user_roles, 'role_id', 'old_role_id', user_columns.active_roles()),
+    )
+
+def _as_relation_rows(rows: Iterable[Dict[str, Any]], value_key: str) -> Iterator[Dict[str, Any]]:
+    """Akzeptiert Rohzeilen (user_id) und bereits transformierte Zeilen (old_user_id)."""
+    for row in rows:
+        if 'old_user_id' in row:
+            yield {'user_id': row['old_user_id'], value_key: row.get('old_' + value_key)}
+        else:
+            yield row
 
 def main():
     """Hauptfunktion."""
     print("Transformiere User-Branches und User-Roles...")
     
-    # Lade Daten
-    with open(OUTPUT_DIR / "users.json", 'r', encoding='utf-8') as f:
-        users = json.load(f)
+    # Lade Daten (JSON oder NDJSON, je nachdem was prepare_import.py geschrieben hat)
+    user_branches_file = find_records_file(OUTPUT_DIR, "user_branches")
+    output_format = detect_format(user_branches_file)
     
-    with open(OUTPUT_DIR / "user_branches.json", 'r', encoding='utf-8') as f:
-        old_user_branches = json.load(f)
+    old_user_branches = list(_as_relation_rows(iter_records(user_branches_file), 'branch_id'))
+    old_user_roles = list(_as_relation_rows(iter_records(find_records_file(OUTPUT_DIR, "user_roles")), 'role_id'))
     
-    with open(OUTPUT_DIR / "user_roles.json", 'r', encoding='utf-8') as f:
-        old_user_roles = json.load(f)
+    # Join-Spalten der User (Users werden zeilenweise gelesen und nicht vollständig gehalten)
+    user_columns = UserKeyColumns.from_records(iter_records(find_records_file(OUTPUT_DIR, "users")))
     
-    # Erstelle Mapping: {user_id: active_branch_id} aus User-Einträgen
-    users_active_branches = {}
-    users_active_roles = {}
-    
-    for user in users:
-        old_id = user.get('old_id')
-        active_branch = user.get('old_branch_id')
-        active_role = user.get('old_role_id')
-        
-        if old_id and active_branch:
-            users_active_branches[old_id] = active_branch
-        if old_id and active_role:
-            users_active_roles[old_id] = active_role
-    
-    print(f"Aktive Branches: {len(users_active_branches)}")
-    print(f"Aktive Roles: {len(users_active_roles)}")
+    print(f"Aktive Branches: {len(user_columns.active_branches())}")
+    print(f"Aktive Roles: {len(user_columns.active_roles())}")
     
     # Transformiere
-    new_user_branches = transform_user_branches(old_user_branches, users_active_branches)
-    new_user_roles = transform_user_roles(old_user_roles, users_active_roles)
+    branches_stream, roles_stream = transform_user_relations(user_columns, old_user_branches, old_user_roles)
+    new_user_branches = list(branches_stream)
+    new_user_roles = list(roles_stream)
     
     print(f"User-Branches: {len(old_user_branches)} -> {len(new_user_branches)}")
     print(f"User-Roles: {len(old_user_roles)} -> {len(new_user_roles)}")
@@ -97,12 +176,9 @@ def main():
     print(f"Aktive Branches: {active_branches}")
     print(f"Aktive Roles: {active_roles}")
     
-    # Speichere
-    with open(OUTPUT_DIR / "user_branches.json", 'w', encoding='utf-8') as f:
-        json.dump(new_user_branches, f, indent=2, ensure_ascii=False)
-    
-    with open(OUTPUT_DIR / "user_roles.json", 'w', encoding='utf-8') as f:
-        json.dump(new_user_roles, f, indent=2, ensure_ascii=False)
+    # Speichere (im selben Format wie die Eingabe)
+    write_output(OUTPUT_DIR, "user_branches", new_user_branches, output_format)
+    write_output(OUTPUT_DIR, "user_roles", new_user_roles, output_format)
     
     print(f"\n✓ Daten gespeichert in: {OUTPUT_DIR}")
 